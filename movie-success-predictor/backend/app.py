@@ -1,11 +1,29 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, g, request, jsonify, send_from_directory
 from flask_cors import CORS
-import joblib
 import numpy as np
 import pandas as pd
 from datetime import datetime
+import hmac
+import json
 import os
 import logging
+import random
+import threading
+import time
+
+from catalog_predictions import CATALOG_PREDICTIONS_FILE, build_catalog_predictions, load_catalog_predictions
+from feature_schema import FEATURE_SCHEMA
+from metrics import CONTENT_TYPE, NULL_TIMER, SIZE_BUCKETS, MetricsRegistry, StageHistograms, StageTimer
+from micro_batcher import MicroBatcher, Overloaded
+from model_bundle import ArtifactWatcher, load_bundle
+from model_registry import ModelRegistry, UnknownModel
+from movie_dataset import dataset_path, preferred_source
+from movie_store import MovieStore, parse_search_args
+from name_index import NameIndex, normalize_name
+from prediction_cache import PredictionCache, SQLiteCacheStore, feature_key
+from profiler import Sampler, profile_for, write_collapsed
+from shadow_scorer import ShadowScorer
+from talent_table import RoleRates
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -14,120 +32,711 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app, origins=["*"], methods=["GET", "POST", "OPTIONS"])  # Enable CORS for all routes
 
-# Global variables to store loaded model and data
-pipeline = None
-director_success_rates = None
-actor1_success_rates = None
-actor2_success_rates = None
-actor3_success_rates = None
+# Everything a prediction reads, swapped as one reference on (re)load.
+# Request handlers read it once and use that bundle throughout.
+model_bundle = None
+
+# Serializes reloads; the outcome of the latest one is shown on /health
+reload_lock = threading.Lock()
+reload_status = {'state': 'idle'}
+
+# Fields every prediction request must provide
+REQUIRED_FIELDS = [
+    'movie_title', 'director', 'actor1', 'actor2', 'actor3',
+    'budget', 'runtime', 'genres', 'production_companies',
+    'original_language', 'release_year', 'release_month',
+    'avg_rating', 'ratings_count'
+]
+
+# Request fields holding names, which must be JSON strings
+NAME_FIELDS = ['movie_title', 'director', 'actor1', 'actor2', 'actor3']
+
+# Upper bound on the number of movies accepted by /predict/batch
+MAX_BATCH_SIZE = 10000
+
+# /predict/sweep: most grid points per request, and the number of points
+# scored at a time; larger grids are streamed as NDJSON chunks of that size
+MAX_SWEEP_SIZE = int(os.environ.get('MAX_SWEEP_SIZE', 100000))
+SWEEP_CHUNK_ROWS = int(os.environ.get('SWEEP_CHUNK_ROWS', 10000))
+
+# Movie fields a sweep may vary, and the feature each one sets
+SWEEP_FEATURES = {
+    'director': 'director_success_rate',
+    'actor1': 'actor1_success_rate',
+    'actor2': 'actor2_success_rate',
+    'actor3': 'actor3_success_rate',
+    'budget': 'budget',
+    'runtime': 'runtime',
+    'genres': 'genres',
+    'production_companies': 'production_companies',
+    'original_language': 'original_language',
+    'release_year': 'release_year',
+    'release_month': 'release_month',
+    'avg_rating': 'avg_rating',
+    'ratings_count': 'ratings_count'
+}
+
+# Minimum edit-distance similarity for a misspelled name to count as a match
+FUZZY_MATCH_MIN_SCORE = 0.8
+
+# 'pickle' loads saved_model.pkl; 'compiled' memory-maps compiled_model/
+MODEL_FORMAT = os.environ.get('MODEL_FORMAT', 'pickle')
+
+# Pickled model served from the artifacts directory, e.g. a distilled
+# model written by distill_model.py
+MODEL_FILE = os.environ.get('MODEL_FILE', 'saved_model.pkl')
+
+# 'native' evaluates the forest with numpy instead of the sklearn Pipeline
+INFERENCE_ENGINE = os.environ.get('INFERENCE_ENGINE', 'sklearn')
+
+# Probability of success at which a movie is called a HIT; unset keeps the
+# model's own decision (the more probable class). Requests may pass
+# ?threshold= to override it.
+HIT_THRESHOLD = float(os.environ['HIT_THRESHOLD']) if os.environ.get('HIT_THRESHOLD') else None
+
+# Prediction cache: entries (0 disables), TTL in seconds and an optional
+# SQLite file that lets all workers share hits
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 4096))
+PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', 3600))
+PREDICTION_CACHE_DB = os.environ.get('PREDICTION_CACHE_DB')
+
+prediction_cache = PredictionCache(
+    max_entries=PREDICTION_CACHE_SIZE,
+    ttl_seconds=PREDICTION_CACHE_TTL,
+    shared_store=SQLiteCacheStore(PREDICTION_CACHE_DB) if PREDICTION_CACHE_DB else None
+)
+
+# Micro-batching of /predict: concurrent requests arriving within the window
+# are scored with one model call of up to MICRO_BATCH_MAX_ROWS rows (a
+# window of 0 scores every request inline). Requests beyond
+# MICRO_BATCH_QUEUE_LIMIT waiting rows get a 503.
+MICRO_BATCH_WINDOW_MS = float(os.environ.get('MICRO_BATCH_WINDOW_MS', 0))
+MICRO_BATCH_MAX_ROWS = int(os.environ.get('MICRO_BATCH_MAX_ROWS', 256))
+MICRO_BATCH_QUEUE_LIMIT = int(os.environ.get('MICRO_BATCH_QUEUE_LIMIT', 1024))
+MICRO_BATCH_WORKERS = int(os.environ.get('MICRO_BATCH_WORKERS', 1))
+MICRO_BATCH_TIMEOUT = float(os.environ.get('MICRO_BATCH_TIMEOUT', 30))
+
+micro_batcher = None
+micro_batcher_lock = threading.Lock()
+
+# Catalog served by /movies/search, loaded on first use (from the .npz
+# dataset build_dataset.py writes next to it, when that is up to date)
+MOVIES_CSV = os.environ.get(
+    'MOVIES_CSV', os.path.join(os.path.dirname(__file__), '..', 'public', 'final_tmdb_cleaned.csv')
+)
+
+# Content-Encoding and suffix of pre-compressed data files, best first
+PRECOMPRESSED_ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+movie_store = None
+movie_store_lock = threading.Lock()
+
+# Predictions for every catalog movie, made ahead of time (see
+# catalog_predictions.py). A table saved next to the model artifacts by
+# precompute_catalog.py is loaded whenever its bundle is installed. With
+# CATALOG_PREDICTIONS=1 a missing or stale table is also rebuilt in the
+# background, so a new model gets its own table without running the job.
+CATALOG_PREDICTIONS = os.environ.get('CATALOG_PREDICTIONS', '0').lower() in ('1', 'true', 'yes')
+
+catalog_predictions = None
+catalog_refresh_thread = None
+
+# Films a person needs before their success rate is used, when the success
+# tables hold counts (default: the value saved by create_success_rates.py)
+SUCCESS_MIN_COUNT = int(os.environ['SUCCESS_MIN_COUNT']) if os.environ.get('SUCCESS_MIN_COUNT') else None
+
+# Seconds between checks of the artifact files for changes (0 disables the
+# watcher; reloads can still be triggered with POST /admin/reload)
+MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', 0))
+
+# Model registry (see model_registry.py): a directory with one
+# subdirectory of artifacts per named model. Prediction requests pick one
+# with ?model=<name>; at most MODEL_REGISTRY_MAX_LOADED stay loaded next to
+# the served bundle.
+MODEL_REGISTRY = os.environ.get('MODEL_REGISTRY')
+MODEL_REGISTRY_MAX_LOADED = int(os.environ.get('MODEL_REGISTRY_MAX_LOADED', 2))
+
+# Shadow scoring (see shadow_scorer.py): SHADOW_MODEL names a registry model
+# that re-scores SHADOW_SAMPLE_RATE of the served model's /predict and
+# /predict/batch requests in the background, in the gaps between requests.
+# At most SHADOW_QUEUE_LIMIT requests wait for it (more are not shadowed),
+# each for up to SHADOW_MAX_WAIT seconds.
+SHADOW_MODEL = os.environ.get('SHADOW_MODEL')
+SHADOW_SAMPLE_RATE = float(os.environ.get('SHADOW_SAMPLE_RATE', 0.1))
+SHADOW_WORKERS = int(os.environ.get('SHADOW_WORKERS', 1))
+SHADOW_QUEUE_LIMIT = int(os.environ.get('SHADOW_QUEUE_LIMIT', 64))
+SHADOW_MAX_WAIT = float(os.environ.get('SHADOW_MAX_WAIT', 1.0))
+
+model_registry = None
+shadow_scorer = None
+shadow_scorer_lock = threading.Lock()
+
+# Requests this worker is handling; shadow jobs wait for it to reach 0.
+# Metrics scrapes and health checks are not counted
+requests_in_flight = 0
+requests_in_flight_lock = threading.Lock()
+UNCOUNTED_ENDPOINTS = ('metrics_endpoint', 'health_check')
+
+# Shared secret for /admin endpoints, sent as X-Admin-Token. When unset,
+# admin endpoints only accept requests from localhost.
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+# Prometheus metrics served on /metrics. METRICS_ENABLED=0 turns off the
+# per-request timers and counters; /metrics then only shows the cache and
+# model gauges.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1').lower() not in ('0', 'false', 'no')
+
+metrics = MetricsRegistry()
+stage_seconds = metrics.histogram(
+    'movie_predictor_stage_seconds', 'Time spent in each stage of a prediction request',
+    labelnames=('endpoint', 'stage')
+)
+request_seconds = metrics.histogram(
+    'movie_predictor_request_seconds', 'Request latency by endpoint', labelnames=('endpoint',)
+)
+request_bytes = metrics.histogram(
+    'movie_predictor_request_size_bytes', 'Request body size by endpoint', SIZE_BUCKETS, ('endpoint',)
+)
+requests_total = metrics.counter(
+    'movie_predictor_requests_total', 'Requests by endpoint and status code', ('endpoint', 'status')
+)
+batch_rows = metrics.histogram(
+    'movie_predictor_batch_rows', 'Movies per /predict/batch request', [1, 10, 100, 1000, 10000]
+).labels()
+talent_lookups = metrics.counter(
+    'movie_predictor_talent_lookups_total',
+    'Director/actor success rate lookups by how the name matched; method="default" fell back to the default rate',
+    ('role', 'method')
+)
+catalog_lookups = metrics.counter(
+    'movie_predictor_catalog_lookups_total',
+    'Prediction requests looked up in the precomputed catalog table, by whether a catalog movie matched',
+    ('result',)
+)
+model_load_seconds = metrics.histogram(
+    'movie_predictor_model_load_seconds', 'Time to load and smoke-test a model bundle', labelnames=('outcome',)
+)
+metrics.callback('movie_predictor_prediction_cache_hits_total', 'Prediction cache hits (local and shared)', 'counter',
+                 lambda: prediction_cache.hits + prediction_cache.shared_hits)
+metrics.callback('movie_predictor_prediction_cache_misses_total', 'Prediction cache misses', 'counter',
+                 lambda: prediction_cache.misses)
+metrics.callback('movie_predictor_prediction_cache_entries', 'Predictions held in the local cache', 'gauge',
+                 lambda: prediction_cache.stats()['entries'])
+metrics.callback(
+    'movie_predictor_model_info', 'Model bundle being served', 'gauge',
+    lambda: {(bundle.version, bundle.model_format, bundle.model_file, bundle.inference_engine): 1
+             for bundle in [model_bundle] if bundle is not None},
+    ('version', 'model_format', 'model_file', 'inference_engine')
+)
+metrics.callback('movie_predictor_model_loaded_seconds', 'Seconds the served bundle took to load', 'gauge',
+                 lambda: model_bundle.load_seconds if model_bundle is not None else None)
+metrics.callback(
+    'movie_predictor_shadow_rows_total', 'Rows re-scored by the shadow model, by whether its label agreed', 'counter',
+    lambda: {('agreed',): shadow_scorer.agreed, ('disagreed',): shadow_scorer.rows - shadow_scorer.agreed}
+    if shadow_scorer is not None else {},
+    ('result',)
+)
+metrics.callback(
+    'movie_predictor_shadow_skipped_total',
+    'Sampled requests not shadowed: queue full (dropped) or worker never idle (expired)', 'counter',
+    lambda: {('dropped',): shadow_scorer.dropped, ('expired',): shadow_scorer.expired}
+    if shadow_scorer is not None else {},
+    ('reason',)
+)
+metrics.callback('movie_predictor_requests_in_flight', 'Requests this worker is handling', 'gauge',
+                 lambda: requests_in_flight)
+
+stage_histograms = {}
+
+# Sampling profiler (see profiler.py). PROFILE_REQUEST_RATE is the fraction
+# of prediction requests whose stacks are sampled every PROFILE_INTERVAL_MS
+# (0 disables); GET /admin/profile/requests returns them. POST
+# /admin/profile samples the whole worker for a few seconds. PROFILE_STARTUP
+# names a file receiving the collapsed stacks of the model load at startup.
+PROFILE_REQUEST_RATE = float(os.environ.get('PROFILE_REQUEST_RATE', 0))
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', 5))
+PROFILE_STARTUP = os.environ.get('PROFILE_STARTUP')
+PROFILE_MAX_SECONDS = 60
+PROFILED_ENDPOINTS = ('predict', 'predict_batch_endpoint', 'predict_sweep')
+
+request_sampler = None
+request_sampler_lock = threading.Lock()
 
-def load_model_and_data():
-    """Load the saved model and success rate dictionaries using joblib"""
-    global pipeline, director_success_rates, actor1_success_rates, actor2_success_rates, actor3_success_rates
+# Serializes /admin/profile runs; the latest result is kept for GET
+profile_lock = threading.Lock()
+profile_status = {'state': 'idle'}
+last_profile = None
+
+# Movie scored by every freshly loaded bundle before it is swapped in
+SMOKE_TEST_MOVIE = {
+    'movie_title': 'Smoke Test',
+    'director': 'Christopher Nolan',
+    'actor1': 'Leonardo DiCaprio',
+    'actor2': 'Tom Hardy',
+    'actor3': 'Ellen Page',
+    'budget': 160000000,
+    'runtime': 148,
+    'genres': 'Action',
+    'production_companies': 'Warner Bros.',
+    'original_language': 'en',
+    'release_year': 2010,
+    'release_month': 7,
+    'avg_rating': 8.8,
+    'ratings_count': 2500000
+}
+
+def stage_timer(endpoint):
+    """A StageTimer for one request to endpoint, or a no-op one when metrics are off"""
+    if not METRICS_ENABLED:
+        return NULL_TIMER
+    histograms = stage_histograms.get(endpoint)
+    if histograms is None:
+        histograms = stage_histograms.setdefault(endpoint, StageHistograms(stage_seconds, endpoint))
+    return StageTimer(histograms)
+
+def score_features(feature_rows, bundle):
+    """Class probabilities for a list of prepare_features dicts.
+
+    Rows are encoded in the bundle's reusable feature buffers and fed to
+    the native engine or the pipeline's forest without pandas. Pipelines
+    whose preprocessing cannot be exported get one columnar DataFrame.
+    """
+    if bundle.model_input is not None:
+        return bundle.predict_proba_encoded(bundle.model_input.encode(feature_rows))
+    # Build the frame column by column instead of row by row
+    return score_columns({column: [features[column] for features in feature_rows] for column in feature_rows[0]},
+                         bundle)
+
+def score_columns(columns, bundle):
+    """Class probabilities for a dict of equal-length feature columns (lists or arrays)"""
+    if bundle.model_input is not None:
+        return bundle.predict_proba_encoded(bundle.model_input.encode_columns(columns))
+    if bundle.native_model is not None:
+        return bundle.native_model.predict_proba(columns)
+    return bundle.pipeline.predict_proba(pd.DataFrame(columns))
+
+def predicted_classes(probabilities, threshold=None):
+    """Index into classes_ of the predicted class for each row of probabilities.
+
+    Without a threshold this is the argmax, which is what pipeline.predict
+    returns, so one predict_proba call gives both the label and its
+    probability. With a threshold the positive class (index 1) is predicted
+    whenever its probability is at least threshold.
+    """
+    probabilities = np.asarray(probabilities)
+    if threshold is None:
+        return probabilities.argmax(axis=-1)
+    return (probabilities[..., 1] >= threshold).astype(np.intp)
+
+def request_threshold(req):
+    """The ?threshold= of a prediction request, HIT_THRESHOLD when absent.
+
+    Raises ValueError when it is not a number between 0 and 1.
+    """
+    value = req.args.get('threshold')
+    if value is None:
+        return HIT_THRESHOLD
+    threshold = float(value)
+    if not 0 <= threshold <= 1:
+        raise ValueError(f'threshold must be between 0 and 1, got {value}')
+    return threshold
+
+def score_feature_batch(items):
+    """Score (bundle, features) pairs queued by the micro-batcher.
+
+    Pairs are grouped by bundle so rows queued across a reload are still
+    scored by the model that prepared their features.
+    """
+    groups = {}
+    for row, (bundle, features) in enumerate(items):
+        groups.setdefault(id(bundle), (bundle, []))[1].append(row)
+    results = [None] * len(items)
+    for bundle, rows in groups.values():
+        for row, probability in zip(rows, score_features([items[row][1] for row in rows], bundle)):
+            results[row] = probability
+    return results
+
+def get_micro_batcher():
+    """The process's micro-batcher, or None when micro-batching is off.
+
+    Created on first use so that each gunicorn worker starts its own
+    scheduler thread after fork.
+    """
+    global micro_batcher
+    if MICRO_BATCH_WINDOW_MS <= 0:
+        return None
+    batcher = micro_batcher
+    if batcher is None or batcher.pid != os.getpid():
+        with micro_batcher_lock:
+            if micro_batcher is None or micro_batcher.pid != os.getpid():
+                micro_batcher = MicroBatcher(
+                    score_feature_batch,
+                    window_ms=MICRO_BATCH_WINDOW_MS,
+                    max_batch=MICRO_BATCH_MAX_ROWS,
+                    max_queue=MICRO_BATCH_QUEUE_LIMIT,
+                    workers=MICRO_BATCH_WORKERS
+                )
+            batcher = micro_batcher
+    return batcher
+
+def get_request_sampler():
+    """The process's request stack sampler, or None when request profiling is off.
+
+    Created on first use so that each gunicorn worker starts its own
+    sampler thread after fork.
+    """
+    global request_sampler
+    if PROFILE_REQUEST_RATE <= 0:
+        return None
+    sampler = request_sampler
+    if sampler is None or sampler.pid != os.getpid():
+        with request_sampler_lock:
+            if request_sampler is None or request_sampler.pid != os.getpid():
+                request_sampler = Sampler(PROFILE_INTERVAL_MS / 1000, threads=(), thread_names=False).start()
+            sampler = request_sampler
+    return sampler
+
+def run_profile(seconds, interval_ms, idle=False):
+    """Sample every thread of this worker for seconds and keep the result for GET /admin/profile"""
+    global profile_status, last_profile
+    with profile_lock:
+        started_at = datetime.now().isoformat()
+        profile_status = {'state': 'running', 'started_at': started_at, 'seconds': seconds}
+        profile = profile_for(seconds, interval_ms / 1000, idle)
+        last_profile = profile
+        profile_status = {'state': 'done', 'started_at': started_at, 'seconds': seconds, 'samples': profile.samples}
+    return profile
+
+def get_movie_store():
+    """The indexed movie catalog, loading MOVIES_CSV (or its dataset) on first use; None if missing"""
+    global movie_store
+    if movie_store is None:
+        with movie_store_lock:
+            source = preferred_source(MOVIES_CSV)
+            if movie_store is None and os.path.exists(source):
+                start = time.perf_counter()
+                movie_store = MovieStore.from_csv(source)
+                logger.info(f"Movie catalog loaded from {os.path.basename(source)}: {movie_store.size} movies in "
+                            f"{(time.perf_counter() - start) * 1000:.0f} ms")
+    return movie_store
+
+def load_registry_model(artifacts_dir, model_format=None, inference_engine=None, model_file=None):
+    """Load and smoke-test one registry model; options default as for the served bundle"""
+    bundle = load_bundle(artifacts_dir, model_format or MODEL_FORMAT, inference_engine or INFERENCE_ENGINE,
+                         SUCCESS_MIN_COUNT, model_file or MODEL_FILE)
+    validate_bundle(bundle)
+    return bundle
+
+def get_model_registry():
+    """The registry of MODEL_REGISTRY, or None when it is unset"""
+    global model_registry
+    if model_registry is None and MODEL_REGISTRY:
+        model_registry = ModelRegistry(MODEL_REGISTRY, load_registry_model, MODEL_REGISTRY_MAX_LOADED,
+                                       pinned=[SHADOW_MODEL] if SHADOW_MODEL else [])
+    return model_registry
+
+def request_bundle(req):
+    """The bundle a prediction request is scored with: ?model=<name> from the registry, else the served one.
+
+    Raises UnknownModel when the name is not in the registry or there is
+    no registry.
+    """
+    name = req.args.get('model')
+    if not name:
+        return model_bundle
+    registry = get_model_registry()
+    if registry is None:
+        raise UnknownModel(f"Unknown model '{name}'; no MODEL_REGISTRY is configured")
+    return registry.get(name)
+
+def shadow_predictions(movies, bundle, threshold=None):
+    """Labels and probabilities bundle gives request movies, as the shadow candidate"""
+    rows = [prepare_features(movie, bundle=bundle, record_metrics=False) for movie in movies]
+    probabilities = np.asarray(score_features(rows, bundle))
+    return bundle.classes_[predicted_classes(probabilities, threshold)], probabilities
+
+def get_shadow_scorer():
+    """The process's shadow scorer, or None when shadow scoring is off.
+
+    Created on first use so that each gunicorn worker starts its own pool
+    after fork.
+    """
+    global shadow_scorer
+    if not SHADOW_MODEL or SHADOW_SAMPLE_RATE <= 0 or get_model_registry() is None:
+        return None
+    scorer = shadow_scorer
+    if scorer is None or scorer.pid != os.getpid():
+        with shadow_scorer_lock:
+            if shadow_scorer is None or shadow_scorer.pid != os.getpid():
+                shadow_scorer = ShadowScorer(
+                    lambda: get_model_registry().get(SHADOW_MODEL),
+                    shadow_predictions,
+                    sample_rate=SHADOW_SAMPLE_RATE,
+                    workers=SHADOW_WORKERS,
+                    max_queue=SHADOW_QUEUE_LIMIT,
+                    busy=lambda: requests_in_flight > 0,
+                    max_wait=SHADOW_MAX_WAIT
+                )
+            scorer = shadow_scorer
+    return scorer
+
+def validate_bundle(bundle):
+    """Smoke-test a freshly loaded bundle before it serves traffic"""
+    features = prepare_features(SMOKE_TEST_MOVIE, bundle=bundle, record_metrics=False)
+    probabilities = np.asarray(score_features([features], bundle))
+    if probabilities.shape != (1, len(bundle.classes_)):
+        raise ValueError(f'Smoke prediction returned shape {probabilities.shape}')
+    if not np.isfinite(probabilities).all() or abs(probabilities.sum() - 1) > 1e-6:
+        raise ValueError(f'Smoke prediction returned invalid probabilities {probabilities.tolist()}')
+
+def install_bundle(bundle):
+    """Make bundle the one served to new requests"""
+    global model_bundle
+    model_bundle = bundle
+    # Cached predictions belong to the artifacts that produced them
+    prediction_cache.invalidate(bundle.version)
+    start_catalog_refresh(bundle)
+
+def refresh_catalog_predictions(bundle, build=None):
+    """Install the catalog predictions for bundle, building them if needed; returns the table or None.
+
+    A table saved next to bundle's artifacts is used when it was made by
+    the same bundle from the same catalog. Otherwise, when build is set
+    (default: CATALOG_PREDICTIONS), every catalog movie is scored with
+    bundle in one pass and the table saved for the next start. Nothing is
+    installed once another bundle has replaced bundle.
+    """
+    global catalog_predictions
+    store = get_movie_store()
+    if store is None:
+        return None
+    path = os.path.join(bundle.artifacts_dir, CATALOG_PREDICTIONS_FILE)
+    table = load_catalog_predictions(path, bundle.version, store.version)
+    if table is None and (CATALOG_PREDICTIONS if build is None else build):
+        start = time.perf_counter()
+        table = build_catalog_predictions(store, bundle, prepare_features, score_features)
+        logger.info(f"Catalog predictions for version {bundle.version}: {len(table)} movies in "
+                    f"{(time.perf_counter() - start) * 1000:.0f} ms")
+        try:
+            table.save(path)
+        except OSError as e:
+            logger.warning(f"Could not save catalog predictions to {path}: {str(e)}")
+    if table is not None and model_bundle is bundle:
+        catalog_predictions = table
+    return table
+
+def start_catalog_refresh(bundle):
+    """Install the saved catalog predictions for bundle, or build them in a background thread.
+
+    A saved table made by bundle from the current catalog is loaded right
+    away, so the catalog is never scored again for a version it was
+    already scored for. Otherwise, with CATALOG_PREDICTIONS on, a thread
+    builds the table. Returns that thread, or None when nothing is built.
+    """
+    global catalog_refresh_thread
+    catalog_refresh_thread = None
+    saved = os.path.exists(os.path.join(bundle.artifacts_dir, CATALOG_PREDICTIONS_FILE))
+    if saved:
+        try:
+            if refresh_catalog_predictions(bundle, build=False) is not None:
+                return None
+        except Exception as e:
+            logger.error(f"Error loading catalog predictions for version {bundle.version}: {str(e)}")
+    if not CATALOG_PREDICTIONS:
+        return None
     
-    try:
-        # Load the main model
-        model_path = os.path.join(os.path.dirname(__file__), 'saved_model.pkl')
-        if not os.path.exists(model_path):
-            logger.error(f"Model file not found at: {model_path}")
+    def refresh():
+        try:
+            refresh_catalog_predictions(bundle)
+        except Exception as e:
+            logger.error(f"Error computing catalog predictions for version {bundle.version}: {str(e)}")
+    
+    catalog_refresh_thread = threading.Thread(target=refresh, name='catalog-predictions', daemon=True)
+    catalog_refresh_thread.start()
+    return catalog_refresh_thread
+
+def catalog_prediction(cache_key, bundle):
+    """Precomputed probabilities of the catalog movie with these features, or None.
+
+    Only a table made by bundle is consulted, so a request never gets the
+    output of another model.
+    """
+    table = catalog_predictions
+    if table is None or table.model_version != bundle.version:
+        return None
+    probability = table.lookup(cache_key)
+    if METRICS_ENABLED:
+        catalog_lookups.labels('miss' if probability is None else 'hit').inc()
+    return probability
+
+def load_model_and_data(artifacts_dir=None, model_format=None, inference_engine=None, model_file=None):
+    """Load, smoke-test and install a new model bundle.
+
+    Artifacts are read from the backend directory unless artifacts_dir is
+    given. model_format ('pickle' or 'compiled'), inference_engine
+    ('sklearn' or 'native') and the pickled model_file default to the
+    MODEL_FORMAT, INFERENCE_ENGINE and MODEL_FILE env vars; see
+    model_bundle.load_bundle. The new bundle is built off to
+    the side and only replaces the served one after a smoke prediction
+    succeeds, so a failed load leaves the previous model serving. Returns
+    True on success.
+    """
+    if artifacts_dir is None:
+        artifacts_dir = os.path.dirname(__file__)
+    if model_format is None:
+        model_format = MODEL_FORMAT
+    if inference_engine is None:
+        inference_engine = INFERENCE_ENGINE
+    if model_file is None:
+        model_file = MODEL_FILE
+    
+    global reload_status
+    with reload_lock:
+        started_at = datetime.now().isoformat()
+        start = time.perf_counter()
+        reload_status = {'state': 'loading', 'started_at': started_at}
+        try:
+            bundle = load_bundle(artifacts_dir, model_format, inference_engine, SUCCESS_MIN_COUNT, model_file)
+            validate_bundle(bundle)
+        except Exception as e:
+            logger.error(f"Error loading model and data: {str(e)}")
+            model_load_seconds.labels('failed').observe(time.perf_counter() - start)
+            reload_status = {
+                'state': 'failed',
+                'started_at': started_at,
+                'duration_ms': round((time.perf_counter() - start) * 1000, 1),
+                'error': str(e)
+            }
             return False
-            
-        pipeline = joblib.load(model_path)
-        logger.info("Main model loaded successfully")
         
-        # Load success rate dictionaries
-        director_path = os.path.join(os.path.dirname(__file__), 'director_success.joblib')
-        actor1_path = os.path.join(os.path.dirname(__file__), 'actor1_success.joblib')
-        actor2_path = os.path.join(os.path.dirname(__file__), 'actor2_success.joblib')
-        actor3_path = os.path.join(os.path.dirname(__file__), 'actor3_success.joblib')
-        
-        # Load director success rates
-        if os.path.exists(director_path):
-            director_success_rates = joblib.load(director_path)
-            logger.info(f"Director success rates loaded: {len(director_success_rates)} entries")
-        else:
-            logger.warning(f"Director success rates file not found at: {director_path}")
-            director_success_rates = {}
-        
-        # Load actor success rates
-        if os.path.exists(actor1_path):
-            actor1_success_rates = joblib.load(actor1_path)
-            logger.info(f"Actor1 success rates loaded: {len(actor1_success_rates)} entries")
-        else:
-            logger.warning(f"Actor1 success rates file not found at: {actor1_path}")
-            actor1_success_rates = {}
-            
-        if os.path.exists(actor2_path):
-            actor2_success_rates = joblib.load(actor2_path)
-            logger.info(f"Actor2 success rates loaded: {len(actor2_success_rates)} entries")
-        else:
-            logger.warning(f"Actor2 success rates file not found at: {actor2_path}")
-            actor2_success_rates = {}
-            
-        if os.path.exists(actor3_path):
-            actor3_success_rates = joblib.load(actor3_path)
-            logger.info(f"Actor3 success rates loaded: {len(actor3_success_rates)} entries")
-        else:
-            logger.warning(f"Actor3 success rates file not found at: {actor3_path}")
-            actor3_success_rates = {}
-        
-        logger.info("All model and success rate data loaded successfully")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Error loading model and data: {str(e)}")
-        return False
+        previous = model_bundle
+        install_bundle(bundle)
+        model_load_seconds.labels('succeeded').observe(time.perf_counter() - start)
+        reload_status = {
+            'state': 'succeeded',
+            'started_at': started_at,
+            'duration_ms': round((time.perf_counter() - start) * 1000, 1),
+            'version': bundle.version,
+            'previous_version': previous.version if previous is not None else None
+        }
+    
+    logger.info(f"All model and success rate data loaded successfully (version {bundle.version}, "
+                f"{bundle.load_seconds * 1000:.0f} ms)")
+    return True
 
-def get_success_rate(name, success_rates_dict, default_rate=0.5):
-    """Get success rate for a person, handling missing keys gracefully"""
+def load_model_at_startup(*args, **kwargs):
+    """load_model_and_data, with its stacks sampled into PROFILE_STARTUP when that is set"""
+    if not PROFILE_STARTUP:
+        return load_model_and_data(*args, **kwargs)
+    with Sampler(PROFILE_INTERVAL_MS / 1000, threads={threading.get_ident()}, thread_names=False) as sampler:
+        loaded = load_model_and_data(*args, **kwargs)
+    write_collapsed(sampler.profile, PROFILE_STARTUP)
+    logger.info(f"Startup profile: {sampler.profile.samples} samples over {sampler.profile.duration * 1000:.0f} ms "
+                f"written to {PROFILE_STARTUP}")
+    for row in sampler.profile.top(10):
+        logger.info(f"  {row['self_percent']:5.1f}% self {row['total_percent']:5.1f}% total  {row['frame']}")
+    return loaded
+
+def reload_from(bundle):
+    """Reload from the same directory, format, engine and model file as bundle"""
+    return load_model_and_data(bundle.artifacts_dir, bundle.model_format, bundle.inference_engine, bundle.model_file)
+
+def start_artifact_watcher(interval=None):
+    """Start a background thread reloading the model when its files change"""
+    interval = MODEL_WATCH_INTERVAL if interval is None else interval
+    if interval <= 0:
+        return None
+    watcher = ArtifactWatcher(lambda: model_bundle, reload_from, interval)
+    watcher.start()
+    logger.info(f"Watching model artifacts for changes every {interval:g}s")
+    return watcher
+
+def resolve_talent(name, success_rates_dict, default_rate=0.5):
+    """Resolve a person's name against a success rate table.
+
+    Returns (rate, match) where match records the table entry that was used
+    and how it was found: 'exact', 'normalized' (case/accent/whitespace
+    differences), 'fuzzy' (closest name by edit-distance similarity of at
+    least FUZZY_MATCH_MIN_SCORE) or 'default' when nothing matched.
+    """
     if not name or not name.strip():
-        return default_rate
+        return default_rate, {'input': name, 'matched': None, 'score': 0.0, 'method': 'default'}
     
     # Try exact match first
-    if name in success_rates_dict:
-        return success_rates_dict[name]
+    rate = success_rates_dict.get(name)
+    if rate is not None:
+        return rate, {'input': name, 'matched': name, 'score': 1.0, 'method': 'exact'}
     
-    # Try case-insensitive match
-    name_lower = name.lower().strip()
-    for key, value in success_rates_dict.items():
-        if key.lower().strip() == name_lower:
-            return value
+    # Tables loaded by load_model_and_data carry a normalized-name index
+    if isinstance(success_rates_dict, (NameIndex, RoleRates)):
+        key = success_rates_dict.normalized_key(name)
+        if key is not None:
+            return success_rates_dict[key], {'input': name, 'matched': key, 'score': 1.0, 'method': 'normalized'}
+        
+        match = success_rates_dict.fuzzy_lookup(name, FUZZY_MATCH_MIN_SCORE)
+        if match is not None:
+            key, score = match
+            return success_rates_dict[key], {'input': name, 'matched': key, 'score': round(score, 3), 'method': 'fuzzy'}
+    else:
+        # Fall back to a normalized scan for plain dictionaries
+        name_normalized = normalize_name(name)
+        for key, value in success_rates_dict.items():
+            if normalize_name(key) == name_normalized:
+                return value, {'input': name, 'matched': key, 'score': 1.0, 'method': 'normalized'}
     
     # Return default if not found
-    return default_rate
+    return default_rate, {'input': name, 'matched': None, 'score': 0.0, 'method': 'default'}
+
+def get_success_rate(name, success_rates_dict, default_rate=0.5):
+    """Get success rate for a person, handling missing keys gracefully"""
+    return resolve_talent(name, success_rates_dict, default_rate)[0]
 
-def prepare_features(movie_data):
-    """Prepare features for prediction using the loaded success rates"""
+def prepare_features(movie_data, talent_matches=None, bundle=None, record_metrics=True):
+    """Prepare features for prediction using the loaded success rates.
+
+    Success rates come from bundle, or the currently served bundle when it
+    is None. If talent_matches is a dict it is filled with the
+    resolve_talent match for the director and each actor. Talent lookups
+    are counted in the metrics unless record_metrics is False, as for
+    shadow scoring, which re-scores movies already counted.
+    """
+    if bundle is None:
+        bundle = model_bundle
     try:
         # Get director success rate
         director = movie_data.get('director', '')
-        director_success_rate = get_success_rate(director, director_success_rates)
+        director_success_rate, director_match = resolve_talent(director, bundle.director_success_rates)
         
         # Get actor success rates
         actor1 = movie_data.get('actor1', '')
         actor2 = movie_data.get('actor2', '')
         actor3 = movie_data.get('actor3', '')
         
-        actor1_success_rate = get_success_rate(actor1, actor1_success_rates)
-        actor2_success_rate = get_success_rate(actor2, actor2_success_rates)
-        actor3_success_rate = get_success_rate(actor3, actor3_success_rates)
+        actor1_success_rate, actor1_match = resolve_talent(actor1, bundle.actor1_success_rates)
+        actor2_success_rate, actor2_match = resolve_talent(actor2, bundle.actor2_success_rates)
+        actor3_success_rate, actor3_match = resolve_talent(actor3, bundle.actor3_success_rates)
+        
+        if METRICS_ENABLED and record_metrics:
+            talent_lookups.labels('director', director_match['method']).inc()
+            talent_lookups.labels('actor1', actor1_match['method']).inc()
+            talent_lookups.labels('actor2', actor2_match['method']).inc()
+            talent_lookups.labels('actor3', actor3_match['method']).inc()
         
-        # Create features DataFrame that matches the training data format
-        features = {
-            'budget': float(movie_data.get('budget', 0)),
-            'runtime': float(movie_data.get('runtime', 0)),
-            'release_year': int(movie_data.get('release_year', 2024)),
-            'release_month': int(movie_data.get('release_month', 6)),
-            'avg_rating': float(movie_data.get('avg_rating', 7.0)),
-            'ratings_count': int(movie_data.get('ratings_count', 1000)),
+        if talent_matches is not None:
+            talent_matches.update({
+                'director': director_match,
+                'actor1': actor1_match,
+                'actor2': actor2_match,
+                'actor3': actor3_match
+            })
+        
+        # Typed, ordered and defaulted as the model was trained
+        features = FEATURE_SCHEMA.coerce(movie_data, {
             'director_success_rate': director_success_rate,
             'actor1_success_rate': actor1_success_rate,
             'actor2_success_rate': actor2_success_rate,
-            'actor3_success_rate': actor3_success_rate,
-            'genres': str(movie_data.get('genres', 'Drama')),
-            'original_language': str(movie_data.get('original_language', 'en')),
-            'production_companies': str(movie_data.get('production_companies', 'Independent'))
-        }
+            'actor3_success_rate': actor3_success_rate
+        })
         
         return features
         
@@ -135,14 +744,290 @@ def prepare_features(movie_data):
         logger.error(f"Error preparing features: {str(e)}")
         raise
 
+def explain_features(features):
+    """Build the human-readable list of factors behind a prediction"""
+    factors = []
+    if features['director_success_rate'] > 0.7:
+        factors.append(f"Strong director track record ({features['director_success_rate']:.1%})")
+    if features['actor1_success_rate'] > 0.7:
+        factors.append(f"Lead actor success rate ({features['actor1_success_rate']:.1%})")
+    if features['budget'] > 100000000:
+        factors.append("High production budget")
+    elif features['budget'] < 20000000:
+        factors.append("Low budget risk")
+    if features['avg_rating'] > 7.5:
+        factors.append(f"High audience rating ({features['avg_rating']:.1f}/10)")
+    if features['genres'] in ['Action', 'Adventure', 'Comedy']:
+        factors.append("Popular genre")
+
+    if not factors:
+        factors = ["Standard market conditions"]
+
+    return factors
+
+def predict_batch(movies, bundle=None, timer=NULL_TIMER, threshold=None):
+    """Score many movies with a single vectorized pipeline call.
+
+    Each movie is validated and turned into features independently, so a bad
+    row only produces an error entry for that row. Valid rows are assembled
+    into one columnar DataFrame and scored with a single predict_proba call;
+    labels come from predicted_classes with threshold (default:
+    HIT_THRESHOLD), exactly as predict() does.
+    Catalog movies and rows already in the prediction cache are not
+    re-scored. Results are
+    returned in input order. All rows are scored by the same bundle (default:
+    the one being served). Stages are recorded on timer.
+    """
+    if bundle is None:
+        bundle = model_bundle
+    if bundle is None:
+        raise RuntimeError('Model not loaded')
+    if threshold is None:
+        threshold = HIT_THRESHOLD
+
+    results = [None] * len(movies)
+    valid_indices = []
+    valid_features = []
+    valid_matches = []
+
+    for index, movie in enumerate(movies):
+        if not isinstance(movie, dict):
+            results[index] = {'index': index, 'error': 'Movie must be a JSON object'}
+            continue
+
+        missing_fields = [field for field in REQUIRED_FIELDS if field not in movie]
+        if missing_fields:
+            results[index] = {'index': index, 'error': f'Missing required fields: {missing_fields}'}
+            continue
+        not_strings = [field for field in NAME_FIELDS if not isinstance(movie[field], str)]
+        if not_strings:
+            results[index] = {'index': index, 'error': f'Fields must be strings: {not_strings}'}
+            continue
+
+        talent_matches = {}
+        try:
+            features = prepare_features(movie, talent_matches, bundle)
+        except (TypeError, ValueError) as e:
+            results[index] = {'index': index, 'error': f'Invalid field value: {str(e)}'}
+            continue
+
+        valid_indices.append(index)
+        valid_features.append(features)
+        valid_matches.append(talent_matches)
+    timer.mark('features')
+
+    if valid_features:
+        # Only rows that are neither catalog movies nor in the prediction
+        # cache go to the model
+        probabilities = np.empty((len(valid_features), len(bundle.classes_)), dtype=np.float64)
+        cache_keys = [feature_key(features) for features in valid_features]
+        misses = []
+        for row, cache_key in enumerate(cache_keys):
+            probability = catalog_prediction(cache_key, bundle)
+            if probability is None:
+                cached = prediction_cache.get(cache_key, namespace=bundle.version)
+                probability = None if cached is None else cached['probability']
+            if probability is None:
+                misses.append(row)
+            else:
+                probabilities[row] = probability
+        timer.mark('cache')
+
+        if misses:
+            scored = score_features([valid_features[row] for row in misses], bundle)
+            timer.mark('score')
+            probabilities[misses] = scored
+            for row, probability in zip(misses, scored):
+                prediction_cache.set(cache_keys[row], {
+                    'probability': probability.tolist()
+                }, namespace=bundle.version)
+            timer.mark('cache_store')
+
+        best = predicted_classes(probabilities, threshold)
+        labels = bundle.classes_[best]
+
+        # A sample of the served model's traffic is re-scored by the shadow
+        # candidate in the background
+        shadow = get_shadow_scorer() if bundle is model_bundle else None
+        if shadow is not None and shadow.sample():
+            shadow.submit([movies[index] for index in valid_indices], labels, probabilities, threshold)
+
+        for row, index in enumerate(valid_indices):
+            features = valid_features[row]
+            hit_probability = float(probabilities[row, best[row]])
+            results[index] = {
+                'index': index,
+                'movie_title': movies[index]['movie_title'],
+                'prediction': "HIT" if labels[row] == 1 else "FLOP",
+                'probability': round(hit_probability, 3),
+                'confidence': round(hit_probability * 100, 1),
+                'features_used': explain_features(features),
+                'talent_matches': valid_matches[row]
+            }
+        timer.mark('results')
+
+    return results
+
+def parse_batch_body(req):
+    """Parse a /predict/batch body given as a JSON array or as NDJSON.
+
+    Returns (movies, errors) where errors maps the line index of NDJSON lines
+    that could not be decoded to an error message.
+    """
+    body = req.get_data(as_text=True)
+    content_type = (req.mimetype or '').lower()
+
+    if content_type not in ('application/x-ndjson', 'application/jsonl'):
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = None
+        if isinstance(data, list):
+            return data, {}
+        if isinstance(data, dict) and isinstance(data.get('movies'), list):
+            return data['movies'], {}
+        if content_type == 'application/json':
+            raise ValueError('Expected a JSON array of movies')
+
+    movies = []
+    errors = {}
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        try:
+            movies.append(json.loads(line))
+        except ValueError as e:
+            errors[len(movies)] = f'Invalid JSON: {str(e)}'
+            movies.append(None)
+    return movies, errors
+
+def sweep_axis_length(field, spec):
+    """Number of values of one sweep axis, checked before any of them are built.
+
+    spec is a JSON list, or {"start", "stop", "num"} for evenly spaced numbers.
+    """
+    if isinstance(spec, dict) and set(spec) == {'start', 'stop', 'num'}:
+        num = spec['num']
+        if isinstance(num, bool) or not isinstance(num, int) or num < 1:
+            raise ValueError(f'{field}: num must be a positive integer')
+        return num
+    if isinstance(spec, list):
+        if not spec:
+            raise ValueError(f'{field}: no values given')
+        return len(spec)
+    raise ValueError(f'{field}: expected a list of values or {{"start", "stop", "num"}}')
+
+def sweep_axis_values(field, spec):
+    """Values of one sweep axis whose spec passed sweep_axis_length"""
+    if isinstance(spec, dict):
+        return np.linspace(float(spec['start']), float(spec['stop']), spec['num']).tolist()
+    return spec
+
+def prepare_sweep_axes(movie, axes, bundle):
+    """Feature values for every value of every sweep axis.
+
+    Each value goes through prepare_features with the rest of the base
+    movie, so it is converted and its talent resolved exactly as /predict
+    would. These probes are not counted as talent lookups; the request's
+    base movie already was. Returns a list of (field, feature, feature values, talent
+    matches or None) in axis order.
+    """
+    prepared = []
+    for field, values in axes.items():
+        feature = SWEEP_FEATURES[field]
+        feature_values = []
+        matches = [] if feature != field else None
+        for value in values:
+            talent_matches = {}
+            probe = prepare_features({**movie, field: value}, talent_matches, bundle, record_metrics=False)
+            feature_values.append(probe[feature])
+            if matches is not None:
+                matches.append(talent_matches[field])
+        prepared.append((field, feature, feature_values, matches))
+    return prepared
+
+def score_sweep(base, axes, bundle, chunk_rows):
+    """Yield (offset, class probabilities) over the Cartesian grid of axes.
+
+    base is the prepare_features dict of the base movie and axes a list of
+    (feature, feature values). Points are numbered in C order (the last
+    axis varies fastest) and scored chunk_rows at a time, with every column
+    built by indexing the axis values rather than row by row.
+    """
+    shape = [len(values) for _, values in axes]
+    total = int(np.prod(shape))
+    strides = [int(np.prod(shape[axis + 1:])) for axis in range(len(shape))]
+    axis_arrays = {feature: np.asarray(values, dtype=object if isinstance(values[0], str) else None)
+                   for feature, values in axes}
+    for start in range(0, total, chunk_rows):
+        points = np.arange(start, min(start + chunk_rows, total))
+        columns = {}
+        for feature, value in base.items():
+            columns[feature] = [value] * len(points) if isinstance(value, str) else np.full(len(points), value)
+        for (feature, _), stride, size in zip(axes, strides, shape):
+            column = axis_arrays[feature][points // stride % size]
+            columns[feature] = column.tolist() if column.dtype == object else column
+        yield start, np.asarray(score_columns(columns, bundle))
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    if PROFILE_REQUEST_RATE > 0 and request.endpoint in PROFILED_ENDPOINTS and random.random() < PROFILE_REQUEST_RATE:
+        get_request_sampler().add_thread(threading.get_ident())
+        g.profiled = True
+
+@app.before_request
+def count_request_start():
+    global requests_in_flight
+    if request.endpoint in UNCOUNTED_ENDPOINTS:
+        return
+    with requests_in_flight_lock:
+        requests_in_flight += 1
+    g.in_flight = True
+
+@app.teardown_request
+def count_request_end(exc):
+    global requests_in_flight
+    if g.get('in_flight'):
+        with requests_in_flight_lock:
+            requests_in_flight -= 1
+
+@app.teardown_request
+def stop_request_profile(exc):
+    if g.get('profiled'):
+        get_request_sampler().remove_thread(threading.get_ident())
+
+@app.after_request
+def record_request_metrics(response):
+    """Latency, size and status of every request routed to an endpoint"""
+    endpoint = request.endpoint
+    if METRICS_ENABLED and endpoint is not None and 'request_start' in g:
+        request_seconds.labels(endpoint).observe(time.perf_counter() - g.request_start)
+        requests_total.labels(endpoint, str(response.status_code)).inc()
+        if request.content_length:
+            request_bytes.labels(endpoint).observe(request.content_length)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Counters and histograms of this worker in the Prometheus text format"""
+    return app.response_class(metrics.render(), content_type=CONTENT_TYPE)
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
+    bundle = model_bundle
     return jsonify({
         'status': 'healthy',
-        'model_loaded': pipeline is not None,
-        'director_success_rates_loaded': director_success_rates is not None,
-        'actor_success_rates_loaded': all([actor1_success_rates, actor2_success_rates, actor3_success_rates]),
+        'model_loaded': bundle is not None,
+        'director_success_rates_loaded': bundle is not None,
+        'actor_success_rates_loaded': bundle is not None and all([
+            bundle.actor1_success_rates, bundle.actor2_success_rates, bundle.actor3_success_rates
+        ]),
+        'model_version': bundle.version if bundle is not None else None,
+        'model_loaded_at': bundle.loaded_at if bundle is not None else None,
+        'load_duration_ms': round(bundle.load_seconds * 1000, 1) if bundle is not None else None,
+        'reload': reload_status,
         'timestamp': datetime.now().isoformat()
     })
 
@@ -158,67 +1043,95 @@ def predict():
         return response
     
     try:
-        # Check if model is loaded
-        if pipeline is None:
+        timer = stage_timer('predict')
+        
+        # Check if model is loaded (or the one ?model= names)
+        try:
+            bundle = request_bundle(request)
+        except UnknownModel as e:
+            return jsonify({'error': str(e)}), 400
+        if bundle is None:
             return jsonify({
                 'error': 'Model not loaded. Please ensure saved_model.pkl is available.'
             }), 500
         
         # Get JSON data from request
         data = request.get_json()
+        timer.mark('parse')
         
         if not data:
             return jsonify({'error': 'No JSON data provided'}), 400
         
         # Validate required fields
-        required_fields = [
-            'movie_title', 'director', 'actor1', 'actor2', 'actor3', 
-            'budget', 'runtime', 'genres', 'production_companies', 
-            'original_language', 'release_year', 'release_month', 
-            'avg_rating', 'ratings_count'
-        ]
-        
-        missing_fields = [field for field in required_fields if field not in data]
+        missing_fields = [field for field in REQUIRED_FIELDS if field not in data]
         if missing_fields:
             return jsonify({
                 'error': f'Missing required fields: {missing_fields}'
             }), 400
         
+        not_strings = [field for field in NAME_FIELDS if not isinstance(data[field], str)]
+        if not_strings:
+            return jsonify({
+                'error': f'Fields must be strings: {not_strings}'
+            }), 400
+        
+        try:
+            threshold = request_threshold(request)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         # Prepare features
-        features = prepare_features(data)
+        talent_matches = {}
+        try:
+            features = prepare_features(data, talent_matches, bundle)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': f'Invalid field value: {str(e)}'}), 400
+        timer.mark('features')
         
-        # Convert to DataFrame for prediction
-        feature_df = pd.DataFrame([features])
+        # Catalog movies were scored ahead of time; otherwise reuse the model
+        # output if these exact features were scored recently
+        cache_key = feature_key(features)
+        precomputed = catalog_prediction(cache_key, bundle)
+        cached = prediction_cache.get(cache_key, namespace=bundle.version) if precomputed is None else None
+        batcher = get_micro_batcher()
+        timer.mark('cache')
+        if precomputed is not None:
+            probability = precomputed
+        elif cached is not None:
+            probability = np.asarray(cached['probability'])
+        elif batcher is not None:
+            # Scored together with other requests arriving at the same time
+            probability = batcher.submit((bundle, features)).result(timeout=MICRO_BATCH_TIMEOUT)
+            timer.mark('micro_batch')
+        else:
+            # One pass through the preprocessor and the forest: the label is
+            # derived from the probabilities rather than a second predict()
+            probability = score_features([features], bundle)[0]
+            timer.mark('score')
         
-        # Make prediction
-        prediction = pipeline.predict(feature_df)[0]
-        probability = pipeline.predict_proba(feature_df)[0]
+        if precomputed is None and cached is None:
+            prediction_cache.set(cache_key, {
+                'probability': np.asarray(probability).tolist()
+            }, namespace=bundle.version)
+            timer.mark('cache_store')
         
         # Convert prediction to HIT/FLOP
+        best = predicted_classes(probability, threshold)
+        prediction = bundle.classes_[best]
         result = "HIT" if prediction == 1 else "FLOP"
         
         # Get probability for the predicted class
-        hit_probability = probability[1] if prediction == 1 else probability[0]
+        hit_probability = float(probability[best])
         
-        # Create meaningful factors list
-        factors = []
-        if features['director_success_rate'] > 0.7:
-            factors.append(f"Strong director track record ({features['director_success_rate']:.1%})")
-        if features['actor1_success_rate'] > 0.7:
-            factors.append(f"Lead actor success rate ({features['actor1_success_rate']:.1%})")
-        if features['budget'] > 100000000:
-            factors.append("High production budget")
-        elif features['budget'] < 20000000:
-            factors.append("Low budget risk")
-        if features['avg_rating'] > 7.5:
-            factors.append(f"High audience rating ({features['avg_rating']:.1f}/10)")
-        if features['genres'] in ['Action', 'Adventure', 'Comedy']:
-            factors.append("Popular genre")
+        shadow = get_shadow_scorer() if bundle is model_bundle else None
+        if shadow is not None and shadow.sample():
+            shadow.submit([data], [prediction], np.asarray(probability)[np.newaxis], threshold)
         
-        if not factors:
-            factors = ["Standard market conditions"]
+        # Create meaningful factors list
+        factors = explain_features(features)
         
         logger.info(f"Prediction for '{data['movie_title']}': {result} (probability: {hit_probability:.3f})")
+        timer.mark('explain')
         
         response_data = {
             'movie_title': data['movie_title'],
@@ -226,13 +1139,24 @@ def predict():
             'probability': round(hit_probability, 3),
             'confidence': round(hit_probability * 100, 1),
             'features_used': factors,
+            'talent_matches': talent_matches,
             'timestamp': datetime.now().isoformat()
         }
+        if request.args.get('model'):
+            response_data['model'] = {'name': request.args['model'], 'version': bundle.version}
         
         response = jsonify(response_data)
         response.headers.add('Access-Control-Allow-Origin', '*')
+        timer.mark('serialize')
         return response
         
+    except Overloaded as e:
+        logger.warning(f"Rejecting prediction: {str(e)}")
+        error_response = jsonify({'error': f'Server busy: {str(e)}'})
+        error_response.headers.add('Access-Control-Allow-Origin', '*')
+        error_response.headers.add('Retry-After', '1')
+        return error_response, 503
+        
     except Exception as e:
         logger.error(f"Error during prediction: {str(e)}")
         error_response = jsonify({
@@ -241,33 +1165,490 @@ def predict():
         error_response.headers.add('Access-Control-Allow-Origin', '*')
         return error_response, 500
 
+@app.route('/predict/batch', methods=['POST', 'OPTIONS'])
+def predict_batch_endpoint():
+    """Predict success for many movies in one request.
+
+    Accepts a JSON array of movie objects (or {"movies": [...]}) or an NDJSON
+    body with one movie per line. Each entry in the response carries either a
+    prediction or the validation error for that row.
+    """
+    # Handle preflight requests
+    if request.method == 'OPTIONS':
+        response = jsonify({'status': 'ok'})
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        response.headers.add('Access-Control-Allow-Headers', 'Content-Type')
+        response.headers.add('Access-Control-Allow-Methods', 'POST')
+        return response
+
+    try:
+        timer = stage_timer('predict_batch')
+
+        # Check if model is loaded (or the one ?model= names)
+        try:
+            bundle = request_bundle(request)
+        except UnknownModel as e:
+            return jsonify({'error': str(e)}), 400
+        if bundle is None:
+            return jsonify({
+                'error': 'Model not loaded. Please ensure saved_model.pkl is available.'
+            }), 500
+
+        try:
+            movies, parse_errors = parse_batch_body(request)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        timer.mark('parse')
+
+        if not movies:
+            return jsonify({'error': 'No movies provided'}), 400
+
+        if len(movies) > MAX_BATCH_SIZE:
+            return jsonify({
+                'error': f'Batch too large: {len(movies)} movies (maximum {MAX_BATCH_SIZE})'
+            }), 413
+
+        try:
+            threshold = request_threshold(request)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if METRICS_ENABLED:
+            batch_rows.observe(len(movies))
+        results = predict_batch(movies, bundle, timer, threshold)
+        for index, message in parse_errors.items():
+            results[index] = {'index': index, 'error': message}
+
+        error_count = sum(1 for result in results if 'error' in result)
+        logger.info(f"Batch prediction for {len(movies)} movies ({error_count} invalid)")
+
+        response_data = {
+            'results': results,
+            'count': len(results),
+            'error_count': error_count,
+            'timestamp': datetime.now().isoformat()
+        }
+        if request.args.get('model'):
+            response_data['model'] = {'name': request.args['model'], 'version': bundle.version}
+        response = jsonify(response_data)
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        timer.mark('serialize')
+        return response
+
+    except Exception as e:
+        logger.error(f"Error during batch prediction: {str(e)}")
+        error_response = jsonify({
+            'error': f'Batch prediction failed: {str(e)}'
+        })
+        error_response.headers.add('Access-Control-Allow-Origin', '*')
+        return error_response, 500
+
+@app.route('/predict/sweep', methods=['POST', 'OPTIONS'])
+def predict_sweep():
+    """What-if grid: success probability of one movie across the values of some fields.
+
+    The body holds a base movie and the axes to vary, e.g.
+    {"movie": {...}, "axes": {"budget": {"start": 1e6, "stop": 2e8, "num": 50},
+    "release_month": [1, 2, ..., 12], "actor1": ["Tom Hanks", "Emma Stone"]}}.
+    The Cartesian product of the axes (at most MAX_SWEEP_SIZE points) is
+    scored in vectorized chunks. The response holds the success
+    probabilities as a nested list indexed like the axes. Grids over
+    SWEEP_CHUNK_ROWS points, or any with ?stream=true, are sent as NDJSON:
+    a header line, one line of flat probabilities per chunk and a summary.
+    """
+    # Handle preflight requests
+    if request.method == 'OPTIONS':
+        response = jsonify({'status': 'ok'})
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        response.headers.add('Access-Control-Allow-Headers', 'Content-Type')
+        response.headers.add('Access-Control-Allow-Methods', 'POST')
+        return response
+
+    try:
+        timer = stage_timer('predict_sweep')
+
+        # Check if model is loaded (or the one ?model= names)
+        try:
+            bundle = request_bundle(request)
+        except UnknownModel as e:
+            return jsonify({'error': str(e)}), 400
+        if bundle is None:
+            return jsonify({
+                'error': 'Model not loaded. Please ensure saved_model.pkl is available.'
+            }), 500
+
+        data = request.get_json(silent=True)
+        timer.mark('parse')
+        if not isinstance(data, dict) or not isinstance(data.get('movie'), dict):
+            return jsonify({'error': 'Expected {"movie": {...}, "axes": {...}}'}), 400
+        movie = data['movie']
+        axes = data.get('axes')
+        if not isinstance(axes, dict) or not axes:
+            return jsonify({'error': 'axes must map movie fields to the values to try'}), 400
+
+        missing_fields = [field for field in REQUIRED_FIELDS if field not in movie and field not in axes]
+        if missing_fields:
+            return jsonify({'error': f'Missing required fields: {missing_fields}'}), 400
+        unknown = [field for field in axes if field not in SWEEP_FEATURES]
+        if unknown:
+            return jsonify({'error': f'Cannot sweep {unknown}; choose from {list(SWEEP_FEATURES)}'}), 400
+
+        try:
+            threshold = request_threshold(request)
+            # Check the grid size from the axis lengths alone, so an oversized
+            # num is rejected before np.linspace allocates it
+            size = 1
+            for field, spec in axes.items():
+                size *= sweep_axis_length(field, spec)
+                if size > MAX_SWEEP_SIZE:
+                    return jsonify({
+                        'error': f'Sweep too large: at least {size} points (maximum {MAX_SWEEP_SIZE})'
+                    }), 413
+            axes = {field: sweep_axis_values(field, spec) for field, spec in axes.items()}
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+        shape = [len(values) for values in axes.values()]
+
+        not_strings = [field for field in NAME_FIELDS
+                       if field in movie and field not in axes and not isinstance(movie[field], str)]
+        not_strings += [field for field in NAME_FIELDS
+                        if field in axes and not all(isinstance(value, str) for value in axes[field])]
+        if not_strings:
+            return jsonify({'error': f'Fields must be strings: {not_strings}'}), 400
+
+        # Fields being swept only need a placeholder in the base movie
+        movie = {**{field: values[0] for field, values in axes.items() if field not in movie}, **movie}
+        talent_matches = {}
+        try:
+            base = prepare_features(movie, talent_matches, bundle)
+            prepared = prepare_sweep_axes(movie, axes, bundle)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': f'Invalid field value: {str(e)}'}), 400
+        for field in axes:
+            talent_matches.pop(field, None)
+        timer.mark('features')
+
+        header = {
+            'movie_title': movie['movie_title'],
+            'axes': [{'field': field, 'values': axes[field], **({'talent_matches': matches} if matches else {})}
+                     for field, _, _, matches in prepared],
+            'shape': shape,
+            'count': size,
+            'threshold': threshold,
+            'talent_matches': talent_matches
+        }
+        grid_axes = [(feature, feature_values) for _, feature, feature_values, _ in prepared]
+
+        def summary(best_point, best_probability, hits):
+            index = np.unravel_index(best_point, shape)
+            return {
+                'best': {
+                    'values': {field: axes[field][i] for field, i in zip(axes, map(int, index))},
+                    'probability': round(float(best_probability), 4)
+                },
+                'hit_count': hits
+            }
+
+        def chunk_stats(probabilities):
+            """Best point, its success probability and the HIT count of one chunk"""
+            hits = int((bundle.classes_[predicted_classes(probabilities, threshold)] == 1).sum())
+            best = int(probabilities[:, 1].argmax())
+            return best, probabilities[best, 1], hits
+
+        if size <= SWEEP_CHUNK_ROWS and request.args.get('stream', '').lower() not in ('1', 'true', 'yes'):
+            probabilities = next(score_sweep(base, grid_axes, bundle, size))[1]
+            timer.mark('score')
+            best, best_probability, hits = chunk_stats(probabilities)
+            response = jsonify({
+                **header,
+                'probabilities': np.round(probabilities[:, 1], 4).reshape(shape).tolist(),
+                **summary(best, best_probability, hits),
+                'timestamp': datetime.now().isoformat()
+            })
+            response.headers.add('Access-Control-Allow-Origin', '*')
+            timer.mark('serialize')
+            return response
+
+        def generate():
+            yield json.dumps(header) + '\n'
+            best, best_probability, hits = 0, -1.0, 0
+            try:
+                for offset, probabilities in score_sweep(base, grid_axes, bundle, SWEEP_CHUNK_ROWS):
+                    chunk_best, chunk_probability, chunk_hits = chunk_stats(probabilities)
+                    if chunk_probability > best_probability:
+                        best, best_probability = offset + chunk_best, chunk_probability
+                    hits += chunk_hits
+                    yield json.dumps({'offset': offset, 'probabilities': np.round(probabilities[:, 1], 4).tolist()}) + '\n'
+            except Exception as e:
+                logger.error(f"Error during streamed sweep: {str(e)}")
+                yield json.dumps({'error': f'Sweep failed: {str(e)}'}) + '\n'
+                return
+            yield json.dumps({**summary(best, best_probability, hits), 'timestamp': datetime.now().isoformat()}) + '\n'
+
+        logger.info(f"Streaming sweep of {size} points for '{movie['movie_title']}'")
+        response = app.response_class(generate(), mimetype='application/x-ndjson')
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+
+    except Exception as e:
+        logger.error(f"Error during sweep: {str(e)}")
+        error_response = jsonify({
+            'error': f'Sweep failed: {str(e)}'
+        })
+        error_response.headers.add('Access-Control-Allow-Origin', '*')
+        return error_response, 500
+
 @app.route('/model-info', methods=['GET'])
 def model_info():
     """Get information about the loaded model"""
-    if pipeline is None:
+    bundle = model_bundle
+    if bundle is None:
         return jsonify({'error': 'Model not loaded'}), 500
+    table = catalog_predictions
+    
+    response_data = {
+        'model_type': type(bundle.pipeline).__name__,
+        'model_version': bundle.version,
+        'model_format': bundle.model_format,
+        'model_file': bundle.model_file,
+        'inference_engine': bundle.inference_engine,
+        'hit_threshold': HIT_THRESHOLD,
+        'prediction_cache': prediction_cache.stats(),
+        'micro_batching': micro_batcher.stats() if micro_batcher is not None else None,
+        'director_count': len(bundle.director_success_rates),
+        'actor1_count': len(bundle.actor1_success_rates),
+        'actor2_count': len(bundle.actor2_success_rates),
+        'actor3_count': len(bundle.actor3_success_rates),
+        'talent_names': len(bundle.talent),
+        'catalog_predictions': len(table) if table is not None and table.model_version == bundle.version else None,
+        'model_loaded_at': bundle.loaded_at
+    }
+    
+    response = jsonify(response_data)
+    response.headers.add('Access-Control-Allow-Origin', '*')
+    return response
+
+@app.route('/models', methods=['GET'])
+def list_models():
+    """Models in the registry that prediction requests can pick with ?model=, and shadow scoring stats"""
+    registry = get_model_registry()
+    bundle = model_bundle
+    loaded = registry.loaded() if registry is not None else {}
     
     response_data = {
-        'model_type': type(pipeline).__name__,
-        'director_count': len(director_success_rates) if director_success_rates else 0,
-        'actor1_count': len(actor1_success_rates) if actor1_success_rates else 0,
-        'actor2_count': len(actor2_success_rates) if actor2_success_rates else 0,
-        'actor3_count': len(actor3_success_rates) if actor3_success_rates else 0,
-        'model_loaded_at': datetime.now().isoformat()
+        'served_version': bundle.version if bundle is not None else None,
+        'models': [{
+            'name': name,
+            'loaded': name in loaded,
+            'version': loaded[name].version if name in loaded else None
+        } for name in (registry.names() if registry is not None else [])],
+        'registry': registry.stats() if registry is not None else None,
+        'shadow': dict(shadow_scorer.stats(), model=SHADOW_MODEL) if shadow_scorer is not None else None
     }
     
     response = jsonify(response_data)
     response.headers.add('Access-Control-Allow-Origin', '*')
     return response
 
+def admin_authorized(req):
+    """Admin requests need X-Admin-Token when ADMIN_TOKEN is set, else localhost"""
+    if ADMIN_TOKEN:
+        return hmac.compare_digest(req.headers.get('X-Admin-Token', ''), ADMIN_TOKEN)
+    return req.remote_addr in ('127.0.0.1', '::1')
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """Reload the model and success rates without restarting.
+
+    The new artifacts are loaded in a background thread (or inline with
+    ?wait=true) and swapped in only after a smoke prediction succeeds;
+    requests keep being served by the current bundle meanwhile. The JSON
+    body may switch model_format, inference_engine and model_file; artifacts
+    are always read from the directory the current bundle came from.
+    """
+    if not admin_authorized(request):
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    if reload_lock.locked():
+        return jsonify({'error': 'Reload already in progress', 'reload': reload_status}), 409
+    
+    options = request.get_json(silent=True) or {}
+    bundle = model_bundle
+    kwargs = {
+        'artifacts_dir': bundle.artifacts_dir if bundle is not None else None,
+        'model_format': options.get('model_format', bundle.model_format if bundle is not None else None),
+        'inference_engine': options.get('inference_engine', bundle.inference_engine if bundle is not None else None),
+        'model_file': os.path.basename(options.get('model_file', bundle.model_file if bundle is not None else '')) or None
+    }
+    
+    if request.args.get('wait', '').lower() in ('1', 'true', 'yes'):
+        loaded = load_model_and_data(**kwargs)
+        return jsonify({'reloaded': loaded, 'reload': reload_status}), 200 if loaded else 500
+    
+    threading.Thread(target=load_model_and_data, kwargs=kwargs, name='model-reload', daemon=True).start()
+    return jsonify({'reloaded': None, 'reload': {'state': 'loading'}}), 202
+
+def profile_response(stack_profile, **extra):
+    """A StackProfile as collapsed stacks (?format=collapsed) or a JSON summary of the ?top= frames"""
+    if request.args.get('format') == 'collapsed':
+        return app.response_class(stack_profile.collapsed(), content_type='text/plain; charset=utf-8')
+    try:
+        top = int(request.args.get('top', 20))
+    except ValueError:
+        return jsonify({'error': 'top must be an integer'}), 400
+    return jsonify({**stack_profile.summary(top), **extra})
+
+@app.route('/admin/profile', methods=['GET', 'POST'])
+def admin_profile():
+    """Sample the Python stacks of every thread in this worker.
+
+    POST samples for ?seconds= (default 10, at most PROFILE_MAX_SECONDS)
+    every ?interval_ms= in a background thread, or inline with ?wait=true.
+    Threads blocked waiting are left out unless ?idle=true. GET returns the
+    latest run; see profile_response for the formats.
+    """
+    if not admin_authorized(request):
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    if request.method == 'GET':
+        if last_profile is None:
+            return jsonify({'error': 'No profile has been taken', 'profile': profile_status}), 404
+        return profile_response(last_profile, profile=profile_status)
+    
+    if profile_lock.locked():
+        return jsonify({'error': 'Profile already in progress', 'profile': profile_status}), 409
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        interval_ms = float(request.args.get('interval_ms', PROFILE_INTERVAL_MS))
+    except ValueError:
+        return jsonify({'error': 'seconds and interval_ms must be numbers'}), 400
+    if not 0 < seconds <= PROFILE_MAX_SECONDS or not 1 <= interval_ms <= 1000:
+        return jsonify({'error': f'seconds must be in (0, {PROFILE_MAX_SECONDS}] and interval_ms in [1, 1000]'}), 400
+    idle = request.args.get('idle', '').lower() in ('1', 'true', 'yes')
+    
+    if request.args.get('wait', '').lower() in ('1', 'true', 'yes'):
+        return profile_response(run_profile(seconds, interval_ms, idle), profile=profile_status)
+    
+    threading.Thread(target=run_profile, args=(seconds, interval_ms, idle), name='profile', daemon=True).start()
+    return jsonify({'profile': {'state': 'running', 'seconds': seconds}}), 202
+
+@app.route('/admin/profile/requests', methods=['GET', 'DELETE'])
+def admin_request_profile():
+    """Stacks sampled from the PROFILE_REQUEST_RATE fraction of prediction requests.
+
+    GET returns everything sampled since the worker started or the last
+    DELETE, which starts over and returns the profile it discarded.
+    """
+    if not admin_authorized(request):
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    sampler = get_request_sampler()
+    if sampler is None:
+        return jsonify({'error': 'Request profiling is off; set PROFILE_REQUEST_RATE'}), 404
+    profile = sampler.reset() if request.method == 'DELETE' else sampler.profile
+    return profile_response(profile, request_rate=PROFILE_REQUEST_RATE, interval_ms=PROFILE_INTERVAL_MS)
+
+@app.route('/movies/search', methods=['GET'])
+def search_movies():
+    """Search the movie catalog with pagination and field projection.
+
+    q matches title, director, cast and genre words by prefix; title,
+    director and actor restrict to one field. genre (repeatable or comma
+    separated), year_min/year_max and budget_min/budget_max filter, sort
+    orders ('-' for descending), page/page_size paginate and fields picks
+    the returned columns. The 'prediction' field adds each movie's
+    precomputed prediction and probability from the served model (null
+    until its catalog table is ready). Responses carry an ETag for
+    conditional requests.
+    """
+    store = get_movie_store()
+    if store is None:
+        return jsonify({'error': 'Movie data not found'}), 404
+    
+    try:
+        query = parse_search_args(request.args, store, extra_fields=('prediction',))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    table = None
+    if 'prediction' in query['fields']:
+        bundle = model_bundle
+        table = catalog_predictions
+        if bundle is None or table is None or not table.matches(bundle.version, store.version):
+            table = None
+        # Results change with the model even though the catalog does not
+        etag = store.etag(dict(query, model_version=table.model_version if table is not None else None))
+    else:
+        etag = store.etag(query)
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    elif 'prediction' in query['fields']:
+        response = jsonify(search_with_predictions(store, query, table))
+    else:
+        response = jsonify(store.search(**query))
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=60'
+    response.headers.add('Access-Control-Allow-Origin', '*')
+    return response
+
+def search_with_predictions(store, query, table):
+    """store.search with the 'prediction' field filled in from the catalog table (None: no table)"""
+    fields = [field for field in query['fields'] if field != 'prediction']
+    page = store.search(**dict(query, fields=fields if 'id' in fields else fields + ['id']))
+    for record in page['results']:
+        row = record['id'] if 'id' in fields else record.pop('id')
+        if table is None:
+            record['prediction'] = None
+            record['probability'] = None
+            continue
+        probability = table.probabilities[row]
+        best = predicted_classes(probability, HIT_THRESHOLD)
+        record['prediction'] = "HIT" if table.classes[best] == 1 else "FLOP"
+        record['probability'] = round(float(probability[best]), 3)
+    page['model_version'] = table.model_version if table is not None else None
+    return page
+
+def send_data_file(directory, filename, mimetype):
+    """Send a data file, or its pre-compressed copy when the client accepts that encoding.
+
+    .br and .gz copies written by build_dataset.py are used as long as they
+    are not older than the file. send_from_directory answers conditional
+    and Range requests; every encoding is its own representation with its
+    own ETag, so the response varies on Accept-Encoding. Returns None when
+    the file does not exist.
+    """
+    path = os.path.join(directory, filename)
+    if not os.path.exists(path):
+        return None
+    for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+        if request.accept_encodings.quality(encoding) <= 0:
+            continue
+        compressed = path + suffix
+        if os.path.exists(compressed) and os.path.getmtime(compressed) >= os.path.getmtime(path):
+            response = send_from_directory(directory, filename + suffix, mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_from_directory(directory, filename, mimetype=mimetype)
+    response.vary.add('Accept-Encoding')
+    return response
+
 @app.route('/final_tmdb_cleaned.csv')
 def serve_csv():
     """Serve the movie data CSV file"""
-    csv_path = os.path.join(os.path.dirname(__file__), '..', 'public', 'final_tmdb_cleaned.csv')
-    if os.path.exists(csv_path):
-        return send_from_directory(os.path.dirname(csv_path), 'final_tmdb_cleaned.csv')
-    else:
+    response = send_data_file(os.path.dirname(MOVIES_CSV), os.path.basename(MOVIES_CSV), 'text/csv')
+    if response is None:
         return jsonify({'error': 'CSV file not found'}), 404
+    return response
+
+@app.route('/final_tmdb_cleaned.npz')
+def serve_dataset():
+    """Serve the columnar movie dataset built from the CSV (see movie_dataset.py)"""
+    path = dataset_path(MOVIES_CSV)
+    response = send_data_file(os.path.dirname(path), os.path.basename(path), 'application/octet-stream')
+    if response is None:
+        return jsonify({'error': 'Dataset not found; run build_dataset.py'}), 404
+    return response
 
 # Serve React static files
 @app.route('/', defaults={'path': ''})
@@ -281,7 +1662,8 @@ def serve_react(path):
 
 if __name__ == '__main__':
     # Load model on startup
-    if load_model_and_data():
+    if load_model_at_startup():
+        start_artifact_watcher()
         logger.info("Starting Flask server...")
         app.run(debug=True, host='0.0.0.0', port=5000)
     else:
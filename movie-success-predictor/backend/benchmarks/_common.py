@@ -0,0 +1,108 @@
+"""Shared helpers for the backend benchmark scripts"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import app as backend_app  # noqa: E402
+
+SAMPLE_MOVIE = {
+    "movie_title": "The Matrix Reloaded",
+    "director": "Christopher Nolan",
+    "actor1": "Leonardo DiCaprio",
+    "actor2": "Tom Hanks",
+    "actor3": "Morgan Freeman",
+    "budget": 150000000,
+    "runtime": 138,
+    "genres": "Action",
+    "production_companies": "Warner Bros.",
+    "original_language": "en",
+    "release_year": 2024,
+    "release_month": 6,
+    "avg_rating": 8.2,
+    "ratings_count": 50000
+}
+
+GENRES = ['Action', 'Adventure', 'Comedy', 'Drama', 'Horror', 'Sci-Fi', 'Thriller']
+LANGUAGES = ['en', 'es', 'fr', 'de', 'ja']
+COMPANIES = ['Warner Bros.', 'Universal Pictures', 'Paramount Pictures', 'Independent']
+DIRECTORS = ['Christopher Nolan', 'Steven Spielberg', 'Tim Burton', 'Someone New']
+ACTORS = ['Leonardo DiCaprio', 'Tom Hanks', 'Emma Stone', 'Brad Pitt', 'Nobody Known']
+
+
+def make_movies(n, seed=42):
+    """Generate n deterministic synthetic movie requests"""
+    rng = np.random.RandomState(seed)
+    movies = []
+    for i in range(n):
+        movies.append({
+            "movie_title": f"Synthetic Movie {i}",
+            "director": DIRECTORS[rng.randint(len(DIRECTORS))],
+            "actor1": ACTORS[rng.randint(len(ACTORS))],
+            "actor2": ACTORS[rng.randint(len(ACTORS))],
+            "actor3": ACTORS[rng.randint(len(ACTORS))],
+            "budget": float(rng.uniform(1e5, 3e8)),
+            "runtime": float(rng.uniform(60, 200)),
+            "genres": GENRES[rng.randint(len(GENRES))],
+            "production_companies": COMPANIES[rng.randint(len(COMPANIES))],
+            "original_language": LANGUAGES[rng.randint(len(LANGUAGES))],
+            "release_year": int(rng.randint(1990, 2025)),
+            "release_month": int(rng.randint(1, 13)),
+            "avg_rating": float(rng.uniform(3.0, 9.5)),
+            "ratings_count": int(rng.randint(10, 2000000))
+        })
+    return movies
+
+
+def build_sample_artifacts():
+    """Train the sample model into a fresh temporary directory"""
+    from create_sample_model import create_sample_model
+
+    artifacts_dir = tempfile.mkdtemp(prefix='cinepulse-bench-')
+    cwd = os.getcwd()
+    os.chdir(artifacts_dir)
+    try:
+        create_sample_model()
+    finally:
+        os.chdir(cwd)
+    return artifacts_dir
+
+
+def load_artifacts(artifacts_dir=None):
+    """Load a model and success rates into the Flask app's globals.
+
+    When no directory is given the sample model is trained first, so every
+    benchmark run scores the same deterministic forest.
+    """
+    if artifacts_dir is None:
+        artifacts_dir = build_sample_artifacts()
+
+    if not backend_app.load_model_and_data(artifacts_dir):
+        raise RuntimeError(f'Could not load artifacts from {artifacts_dir}')
+    return backend_app
+
+
+def time_call(func, repeat=5):
+    """Return the best wall-clock time in seconds over several runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def latency_percentiles(func, iterations=200):
+    """Call func repeatedly and return (p50, p99) latency in microseconds"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples = np.array(samples) * 1e6
+    return float(np.percentile(samples, 50)), float(np.percentile(samples, 99))
@@ -0,0 +1,45 @@
+"""Throughput of /predict/batch against one /predict call per movie.
+
+Usage: python benchmarks/bench_batch_predict.py [--sizes 10 100 1000] [--artifacts DIR]
+"""
+import argparse
+import logging
+
+from _common import load_artifacts, make_movies, time_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--artifacts', default=None,
+                        help='directory holding saved_model.pkl and *_success.joblib')
+    args = parser.parse_args()
+
+    backend_app = load_artifacts(args.artifacts)
+    logging.getLogger('app').setLevel(logging.WARNING)
+    # Every repeat should reach the model, not the prediction cache
+    backend_app.prediction_cache.max_entries = 0
+    client = backend_app.app.test_client()
+
+    print(f"{'movies':>8} {'single (movies/s)':>18} {'batch (movies/s)':>17} {'python fn (movies/s)':>21} {'speedup':>8}")
+    for size in args.sizes:
+        movies = make_movies(size)
+
+        def single_path():
+            for movie in movies:
+                client.post('/predict', json=movie)
+
+        def batch_path():
+            client.post('/predict/batch', json=movies)
+
+        def python_path():
+            backend_app.predict_batch(movies)
+
+        single = time_call(single_path, repeat=1 if size > 100 else 3)
+        batch = time_call(batch_path)
+        python = time_call(python_path)
+        print(f"{size:>8} {size / single:>18.0f} {size / batch:>17.0f} {size / python:>21.0f} {single / batch:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
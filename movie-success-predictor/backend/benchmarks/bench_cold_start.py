@@ -0,0 +1,94 @@
+"""Worker cold start: pickled pipeline against the memory-mapped compiled model.
+
+Starts N worker processes per format, the way N gunicorn workers would, and
+reports model load time plus resident memory once all workers are up.
+RssAnon is private memory, Pss splits shared pages between the workers.
+Usage: python benchmarks/bench_cold_start.py [--workers 4] [--artifacts DIR]
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+from _common import BACKEND_DIR, build_sample_artifacts
+
+WORKER = r'''
+import json, logging, os, sys, time
+sys.path.insert(0, {backend!r})
+logging.disable(logging.CRITICAL)
+
+def memory():
+    stats = {{}}
+    with open('/proc/self/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('VmRSS', 'RssAnon', 'RssFile'):
+                stats[key] = int(value.split()[0])
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Pss:'):
+                stats['Pss'] = int(line.split()[1])
+    return stats
+
+import app
+sys.path.insert(0, os.path.join({backend!r}, 'benchmarks'))
+from _common import make_movies
+movies = make_movies(200)
+before = memory()
+start = time.perf_counter()
+assert app.load_model_and_data({artifacts!r}, model_format={model_format!r})
+load_seconds = time.perf_counter() - start
+app.predict_batch(movies)
+print('ready', flush=True)
+sys.stdin.readline()
+after = memory()
+print(json.dumps({{
+    'load_ms': load_seconds * 1e3,
+    'model_kb': {{key: after[key] - before[key] for key in after}},
+    'total_kb': after,
+    'sklearn_imported': 'sklearn' in sys.modules
+}}), flush=True)
+'''
+
+
+def run_workers(artifacts_dir, model_format, workers):
+    code = WORKER.format(backend=BACKEND_DIR, artifacts=artifacts_dir, model_format=model_format)
+    procs = [subprocess.Popen([sys.executable, '-c', code], stdin=subprocess.PIPE,
+                              stdout=subprocess.PIPE, text=True)
+             for _ in range(workers)]
+    for proc in procs:
+        assert proc.stdout.readline().strip() == 'ready'
+    # Measure only once every worker has mapped the model
+    results = []
+    for proc in procs:
+        proc.stdin.write('\n')
+        proc.stdin.flush()
+    for proc in procs:
+        results.append(json.loads(proc.stdout.readline()))
+        proc.wait()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--artifacts', default=None,
+                        help='directory holding saved_model.pkl and *_success.joblib')
+    args = parser.parse_args()
+
+    artifacts_dir = args.artifacts or build_sample_artifacts()
+    from export_compiled_model import export_model
+    export_model(artifacts_dir)
+
+    print(f"\n{args.workers} workers, model at {artifacts_dir}")
+    print(f"{'format':>9} {'load ms':>8} {'+RSS MB':>8} {'+RssAnon MB':>12} {'+Pss MB':>8} {'sklearn':>8}")
+    for model_format in ['pickle', 'compiled']:
+        results = run_workers(artifacts_dir, model_format, args.workers)
+        mean = lambda key: sum(r['model_kb'][key] for r in results) / len(results) / 1024  # noqa: E731
+        load_ms = sum(r['load_ms'] for r in results) / len(results)
+        print(f"{model_format:>9} {load_ms:>8.1f} {mean('VmRSS'):>8.1f} {mean('RssAnon'):>12.1f} "
+              f"{mean('Pss'):>8.1f} {str(results[0]['sklearn_imported']):>8}")
+
+
+if __name__ == '__main__':
+    main()
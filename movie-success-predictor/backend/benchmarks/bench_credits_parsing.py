@@ -0,0 +1,110 @@
+"""Cast/crew extraction: early-stopping JSON parsing in a process pool against ast.literal_eval.
+
+Generates TMDB-style credits (cast of 5-60 and crew of 5-120 entries per
+movie, Python repr quoting as in the full TMDB credits export, or JSON as
+in the 5000-movie one) and times the original DataFrame.apply over
+ast.literal_eval against extract_people, serially and across --workers
+processes. The director/actor columns are checked for equality.
+Usage: python benchmarks/bench_credits_parsing.py [--rows 10000] [--workers 1 4] [--format python json]
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import _common  # noqa: F401 (puts the backend on sys.path)
+from create_success_rates import extract_people, safe_literal_eval
+
+JOBS = ['Producer', 'Screenplay', 'Editor', 'Casting', 'Original Music Composer',
+        'Director of Photography', 'Executive Producer', 'Sound Designer', 'Costume Design']
+NAMES = ["Christopher Nolan", "Conan O'Brien", "Amélie Poulain", "Zoë Kravitz", "Jean-Pierre Jeunet",
+         "Björk", "Lupita Nyong'o", "Emma Stone", "Tom Hardy", "Dwayne \"The Rock\" Johnson"]
+
+
+def legacy_get_director(crew_data):
+    for member in safe_literal_eval(crew_data):
+        if member.get('job') == 'Director':
+            return member.get('name')
+    return np.nan
+
+
+def legacy_get_top_actors(cast_data, n=3):
+    cast = safe_literal_eval(cast_data)
+    return [member.get('name') for member in cast[:n]] if cast else [np.nan]*n
+
+
+def legacy_extract(movies):
+    """The original extraction step of create_success_rates"""
+    movies['director'] = movies['crew'].apply(legacy_get_director)
+    movies[['actor1', 'actor2', 'actor3']] = pd.DataFrame(
+        movies['cast'].apply(lambda x: legacy_get_top_actors(x, 3)).tolist(),
+        index=movies.index
+    )
+    return movies
+
+
+def make_credits(n, fmt, seed=0):
+    rng = np.random.default_rng(seed)
+    dump = repr if fmt == 'python' else json.dumps
+
+    def name():
+        return f'{NAMES[rng.integers(len(NAMES))]} {rng.integers(20000)}'
+
+    crew, cast = [], []
+    for _ in range(n):
+        members = [{'credit_id': f'52fe{rng.integers(1 << 40):x}', 'department': 'Crew',
+                    'gender': int(rng.integers(3)), 'id': int(rng.integers(1 << 20)),
+                    'job': JOBS[rng.integers(len(JOBS))], 'name': name(),
+                    'profile_path': None if fmt == 'python' and rng.random() < 0.5 else '/p.jpg'}
+                   for _ in range(rng.integers(5, 120))]
+        if rng.random() < 0.97:
+            members[rng.integers(len(members))].update(job='Director', department='Directing')
+        crew.append(dump(members))
+        cast.append(dump([{'cast_id': i, 'character': name(), 'credit_id': f'52fe{rng.integers(1 << 40):x}',
+                           'gender': int(rng.integers(3)), 'id': int(rng.integers(1 << 20)), 'name': name(),
+                           'order': i, 'profile_path': '/p.jpg'}
+                          for i in range(rng.integers(0, 60))]))
+    budget = rng.integers(1, 100, n) * 1e6
+    return pd.DataFrame({'crew': crew, 'cast': cast, 'budget': budget, 'revenue': budget * rng.random(n) * 3})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--format', nargs='+', choices=['python', 'json'], default=['python', 'json'])
+    args = parser.parse_args()
+
+    columns = ['director', 'actor1', 'actor2', 'actor3']
+    print(f"{'format':>7} {'rows':>7} {'MB':>6} {'literal_eval s':>15} "
+          + ''.join(f"{f'{w} worker s':>12}" for w in args.workers) + f" {'speedup':>8} {'identical':>10}")
+    for fmt in args.format:
+        movies = make_credits(args.rows, fmt)
+        size_mb = (movies['crew'].str.len().sum() + movies['cast'].str.len().sum()) / 1e6
+
+        start = time.perf_counter()
+        expected = legacy_extract(movies.copy())[columns]
+        legacy = time.perf_counter() - start
+
+        timings = []
+        identical = True
+        for workers in args.workers:
+            start = time.perf_counter()
+            if workers > 1:
+                with ProcessPoolExecutor(workers) as executor:
+                    result = extract_people(movies.copy(), executor)[columns]
+            else:
+                result = extract_people(movies.copy())[columns]
+            timings.append(time.perf_counter() - start)
+            identical = identical and result.equals(expected)
+
+        print(f"{fmt:>7} {args.rows:>7} {size_mb:>6.1f} {legacy:>15.2f} "
+              + ''.join(f'{t:>12.2f}' for t in timings)
+              + f" {legacy / min(timings):>7.1f}x {str(identical):>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Feature assembly: per-request DataFrame against the schema's reusable NumPy buffers.
+
+Scoring used to wrap the prepare_features dicts in a DataFrame and run it
+through the whole sklearn pipeline, ColumnTransformer included. Now the
+rows are copied into per-thread buffers, encoded with NumPy and handed to
+the forest. This times assembly alone and assembly plus scoring at several
+batch sizes, reports the memory allocated per call (tracemalloc peak) and
+checks that the probabilities are identical.
+Usage: python benchmarks/bench_feature_assembly.py [--artifacts DIR] [--sizes 1 100 1000]
+"""
+import argparse
+import logging
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from _common import latency_percentiles, load_artifacts, make_movies
+
+
+def peak_kib(func, repeat=20):
+    """Smallest tracemalloc peak over repeat calls, in KiB"""
+    func()
+    peaks = []
+    tracemalloc.start()
+    for _ in range(repeat):
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        func()
+        peaks.append(tracemalloc.get_traced_memory()[1] - start)
+    tracemalloc.stop()
+    return min(peaks) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--artifacts', default=None,
+                        help='directory holding saved_model.pkl and *_success.joblib')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 1000])
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    backend_app = load_artifacts(args.artifacts)
+    logging.getLogger('app').setLevel(logging.WARNING)
+    bundle = backend_app.model_bundle
+    pipeline = bundle.pipeline
+    model_input = bundle.model_input
+    if model_input is None:
+        raise SystemExit('The loaded pipeline cannot be encoded without pandas')
+
+    print(f"{'rows':>6} {'path':>28} {'p50 us':>10} {'p99 us':>10} {'peak KiB':>9}")
+    for size in args.sizes:
+        rows = [backend_app.prepare_features(movie) for movie in make_movies(size)]
+        want = pipeline.predict_proba(pd.DataFrame(rows))
+        got = bundle.predict_proba_encoded(model_input.encode(rows))
+        status = 'identical' if np.array_equal(want, got) else 'MISMATCH'
+
+        iterations = max(5, args.iterations // size)
+        for name, func in [
+            ('DataFrame', lambda: pd.DataFrame(rows)),
+            ('buffers + encode', lambda: model_input.encode(rows)),
+            ('DataFrame + pipeline', lambda: pipeline.predict_proba(pd.DataFrame(rows))),
+            ('buffers + encode + forest', lambda: bundle.predict_proba_encoded(model_input.encode(rows))),
+        ]:
+            p50, p99 = latency_percentiles(func, iterations)
+            print(f"{size:>6} {name:>28} {p50:>10.1f} {p99:>10.1f} {peak_kib(func, min(iterations, 20)):>9.1f}")
+        print(f"{size:>6} {'probabilities':>28} {status:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Fuzzy name resolution latency: trigram index against a brute-force scan.
+
+The brute-force baseline computes edit-distance similarity against every
+name, which is what a naive "closest name" lookup would do.
+Usage: python benchmarks/bench_fuzzy_match.py [--sizes 1000 10000 100000 300000]
+"""
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+import _common
+from fuzzy_match import FuzzyNameMatcher, similarity
+from name_index import normalize_name
+
+CSV_PATH = os.path.join(_common.BACKEND_DIR, '..', 'public', 'final_tmdb_cleaned.csv')
+
+
+def make_names(size, seed=42):
+    """Recombine real TMDB first and last names into size distinct names.
+
+    This keeps the trigram distribution of real cast lists, which matters
+    far more for index selectivity than the raw number of names.
+    """
+    people = set()
+    for column in ['director', 'actor_1', 'actor_2', 'actor_3']:
+        people.update(pd.read_csv(CSV_PATH, usecols=[column])[column].dropna())
+    firsts = sorted({normalize_name(p).split()[0] for p in people if ' ' in p})
+    lasts = sorted({normalize_name(p).split()[-1] for p in people if ' ' in p})
+
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < size:
+        names.add(f'{rng.choice(firsts)} {rng.choice(lasts)}')
+    return sorted(names)
+
+
+def misspell(name, rng):
+    """Drop, swap or replace one character"""
+    i = rng.randrange(1, len(name) - 1)
+    kind = rng.choice(['drop', 'swap', 'replace'])
+    if kind == 'drop':
+        return name[:i] + name[i + 1:]
+    if kind == 'swap':
+        return name[:i - 1] + name[i] + name[i - 1] + name[i + 1:]
+    return name[:i] + rng.choice('aeiourst') + name[i + 1:]
+
+
+def brute_force(names, query, min_score):
+    best = None
+    for name in names:
+        score = similarity(query, name, min_score)
+        if score >= min_score and (best is None or score > best[1]):
+            best = (name, score)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 300000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--brute-max-size', type=int, default=100000,
+                        help='skip the brute-force scan above this many names')
+    parser.add_argument('--min-score', type=float, default=0.8)
+    args = parser.parse_args()
+
+    print(f"{'names':>8} {'build (s)':>10} {'index p50':>10} {'index p99':>10} {'brute p50':>10} {'agree':>6}  (ms/query)")
+    for size in args.sizes:
+        names = make_names(size)
+        rng = random.Random(7)
+        targets = rng.sample(names, min(args.queries, size))
+        queries = [misspell(name, rng) for name in targets]
+
+        start = time.perf_counter()
+        matcher = FuzzyNameMatcher(names)
+        build = time.perf_counter() - start
+
+        timings = []
+        results = []
+        for query in queries:
+            start = time.perf_counter()
+            results.append(matcher.best_match(query, args.min_score))
+            timings.append(time.perf_counter() - start)
+        timings = np.array(timings) * 1e3
+
+        brute = '-'
+        agree = '-'
+        if size <= args.brute_max_size:
+            sample = queries[:10]
+            brute_timings = []
+            agreed = 0
+            for query, result in zip(sample, results):
+                start = time.perf_counter()
+                expected = brute_force(names, query, args.min_score)
+                brute_timings.append(time.perf_counter() - start)
+                agreed += (expected is None and result is None) or (
+                    expected is not None and result is not None and expected[1] == result[1])
+            brute = f'{np.median(brute_timings) * 1e3:.1f}'
+            agree = f'{agreed}/{len(sample)}'
+
+        print(f"{size:>8} {build:>10.2f} {np.percentile(timings, 50):>10.3f} "
+              f"{np.percentile(timings, 99):>10.3f} {brute:>10} {agree:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""Load test: requests/sec and latency of gunicorn as the worker count grows.
+
+Starts `gunicorn -c gunicorn.conf.py wsgi:app` once per worker count, drives
+it with --clients keep-alive client processes for --duration seconds and
+reports throughput, p50/p99 latency and the memory of all server processes
+(Pss counts pages shared copy-on-write with the master only once). The
+prediction cache is disabled unless --cache is given, so every request runs
+the model.
+Usage: python benchmarks/bench_gunicorn.py [--workers 1 2 4] [--clients 8] [--duration 10]
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from _common import BACKEND_DIR, build_sample_artifacts, make_movies
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_healthy(port, proc, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError('gunicorn exited during startup')
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('gunicorn did not become healthy')
+
+
+def server_memory_mb(master_pid):
+    """Summed RSS and PSS of the gunicorn master and its workers"""
+    pids = [master_pid]
+    for task in os.listdir(f'/proc/{master_pid}/task'):
+        with open(f'/proc/{master_pid}/task/{task}/children') as f:
+            pids.extend(int(pid) for pid in f.read().split())
+    totals = {'Rss': 0, 'Pss': 0}
+    for pid in pids:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                key = line.split(':')[0]
+                if key in totals:
+                    totals[key] += int(line.split()[1])
+    return totals['Rss'] / 1024, totals['Pss'] / 1024
+
+
+def client(args):
+    """Send requests until the deadline; return (latencies, errors)"""
+    port, path, bodies, deadline = args
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    headers = {'Content-Type': 'application/json'}
+    latencies = []
+    errors = 0
+    i = 0
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            connection.request('POST', path, bodies[i % len(bodies)], headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        latencies.append(time.perf_counter() - start)
+        i += 1
+    return latencies, errors
+
+
+def run_load(port, path, bodies, clients, duration):
+    deadline = time.monotonic() + duration
+    # Each client starts at a different movie so they do not move in lockstep
+    chunks = [(port, path, bodies[i:] + bodies[:i], deadline) for i in range(clients)]
+    with multiprocessing.Pool(clients) as pool:
+        results = pool.map(client, chunks)
+    latencies = np.concatenate([np.array(r[0]) for r in results]) * 1e3
+    errors = sum(r[1] for r in results)
+    return len(latencies) / duration, float(np.percentile(latencies, 50)), float(np.percentile(latencies, 99)), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, default=1, help='threads per worker (GUNICORN_THREADS)')
+    parser.add_argument('--clients', type=int, default=8, help='concurrent keep-alive client processes')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds of load per worker count')
+    parser.add_argument('--endpoint', default='/predict', choices=['/predict', '/predict/batch'])
+    parser.add_argument('--batch-size', type=int, default=100, help='movies per /predict/batch request')
+    parser.add_argument('--engine', default='sklearn', choices=['sklearn', 'native'])
+    parser.add_argument('--batch-window-ms', type=float, default=0.0,
+                        help='micro-batching window for /predict (MICRO_BATCH_WINDOW_MS, 0 = inline)')
+    parser.add_argument('--cache', action='store_true', help='leave the prediction cache enabled')
+    parser.add_argument('--artifacts', default=None,
+                        help='directory holding saved_model.pkl and *_success.joblib')
+    args = parser.parse_args()
+
+    artifacts_dir = args.artifacts or build_sample_artifacts()
+    movies = make_movies(1000)
+    if args.endpoint == '/predict':
+        bodies = [json.dumps(movie) for movie in movies]
+    else:
+        bodies = [json.dumps(movies[i:i + args.batch_size]) for i in range(0, len(movies), args.batch_size)]
+
+    print(f"\n{args.endpoint} ({args.engine} engine, batch window {args.batch_window_ms:g} ms), "
+          f"{args.clients} clients, {args.duration:g}s per run, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'threads':>8} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} "
+          f"{'RSS MB':>8} {'PSS MB':>8}")
+    for workers in args.workers:
+        port = free_port()
+        env = dict(os.environ, PORT=str(port), WEB_CONCURRENCY=str(workers),
+                   GUNICORN_THREADS=str(args.threads), MODEL_ARTIFACTS_DIR=artifacts_dir,
+                   INFERENCE_ENGINE=args.engine, MICRO_BATCH_WINDOW_MS=str(args.batch_window_ms))
+        if not args.cache:
+            env['PREDICTION_CACHE_SIZE'] = '0'
+        proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+                                cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_until_healthy(port, proc)
+            run_load(port, args.endpoint, bodies, args.clients, 1.0)  # warm-up
+            rps, p50, p99, errors = run_load(port, args.endpoint, bodies, args.clients, args.duration)
+            rss, pss = server_memory_mb(proc.pid)
+        finally:
+            proc.terminate()
+            proc.wait()
+        print(f"{workers:>8} {args.threads:>8} {rps:>9.1f} {p50:>8.2f} {p99:>8.2f} {errors:>7} "
+              f"{rss:>8.1f} {pss:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Metrics overhead: cost per sample of the /metrics counters and timers.
+
+Times Counter.inc, Histogram.observe, a labelled lookup and StageTimer.mark
+in a tight loop, then /predict with METRICS_ENABLED on and off (prediction
+cache disabled, native engine so the model does not drown the difference).
+Usage: python benchmarks/bench_metrics.py [--artifacts DIR] [--samples 1000000]
+"""
+import argparse
+import dataclasses
+import logging
+import time
+
+from _common import latency_percentiles, load_artifacts, make_movies
+from compiled_model import CompiledModel
+from metrics import LATENCY_BUCKETS, MetricsRegistry, StageHistograms, StageTimer
+
+
+def ns_per_call(func, samples):
+    start = time.perf_counter()
+    for _ in range(samples):
+        func()
+    return (time.perf_counter() - start) / samples * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--artifacts', default=None,
+                        help='directory holding saved_model.pkl and *_success.joblib')
+    parser.add_argument('--samples', type=int, default=1000000)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    counter = registry.counter('counter_total', 'Counter', ('role', 'method'))
+    stages = registry.histogram('stage_seconds', 'Stages', LATENCY_BUCKETS, ('endpoint', 'stage'))
+    histogram = stages.labels('predict', 'parse')
+    timer = StageTimer(StageHistograms(stages, 'predict'))
+    baseline = ns_per_call(lambda: None, args.samples)
+
+    print(f"{'operation':>34} {'ns/sample':>10}")
+    for name, func in [
+        ('Counter.inc', counter.labels('director', 'exact').inc),
+        ("labels('director', 'exact').inc", lambda: counter.labels('director', 'exact').inc()),
+        ('Histogram.observe', lambda: histogram.observe(0.0003)),
+        ("StageTimer.mark('parse')", lambda: timer.mark('parse')),
+    ]:
+        print(f"{name:>34} {ns_per_call(func, args.samples) - baseline:>10.0f}")
+
+    backend_app = load_artifacts(args.artifacts)
+    logging.getLogger('app').setLevel(logging.WARNING)
+    backend_app.prediction_cache.max_entries = 0
+    bundle = backend_app.model_bundle
+    backend_app.install_bundle(dataclasses.replace(bundle, native_model=CompiledModel.from_pipeline(bundle.pipeline)))
+
+    client = backend_app.app.test_client()
+    movie = make_movies(1)[0]
+    print(f"\n{'/predict':>34} {'p50 us':>10} {'p99 us':>10}")
+    for enabled in [False, True, False, True]:
+        backend_app.METRICS_ENABLED = enabled
+        p50, p99 = latency_percentiles(lambda: client.post('/predict', json=movie), args.iterations)
+        print(f"{'metrics ' + ('on' if enabled else 'off'):>34} {p50:>10.1f} {p99:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Movie search: indexed /movies/search against shipping and scanning the whole CSV.
+
+Replicates public/final_tmdb_cleaned.csv --scale times (titles get a copy
+suffix so they stay distinct), builds the columnar store and compares, per
+query, the /movies/search page (latency and bytes) with what the old
+frontend did: download the CSV, parse it and scan every row.
+Usage: python benchmarks/bench_movie_search.py [--scale 1 100] [--iterations 50]
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from _common import BACKEND_DIR, latency_percentiles
+import app as backend_app
+from movie_store import MovieStore
+
+CSV_PATH = os.path.join(BACKEND_DIR, '..', 'public', 'final_tmdb_cleaned.csv')
+
+QUERIES = [
+    'q=nolan',
+    'q=the+dark',
+    'q=a',
+    'genre=Action&year_min=2000&year_max=2010',
+    'actor=depp&budget_min=100000000',
+    'genre=Drama&sort=-avg_rating&fields=title,avg_rating',
+]
+
+
+def scan_csv(frame, term):
+    """The old client-side search: substring match over every row"""
+    term = term.lower()
+    mask = (frame['title'].str.lower().str.contains(term, regex=False)
+            | frame['director'].str.lower().str.contains(term, regex=False))
+    return frame[mask].head(50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 100])
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+    logging.getLogger('app').setLevel(logging.WARNING)
+
+    base = pd.read_csv(CSV_PATH)
+    client = backend_app.app.test_client()
+    for scale in args.scale:
+        frame = pd.concat([base] * scale, ignore_index=True)
+        if scale > 1:
+            frame['title'] = frame['title'] + ' ' + (np.arange(len(frame)) // len(base)).astype(str)
+        csv_bytes = frame.to_csv(index=False).encode('utf-8')
+
+        start = time.perf_counter()
+        store = MovieStore(frame, f'bench-{scale}')
+        build_s = time.perf_counter() - start
+        backend_app.movie_store = store
+
+        parse_ms = min(
+            (lambda t: (pd.read_csv(io.BytesIO(csv_bytes)), time.perf_counter() - t)[1])(time.perf_counter())
+            for _ in range(3)
+        ) * 1e3
+        scan_p50, _ = latency_percentiles(lambda: scan_csv(frame, 'nolan'), max(5, args.iterations // 5))
+
+        print(f"\n{len(frame)} movies: store built in {build_s:.2f}s; "
+              f"full CSV {len(csv_bytes) / 1e6:.1f} MB, parse {parse_ms:.0f} ms, "
+              f"substring scan {scan_p50 / 1e3:.2f} ms per search")
+        print(f"{'query':>48} {'total':>8} {'p50 ms':>8} {'p99 ms':>8} {'bytes':>8} {'304 ms':>8}")
+        for query in QUERIES:
+            url = f'/movies/search?{query}'
+            response = client.get(url)
+            body = response.get_data()
+            etag = response.headers['ETag']
+            p50, p99 = latency_percentiles(lambda: client.get(url), args.iterations)
+            p50_304, _ = latency_percentiles(lambda: client.get(url, headers={'If-None-Match': etag}),
+                                             args.iterations)
+            total = json.loads(body)['total']
+            print(f"{query:>48} {total:>8} {p50 / 1e3:>8.2f} {p99 / 1e3:>8.2f} {len(body):>8} {p50_304 / 1e3:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Hit and miss latency of success-rate lookups across table sizes.
+
+Compares the old linear case-insensitive scan with the NameIndex used by
+get_success_rate. Usage: python benchmarks/bench_name_index.py
+"""
+import argparse
+import random
+import string
+import timeit
+
+from _common import backend_app
+from name_index import NameIndex
+
+
+def legacy_get_success_rate(name, success_rates_dict, default_rate=0.5):
+    """The pre-index implementation, kept here for comparison"""
+    if not name or not name.strip():
+        return default_rate
+    if name in success_rates_dict:
+        return success_rates_dict[name]
+    name_lower = name.lower().strip()
+    for key, value in success_rates_dict.items():
+        if key.lower().strip() == name_lower:
+            return value
+    return default_rate
+
+
+def make_rates(size, seed=42):
+    rng = random.Random(seed)
+    rates = {}
+    while len(rates) < size:
+        first = ''.join(rng.choices(string.ascii_lowercase, k=7)).title()
+        last = ''.join(rng.choices(string.ascii_lowercase, k=9)).title()
+        rates[f'{first} {last}'] = rng.random()
+    return rates
+
+
+def per_call_us(func, budget=0.2):
+    """Average microseconds per call, sizing the loop to about budget seconds"""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * budget / max(elapsed, 1e-9)))
+    return min(timer.repeat(repeat=3, number=number)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 100000, 1000000])
+    args = parser.parse_args()
+
+    get_success_rate = backend_app.get_success_rate
+    print(f"{'entries':>9} {'exact hit':>10} {'fold hit old':>13} {'fold hit new':>13} {'miss old':>11} {'miss new':>9}  (us/lookup)")
+    for size in args.sizes:
+        rates = make_rates(size)
+        index = NameIndex(rates)
+        name = list(rates)[size // 2]
+        folded = f'  {name.upper()} '
+        missing = 'Nobody Atall'
+
+        exact = per_call_us(lambda: get_success_rate(name, index))
+        fold_old = per_call_us(lambda: legacy_get_success_rate(folded, rates))
+        fold_new = per_call_us(lambda: get_success_rate(folded, index))
+        miss_old = per_call_us(lambda: legacy_get_success_rate(missing, rates))
+        miss_new = per_call_us(lambda: get_success_rate(missing, index))
+        print(f"{size:>9} {exact:>10.2f} {fold_old:>13.2f} {fold_new:>13.2f} {miss_old:>11.2f} {miss_new:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Single-prediction latency: sklearn Pipeline against the native numpy engine.
+
+Also checks that both engines return bit-identical probabilities on a
+synthetic corpus. Usage: python benchmarks/bench_native_inference.py [--artifacts DIR]
+"""
+import argparse
+import dataclasses
+import logging
+
+import numpy as np
+import pandas as pd
+
+from _common import latency_percentiles, load_artifacts, make_movies
+from compiled_model import CompiledModel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--artifacts', default=None,
+                        help='directory holding saved_model.pkl and *_success.joblib')
+    parser.add_argument('--corpus', type=int, default=5000, help='rows used for the exactness check')
+    parser.add_argument('--iterations', type=int, default=300)
+    args = parser.parse_args()
+
+    backend_app = load_artifacts(args.artifacts)
+    logging.getLogger('app').setLevel(logging.WARNING)
+    bundle = backend_app.model_bundle
+    pipeline = bundle.pipeline
+    native = CompiledModel.from_pipeline(pipeline)
+
+    records = [backend_app.prepare_features(movie) for movie in make_movies(args.corpus)]
+    expected = pipeline.predict_proba(pd.DataFrame(records))
+    actual = native.predict_proba_records(records)
+    print(f"\nExactness on {len(records)} rows: "
+          f"{'bit-identical' if np.array_equal(expected, actual) else 'MISMATCH'} "
+          f"(max abs diff {np.abs(expected - actual).max():.3g})")
+    print(f"Forest: {native.n_estimators} trees, max depth {native.max_depth}, {len(native.threshold)} nodes\n")
+
+    record = [records[0]]
+    rows = [
+        ('sklearn predict_proba', lambda: pipeline.predict_proba(pd.DataFrame(record))),
+        ('native predict_proba', lambda: native.predict_proba_records(record)),
+    ]
+
+    client = backend_app.app.test_client()
+    movie = make_movies(1)[0]
+    for engine in ['sklearn', 'native']:
+        backend_app.install_bundle(dataclasses.replace(bundle, native_model=native if engine == 'native' else None))
+        p50, p99 = latency_percentiles(lambda: client.post('/predict', json=movie), args.iterations)
+        rows.append((f'/predict ({engine})', None, p50, p99))
+
+    print(f"{'path':>24} {'p50 us':>10} {'p99 us':>10}")
+    for row in rows:
+        if row[1] is not None:
+            p50, p99 = latency_percentiles(row[1], args.iterations)
+        else:
+            p50, p99 = row[2], row[3]
+        print(f"{row[0]:>24} {p50:>10.1f} {p99:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Shadow scoring: /predict latency with a candidate model re-scoring sampled requests.
+The served artifacts are copied into a temporary registry as the candidate.
+Requests use distinct movies with the prediction cache disabled, so every
+request is scored. Latency is measured at several sample rates, with the
+number of requests shadowed, dropped because the queue was full or expired
+waiting for an idle worker. The
+pool still competes with requests for the CPU, so on a single core the
+shadow work shows up in the tail. The cost of queueing one job, the only
+work added to a shadowed request, is timed separately.
+Usage: python benchmarks/bench_shadow.py [--artifacts DIR] [--rates 0 0.1 1]
+"""
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+
+from _common import latency_percentiles, load_artifacts, make_movies
+from shadow_scorer import ShadowScorer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--artifacts', default=None,
+                        help='directory holding saved_model.pkl and *_success.joblib')
+    parser.add_argument('--rates', type=float, nargs='+', default=[0, 0.1, 1])
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    backend_app = load_artifacts(args.artifacts)
+    logging.getLogger('app').setLevel(logging.WARNING)
+    logging.getLogger('shadow_scorer').setLevel(logging.ERROR)
+    backend_app.prediction_cache.max_entries = 0
+    registry_dir = tempfile.mkdtemp(prefix='cinepulse-registry-')
+    shutil.copytree(backend_app.model_bundle.artifacts_dir, os.path.join(registry_dir, 'candidate'),
+                    ignore=shutil.ignore_patterns('compiled_model'))
+    backend_app.MODEL_REGISTRY = registry_dir
+    backend_app.SHADOW_MODEL = 'candidate'
+    backend_app.get_model_registry().get('candidate')
+
+    client = backend_app.app.test_client()
+    movies = make_movies(args.iterations)
+    print(f"{'sample rate':>12} {'p50 us':>10} {'p99 us':>10} {'shadowed':>9} {'dropped':>8} {'expired':>8} "
+          f"{'agreement':>10}")
+    for rate in args.rates:
+        backend_app.SHADOW_SAMPLE_RATE = rate
+        backend_app.shadow_scorer = None
+        scorer = backend_app.get_shadow_scorer()
+        movie = iter(movies)
+        p50, p99 = latency_percentiles(lambda: client.post('/predict', json=next(movie)), args.iterations)
+        stats = {'requests': 0, 'dropped': 0, 'expired': 0, 'agreement': None}
+        if scorer is not None:
+            # Wait for the comparisons still queued
+            scorer.close()
+            stats = scorer.stats()
+        agreement = f"{stats['agreement']:.3f}" if stats['agreement'] is not None else '-'
+        print(f"{rate:>12g} {p50:>10.1f} {p99:>10.1f} {stats['requests']:>9} {stats['dropped']:>8} "
+              f"{stats['expired']:>8} {agreement:>10}")
+
+    # What a shadowed request pays on its own thread: queueing the job
+    scorer = ShadowScorer(lambda: None, lambda movies, bundle, threshold: ([0], [[1.0, 0.0]]),
+                          max_queue=args.iterations)
+    submit_p50, submit_p99 = latency_percentiles(lambda: scorer.submit([movies[0]], [0], [[1.0, 0.0]]),
+                                                 args.iterations)
+    scorer.close()
+    print(f"\nShadowScorer.submit: p50 {submit_p50:.1f} us, p99 {submit_p99:.1f} us")
+    shutil.rmtree(registry_dir)
+
+
+if __name__ == '__main__':
+    main()
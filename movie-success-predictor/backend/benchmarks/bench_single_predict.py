@@ -0,0 +1,69 @@
+"""Single-movie scoring: predict + predict_proba against one predict_proba pass.
+
+/predict used to call pipeline.predict and then pipeline.predict_proba on
+the same one-row DataFrame, which ran the preprocessor and every tree twice.
+It now calls score_features once and takes the label from the
+probabilities. This times both on one movie and checks that they give
+identical labels and probabilities on a synthetic corpus.
+Usage: python benchmarks/bench_single_predict.py [--artifacts DIR] [--corpus 2000]
+"""
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+from _common import latency_percentiles, load_artifacts, make_movies
+
+
+def legacy_score(pipeline, features):
+    """The previous /predict sklearn path"""
+    feature_df = pd.DataFrame([features])
+    prediction = pipeline.predict(feature_df)[0]
+    probability = pipeline.predict_proba(feature_df)[0]
+    return prediction, probability
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--artifacts', default=None,
+                        help='directory holding saved_model.pkl and *_success.joblib')
+    parser.add_argument('--corpus', type=int, default=2000, help='movies used for the exactness check')
+    parser.add_argument('--iterations', type=int, default=300)
+    args = parser.parse_args()
+
+    backend_app = load_artifacts(args.artifacts)
+    logging.getLogger('app').setLevel(logging.WARNING)
+    bundle = backend_app.model_bundle
+    pipeline = bundle.pipeline
+
+    def score(features):
+        probability = backend_app.score_features([features], bundle)[0]
+        return bundle.classes_[backend_app.predicted_classes(probability)], probability
+
+    records = [backend_app.prepare_features(movie) for movie in make_movies(args.corpus)]
+    mismatches = 0
+    for features in records:
+        want_label, want_probability = legacy_score(pipeline, features)
+        got_label, got_probability = score(features)
+        if want_label != got_label or not np.array_equal(want_probability, got_probability):
+            mismatches += 1
+    print(f"\nExactness on {len(records)} movies: "
+          f"{'identical labels and probabilities' if not mismatches else f'{mismatches} MISMATCHES'}\n")
+
+    features = records[0]
+    backend_app.prediction_cache.max_entries = 0
+    client = backend_app.app.test_client()
+    movie = make_movies(1)[0]
+    print(f"{'path':>34} {'p50 us':>10} {'p99 us':>10}")
+    for name, func in [
+        ('predict + predict_proba', lambda: legacy_score(pipeline, features)),
+        ('score_features + predicted_classes', lambda: score(features)),
+        ('/predict', lambda: client.post('/predict', json=movie)),
+    ]:
+        p50, p99 = latency_percentiles(func, args.iterations)
+        print(f"{name:>34} {p50:>10.1f} {p99:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
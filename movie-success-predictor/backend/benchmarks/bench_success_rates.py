@@ -0,0 +1,124 @@
+"""Success-rate table rebuild: vectorized counts against the original per-person loops.
+
+Generates synthetic director/actor credits (skewed so a few people have
+many films, with some directors also acting and some missing names) and
+times the original calculate_success_rate + filter_low_frequency against
+count_roles + rates_from_counts, in one frame and streamed in chunks.
+Outputs are compared dict-for-dict, including key order. The original is
+quadratic, so it only runs up to --legacy-max-rows.
+Usage: python benchmarks/bench_success_rates.py [--sizes 5000 100000 1000000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import _common  # noqa: F401 (puts the backend on sys.path)
+from success_counts import ROLE_COLUMNS, count_roles, merge_role_counts, rates_from_counts
+
+
+def legacy_calculate_success_rate(series, success_series):
+    """calculate_success_rate as it was before vectorizing"""
+    success_rates = {}
+    for value in series.unique():
+        if pd.notna(value) and value != '':
+            mask = series == value
+            if mask.sum() > 0:
+                success_rate = success_series[mask].mean()
+                success_rates[value] = success_rate
+    return success_rates
+
+
+def legacy_rates(movies, min_count=2):
+    """The original rate calculation and low-frequency filter"""
+    def filter_low_frequency(success_dict):
+        filtered = {}
+        for person, rate in success_dict.items():
+            if pd.notna(person) and person != '':
+                if person in movies['director'].values:
+                    count = (movies['director'] == person).sum()
+                elif person in movies['actor1'].values:
+                    count = (movies['actor1'] == person).sum()
+                elif person in movies['actor2'].values:
+                    count = (movies['actor2'] == person).sum()
+                elif person in movies['actor3'].values:
+                    count = (movies['actor3'] == person).sum()
+                else:
+                    count = 0
+                if count >= min_count:
+                    filtered[person] = rate
+        return filtered
+
+    return {role: filter_low_frequency(legacy_calculate_success_rate(movies[role], movies['success']))
+            for role in ROLE_COLUMNS}
+
+
+def make_credits(n, seed=0):
+    """Synthetic movies with skewed director/actor frequencies"""
+    rng = np.random.default_rng(seed)
+
+    def people(prefix, pool):
+        ids = (pool * rng.random(n) ** 3).astype(np.int64)
+        names = np.array([f'{prefix} {i}' for i in range(pool)], dtype=object)[ids]
+        names[rng.random(n) < 0.01] = np.nan
+        names[rng.random(n) < 0.005] = ''
+        return names
+
+    movies = pd.DataFrame({
+        'director': people('Director', max(10, n // 8)),
+        'actor1': people('Actor', max(10, n // 4)),
+        'actor2': people('Actor', max(10, n // 3)),
+        'actor3': people('Actor', max(10, n // 2)),
+    })
+    # Some directors also act
+    acting_directors = rng.random(n) < 0.02
+    movies.loc[acting_directors, 'actor1'] = movies.loc[acting_directors, 'director']
+    movies['success'] = (rng.random(n) < 0.4).astype(int)
+    return movies
+
+
+def same_tables(a, b):
+    return all(list(a[role].items()) == list(b[role].items()) for role in ROLE_COLUMNS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 100000, 1000000])
+    parser.add_argument('--chunksize', type=int, default=100000, help='rows per chunk in streaming mode')
+    parser.add_argument('--legacy-max-rows', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'legacy s':>10} {'vectorized s':>13} {'chunked s':>10} {'speedup':>8} "
+          f"{'people':>8} {'identical':>10}")
+    for n in args.sizes:
+        movies = make_credits(n)
+
+        start = time.perf_counter()
+        tables = rates_from_counts(count_roles(movies))
+        vectorized = time.perf_counter() - start
+
+        start = time.perf_counter()
+        role_counts = None
+        for offset in range(0, n, args.chunksize):
+            role_counts = merge_role_counts(role_counts, count_roles(movies.iloc[offset:offset + args.chunksize]))
+        chunked_tables = rates_from_counts(role_counts)
+        chunked = time.perf_counter() - start
+        identical = same_tables(tables, chunked_tables)
+
+        legacy = None
+        if n <= args.legacy_max_rows:
+            start = time.perf_counter()
+            expected = legacy_rates(movies)
+            legacy = time.perf_counter() - start
+            identical = identical and same_tables(tables, expected)
+
+        people = sum(len(table) for table in tables.values())
+        legacy_text = f'{legacy:.2f}' if legacy is not None else 'skipped'
+        speedup = f'{legacy / vectorized:.0f}x' if legacy is not None else '-'
+        print(f"{n:>9} {legacy_text:>10} {vectorized:>13.3f} {chunked:>10.3f} {speedup:>8} "
+              f"{people:>8} {str(identical):>10}")
+
+
+if __name__ == '__main__':
+    main()
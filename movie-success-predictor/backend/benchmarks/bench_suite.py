@@ -0,0 +1,271 @@
+"""Benchmark suite: the backend's hot paths on fixed synthetic data, saved as JSON and compared between runs.
+
+Runs in process against the sample model (or --artifacts), with the Flask
+test client for the endpoints, so no server or network is involved. Every
+case runs on seeded synthetic data at fixed sizes, so two runs measure the
+same work:
+
+- get_success_rate: exact, normalized and missing names in tables of
+  1k to 1M people
+- prepare_features for one movie
+- /predict for one movie (prediction cache off) and /predict/batch for
+  10 to 1000 movies
+- /predict/sweep over 108 to 18,000 grid points
+- load_model_and_data: loading, smoke-testing and installing the artifacts
+  (files are in the OS page cache; bench_cold_start.py covers new processes)
+- success-rate rebuild (count_roles + rates_from_counts) at 5k to 1M movies
+
+Each case takes a fixed number of samples (times --repeat-scale). A sample
+is the mean of enough calls to last at least --min-sample-ms. The median, p99 and minimum are kept in
+microseconds per call. --compare BASELINE.json reports each case's median
+against the baseline. Cases slower by more than --threshold count as
+regressions, and the exit status is 1 when there are any.
+Usage: python benchmarks/bench_suite.py [--quick] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from _common import BACKEND_DIR, build_sample_artifacts, make_movies
+from bench_name_index import make_rates
+from bench_success_rates import make_credits
+from name_index import NameIndex
+from success_counts import count_roles, rates_from_counts
+
+SIZES = {
+    'rate_table': [1000, 100000, 1000000],
+    'batch': [10, 100, 1000],
+    'sweep': [3, 50, 500],
+    'rebuild': [5000, 100000, 1000000]
+}
+QUICK_SIZES = {
+    'rate_table': [1000],
+    'batch': [10],
+    'sweep': [3],
+    'rebuild': [5000]
+}
+
+# Metadata that must match for two runs to be comparable
+ENVIRONMENT_KEYS = ('python', 'numpy', 'pandas', 'sklearn', 'machine', 'cpu_count')
+
+
+def measure(func, repeat=20, min_sample_seconds=0.005):
+    """Microseconds per call of func: median, p99 and min over repeat samples.
+
+    The first call is a warm-up that also sizes the samples: each one times
+    enough calls to last about min_sample_seconds, so fast functions are
+    not dominated by timer resolution.
+    """
+    start = time.perf_counter()
+    func()
+    first = time.perf_counter() - start
+    number = max(1, int(min_sample_seconds / max(first, 1e-9)))
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number * 1e6)
+    samples = np.array(samples)
+    return {
+        'median_us': float(np.median(samples)),
+        'p99_us': float(np.percentile(samples, 99)),
+        'min_us': float(samples.min()),
+        'number': number,
+        'repeat': repeat
+    }
+
+
+def benchmark_cases(backend_app, artifacts_dir, sizes):
+    """(name, callable, repeat) for every case, building its data up front"""
+    cases = []
+    for size in sizes['rate_table']:
+        rates = NameIndex(make_rates(size))
+        name = list(rates)[size // 2]
+        folded = f'  {name.upper()} '
+        get_success_rate = backend_app.get_success_rate
+        cases.append((f'get_success_rate/exact_hit/entries={size}', lambda n=name, r=rates: get_success_rate(n, r), 20))
+        cases.append((f'get_success_rate/normalized_hit/entries={size}',
+                      lambda n=folded, r=rates: get_success_rate(n, r), 20))
+        cases.append((f'get_success_rate/miss/entries={size}',
+                      lambda r=rates: get_success_rate('Nobody Atall', r), 20))
+
+    movies = itertools.cycle(make_movies(100))
+    cases.append(('prepare_features', lambda: backend_app.prepare_features(next(movies)), 20))
+
+    client = backend_app.app.test_client()
+    movie = make_movies(1)[0]
+    cases.append(('predict/single', lambda: client.post('/predict', json=movie), 50))
+    for size in sizes['batch']:
+        batch = make_movies(size)
+        cases.append((f'predict/batch/movies={size}', lambda b=batch: client.post('/predict/batch', json=b),
+                      20 if size <= 100 else 5))
+
+    for budgets in sizes['sweep']:
+        # budgets x 12 release months x 3 lead actors
+        sweep = {'movie': movie, 'axes': {
+            'budget': {'start': 1e6, 'stop': 3e8, 'num': budgets},
+            'release_month': list(range(1, 13)),
+            'actor1': ['Tom Hanks', 'Emma Stone', 'Nobody Known']
+        }}
+        cases.append((f'predict/sweep/points={budgets * 36}',
+                      lambda b=sweep: client.post('/predict/sweep', json=b).get_data(), 20 if budgets <= 50 else 5))
+
+    cases.append(('load_model_and_data', lambda: backend_app.load_model_and_data(artifacts_dir), 5))
+
+    for size in sizes['rebuild']:
+        credits = make_credits(size)
+        cases.append((f'success_rates/rebuild/movies={size}',
+                      lambda c=credits: rates_from_counts(count_roles(c)), 10 if size <= 100000 else 3))
+    return cases
+
+
+def environment():
+    """Versions and machine the results were measured with"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'commit': commit
+    }
+
+
+def run_suite(artifacts_dir=None, quick=False, only=None, repeat_scale=1.0, min_sample_seconds=0.005):
+    """Run every case whose name contains one of the `only` substrings.
+
+    Returns the results document that --output saves.
+    """
+    import app as backend_app
+
+    if artifacts_dir is None:
+        artifacts_dir = build_sample_artifacts()
+    for logger_name in ('app', 'model_bundle'):
+        logging.getLogger(logger_name).setLevel(logging.WARNING)
+    if not backend_app.load_model_and_data(artifacts_dir):
+        raise RuntimeError(f'Could not load artifacts from {artifacts_dir}')
+
+    # Every /predict call should reach the model
+    cache_entries = backend_app.prediction_cache.max_entries
+    backend_app.prediction_cache.max_entries = 0
+    results = {}
+    try:
+        for name, func, repeat in benchmark_cases(backend_app, artifacts_dir, QUICK_SIZES if quick else SIZES):
+            if only and not any(pattern in name for pattern in only):
+                continue
+            results[name] = measure(func, max(3, int(repeat * repeat_scale)), min_sample_seconds)
+            print(f"{name:<48} {results[name]['median_us']:>12.1f} {results[name]['p99_us']:>12.1f}", flush=True)
+    finally:
+        backend_app.prediction_cache.max_entries = cache_entries
+    return {
+        'created_at': datetime.now().isoformat(),
+        'environment': environment(),
+        'quick': quick,
+        'results': results
+    }
+
+
+def compare_results(current, baseline, threshold=0.1):
+    """One row per case comparing current and baseline medians.
+
+    status is 'regression' when the current median is more than threshold
+    slower, 'improved' when it is that much faster, 'new' or 'missing' when
+    the case only ran in one of the two, and 'ok' otherwise.
+    """
+    rows = []
+    for name in list(current['results']) + [name for name in baseline['results'] if name not in current['results']]:
+        now = current['results'].get(name)
+        before = baseline['results'].get(name)
+        if now is None or before is None:
+            rows.append({'case': name, 'status': 'new' if before is None else 'missing',
+                         'baseline_us': before and before['median_us'], 'current_us': now and now['median_us'],
+                         'change': None})
+            continue
+        ratio = now['median_us'] / before['median_us']
+        if ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 / (1 + threshold):
+            status = 'improved'
+        else:
+            status = 'ok'
+        rows.append({'case': name, 'status': status, 'baseline_us': before['median_us'],
+                     'current_us': now['median_us'], 'change': ratio - 1})
+    return rows
+
+
+def environment_differences(current, baseline):
+    return {key: (baseline['environment'].get(key), current['environment'].get(key)) for key in ENVIRONMENT_KEYS
+            if baseline['environment'].get(key) != current['environment'].get(key)}
+
+
+def print_comparison(rows):
+    print(f"\n{'case':<48} {'baseline us':>12} {'current us':>12} {'change':>8}  status")
+    for row in rows:
+        baseline = f"{row['baseline_us']:.1f}" if row['baseline_us'] is not None else '-'
+        current = f"{row['current_us']:.1f}" if row['current_us'] is not None else '-'
+        change = f"{row['change']:+.1%}" if row['change'] is not None else '-'
+        print(f"{row['case']:<48} {baseline:>12} {current:>12} {change:>8}  {row['status']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--artifacts', default=None,
+                        help='directory holding saved_model.pkl and *_success.joblib')
+    parser.add_argument('--quick', action='store_true', help='smallest size of each case only')
+    parser.add_argument('--only', nargs='+', default=None, help='run the cases whose name contains any of these')
+    parser.add_argument('--repeat-scale', type=float, default=1.0, help='multiply the samples taken per case')
+    parser.add_argument('--min-sample-ms', type=float, default=5.0)
+    parser.add_argument('--output', default=None, help='write the results to this JSON file')
+    parser.add_argument('--input', default=None, help='compare these saved results instead of running the suite')
+    parser.add_argument('--compare', default=None, help='baseline results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative slowdown of the median reported as a regression')
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input) as f:
+            current = json.load(f)
+    else:
+        print(f"{'case':<48} {'median us':>12} {'p99 us':>12}")
+        current = run_suite(args.artifacts, args.quick, args.only, args.repeat_scale, args.min_sample_ms / 1000)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"📁 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        for key, (before, now) in environment_differences(current, baseline).items():
+            print(f"⚠️  {key} differs from the baseline: {before} -> {now}")
+        rows = compare_results(current, baseline, args.threshold)
+        print_comparison(rows)
+        regressions = [row for row in rows if row['status'] == 'regression']
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Memory and lookup latency of the shared talent table against four NameIndex dicts.
+
+Each role's table is unpickled separately, as load_bundle reads one joblib
+file per role, so repeated actor names are separate objects until the
+TalentTable interns them. Memory is what the worker keeps after the load,
+fuzzy indexes included, measured with tracemalloc.
+Usage: python benchmarks/bench_talent_table.py [--sizes 1000 20000 100000]
+"""
+import argparse
+import gc
+import pickle
+import random
+import tracemalloc
+
+from _common import backend_app
+from bench_name_index import make_rates, per_call_us
+from name_index import NameIndex
+from success_counts import ROLE_COLUMNS
+from talent_table import TalentTable
+
+
+def make_role_tables(actors, seed=42):
+    """Pickled {name: rate} tables: directors are a quarter as many, actors overlap across billing slots"""
+    rng = random.Random(seed)
+    pool = make_rates(actors + actors // 4, seed)
+    names = list(pool)
+    tables = {'director': {name: pool[name] for name in names[actors:]}}
+    for role in ROLE_COLUMNS[1:]:
+        tables[role] = {name: rng.random() for name in names[:actors] if rng.random() < 0.7}
+    return {role: pickle.dumps(table) for role, table in tables.items()}
+
+
+def retained_bytes(build, pickled):
+    """Bytes still allocated once build(tables) returns and the loaded dicts are dropped"""
+    gc.collect()
+    tracemalloc.start()
+    tables = {role: pickle.loads(data) for role, data in pickled.items()}
+    result = build(tables)
+    del tables
+    gc.collect()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return current, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 20000, 100000],
+                        help='distinct actors (directors are a quarter as many)')
+    args = parser.parse_args()
+
+    resolve_talent = backend_app.resolve_talent
+    print(f"{'actors':>8} {'names':>8} {'dicts MB':>9} {'table MB':>9} {'saved':>6} "
+          f"{'hit us':>13} {'folded us':>13} {'miss us':>13}  (dicts / table)")
+    for size in args.sizes:
+        pickled = make_role_tables(size)
+        dict_bytes, indexes = retained_bytes(
+            lambda tables: {role: NameIndex(table).build_fuzzy_index() for role, table in tables.items()}, pickled)
+        table_bytes, talent = retained_bytes(lambda tables: TalentTable(tables).build_fuzzy_index(), pickled)
+        views = {role: talent.role(role) for role in ROLE_COLUMNS}
+
+        name = list(indexes['actor2'])[len(indexes['actor2']) // 2]
+        folded = f'  {name.upper()} '
+        timings = []
+        for query in (name, folded, 'Nobody Atall'):
+            timings.append((per_call_us(lambda: resolve_talent(query, indexes['actor2'])),
+                            per_call_us(lambda: resolve_talent(query, views['actor2']))))
+        columns = ' '.join(f'{old:>6.2f}/{new:<6.2f}' for old, new in timings)
+        print(f"{size:>8} {len(talent):>8} {dict_bytes / 2 ** 20:>9.1f} {table_bytes / 2 ** 20:>9.1f} "
+              f"{1 - table_bytes / dict_bytes:>6.0%} {columns}")
+
+
+if __name__ == '__main__':
+    main()
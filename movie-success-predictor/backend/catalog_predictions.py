@@ -0,0 +1,115 @@
+"""Predictions for every movie in the catalog, computed once per model version.
+
+The catalog (final_tmdb_cleaned.csv) does not change while a model is
+served, so each of its movies is turned into a /predict request, prepared
+and scored in one vectorized pass. The probabilities are saved next to the
+model artifacts with the bundle version and catalog version they were made
+with. A table whose versions do not match the served bundle and catalog is
+never used.
+
+Rows are found by catalog row id (for /movies/search) and by the
+prediction cache's feature key. A /predict request whose prepared features
+equal a catalog movie's is therefore answered without touching the model.
+"""
+import os
+
+import numpy as np
+
+from feature_schema import FEATURE_SCHEMA
+from prediction_cache import feature_key
+
+CATALOG_PREDICTIONS_FILE = 'catalog_predictions.npz'
+
+
+def catalog_movie(store, row):
+    """The /predict request for one catalog row.
+
+    The catalog has no production company, language or release month (nor
+    runtime for some movies); those fields get the feature schema defaults,
+    so a request that sends the same values is answered from the table. The
+    genre is the first of the movie's genres, as the search UI shows it.
+    """
+    columns = store.columns
+    movie = {field.source: field.default for field in FEATURE_SCHEMA if field.source is not None}
+    movie.update({
+        'movie_title': columns['title'][row],
+        'director': columns['director'][row],
+        'actor1': columns['actor_1'][row],
+        'actor2': columns['actor_2'][row],
+        'actor3': columns['actor_3'][row],
+        'budget': columns['budget'][row].item(),
+        'release_year': columns['release_year'][row].item(),
+        'avg_rating': columns['avg_rating'][row].item(),
+        'ratings_count': columns['ratings'][row].item()
+    })
+    runtime = columns['runtime'][row].item()
+    if runtime == runtime:
+        movie['runtime'] = runtime
+    genre = next((genre for genre, flags in store.genre_flags.items() if flags[row]), None)
+    if genre is not None:
+        movie['genres'] = genre
+    return movie
+
+
+class CatalogPredictions:
+    """Class probabilities of every catalog row, for one bundle and catalog version"""
+
+    def __init__(self, model_version, catalog_version, classes, keys, probabilities):
+        self.model_version = model_version
+        self.catalog_version = catalog_version
+        self.classes = np.asarray(classes)
+        self.keys = np.asarray(keys)
+        self.probabilities = np.asarray(probabilities, dtype=np.float64)
+        # Catalog movies with identical features share one key; any of them will do
+        self.rows = {key: row for row, key in enumerate(self.keys.tolist())}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def matches(self, model_version, catalog_version):
+        return self.model_version == model_version and self.catalog_version == catalog_version
+
+    def lookup(self, key):
+        """Probabilities for a feature key, or None when no catalog movie has those features"""
+        row = self.rows.get(key)
+        return None if row is None else self.probabilities[row]
+
+    def save(self, path):
+        """Write the table through a temporary file renamed into place"""
+        temporary = f'{path}.tmp.npz'
+        np.savez(temporary, model_version=np.array(self.model_version), catalog_version=np.array(self.catalog_version),
+                 classes=self.classes, keys=self.keys, probabilities=self.probabilities)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as archive:
+            return cls(str(archive['model_version']), str(archive['catalog_version']), archive['classes'],
+                       archive['keys'], archive['probabilities'])
+
+
+def build_catalog_predictions(store, bundle, prepare_features, score_features):
+    """Score every catalog movie with bundle in one pass.
+
+    prepare_features(movie, bundle=..., record_metrics=...) and
+    score_features(rows, bundle) are the app's own, so catalog rows get
+    exactly the features and probabilities a live request would. Their
+    talent lookups are not counted in the metrics, since no request made them.
+    """
+    rows = [prepare_features(catalog_movie(store, row), bundle=bundle, record_metrics=False)
+            for row in range(store.size)]
+    probabilities = np.asarray(score_features(rows, bundle)) if rows else \
+        np.empty((0, len(bundle.classes_)), dtype=np.float64)
+    keys = np.array([feature_key(features) for features in rows], dtype='U32')
+    return CatalogPredictions(bundle.version, store.version, bundle.classes_, keys, probabilities)
+
+
+def load_catalog_predictions(path, model_version, catalog_version):
+    """The table saved at path when it matches both versions, else None"""
+    if not os.path.exists(path):
+        return None
+    try:
+        table = CatalogPredictions.load(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    return table if table.matches(model_version, catalog_version) else None
@@ -0,0 +1,368 @@
+"""Flat, memory-mapped model artifact that can be served without sklearn.
+
+The export step (export_compiled_model.py) flattens the fitted pipeline into
+a directory of .npy arrays plus a JSON manifest:
+
+    manifest.json          format version, feature layout, scaler and
+                           imputer parameters, one-hot vocabularies, classes
+    children_left.npy      int64, absolute node index; leaves point to
+                           themselves so traversal needs no leaf test
+    children_right.npy     int64
+    feature.npy            int32, input column tested at each node
+    threshold.npy          float64
+    leaf_proba.npy         float64 (n_nodes, n_classes), normalized per node
+    tree_offsets.npy       int64, index of each tree's root node
+    success_rates.json     optional director/actor success rate tables
+
+Arrays are opened with numpy memmaps, so every worker process maps the same
+page-cache pages instead of unpickling a private copy of the forest. This
+module only depends on numpy; importing it never imports sklearn.
+
+CompiledModel.from_pipeline builds the same arrays in memory from a fitted
+pipeline, which gives the sklearn-backed app a native inference engine for
+single requests (INFERENCE_ENGINE=native).
+"""
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+
+FORMAT_VERSION = 2
+MANIFEST_FILE = 'manifest.json'
+SUCCESS_RATES_FILE = 'success_rates.json'
+ARRAY_NAMES = ['children_left', 'children_right', 'feature', 'threshold', 'leaf_proba', 'tree_offsets']
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _column(frame, name):
+    """Fetch a column from a DataFrame or a dict of sequences as a list"""
+    values = frame[name]
+    if hasattr(values, 'tolist'):
+        return values.tolist()
+    return list(values)
+
+
+def _pipeline_steps(transformer):
+    """Named steps of a transformer that may or may not be a Pipeline"""
+    if hasattr(transformer, 'named_steps'):
+        return dict(transformer.named_steps)
+    return {type(transformer).__name__.lower(): transformer}
+
+
+def _find_step(steps, class_name):
+    for step in steps.values():
+        if type(step).__name__ == class_name:
+            return step
+    return None
+
+
+def describe_preprocessor(pipeline):
+    """The fitted preprocessing of a pipeline as plain data: (numeric, categorical).
+
+    Supported layout: a 'preprocessor' ColumnTransformer(num=[imputer] +
+    StandardScaler, cat=[imputer] + OneHotEncoder) before the final
+    estimator, whatever that estimator is.
+    """
+    preprocessor = pipeline.named_steps.get('preprocessor')
+    if preprocessor is None:
+        raise ValueError('Expected a pipeline with a preprocessor step')
+    if preprocessor.remainder != 'drop':
+        raise ValueError('ColumnTransformer remainder must be "drop"')
+
+    numeric = None
+    categorical = []
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer == 'drop' or name == 'remainder':
+            continue
+        steps = _pipeline_steps(transformer)
+        scaler = _find_step(steps, 'StandardScaler')
+        encoder = _find_step(steps, 'OneHotEncoder')
+        imputer = _find_step(steps, 'SimpleImputer')
+
+        if scaler is not None and numeric is None:
+            numeric = {
+                'columns': list(columns),
+                'impute': imputer.statistics_.tolist() if imputer is not None else None,
+                'mean': scaler.mean_.tolist() if scaler.with_mean else [0.0] * len(columns),
+                'scale': scaler.scale_.tolist() if scaler.with_std else [1.0] * len(columns)
+            }
+        elif encoder is not None:
+            if encoder.drop is not None or encoder.handle_unknown not in ('ignore', 'infrequent_if_exist'):
+                raise ValueError('OneHotEncoder must use drop=None and ignore unknown categories')
+            for column, categories, rare in zip(columns, encoder.categories_, encoder.infrequent_categories_):
+                rare = set(rare.tolist()) if rare is not None else set()
+                frequent = [category for category in categories.tolist() if category not in rare]
+                vocabulary = {category: index for index, category in enumerate(frequent)}
+                for category in rare:
+                    vocabulary[category] = len(frequent)
+                categorical.append({
+                    'column': column,
+                    'fill_value': imputer.fill_value if imputer is not None else None,
+                    'vocabulary': vocabulary,
+                    'width': len(frequent) + (1 if rare else 0),
+                    'unknown': len(frequent) if (rare and encoder.handle_unknown == 'infrequent_if_exist') else None
+                })
+        else:
+            raise ValueError(f'Unsupported transformer {name!r}')
+
+    if numeric is None:
+        raise ValueError('Pipeline has no StandardScaler branch')
+    return numeric, categorical
+
+
+def describe_pipeline(pipeline):
+    """Extract the fitted parameters of a supported pipeline as plain data.
+
+    Supported layout: the preprocessing of describe_preprocessor followed by
+    a RandomForestClassifier. Returns (manifest, arrays).
+    """
+    forest = pipeline.steps[-1][1]
+    if type(forest).__name__ != 'RandomForestClassifier':
+        raise ValueError('Expected a preprocessor + RandomForestClassifier pipeline')
+    numeric, categorical = describe_preprocessor(pipeline)
+
+    children_left, children_right, feature, threshold, leaf_proba, offsets = [], [], [], [], [], []
+    offset = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        offsets.append(offset)
+        nodes = np.arange(tree.node_count, dtype=np.int64) + offset
+        leaf = tree.children_left == -1
+        children_left.append(np.where(leaf, nodes, tree.children_left + offset).astype(np.int64))
+        children_right.append(np.where(leaf, nodes, tree.children_right + offset).astype(np.int64))
+        feature.append(np.maximum(tree.feature, 0).astype(np.int32))
+        threshold.append(tree.threshold.astype(np.float64))
+        # Same normalization DecisionTreeClassifier.predict_proba applies
+        proba = tree.value[:, 0, :forest.n_classes_].astype(np.float64)
+        normalizer = proba.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        leaf_proba.append(proba / normalizer)
+        offset += tree.node_count
+
+    arrays = {
+        'children_left': np.concatenate(children_left),
+        'children_right': np.concatenate(children_right),
+        'feature': np.concatenate(feature),
+        'threshold': np.concatenate(threshold),
+        'leaf_proba': np.ascontiguousarray(np.concatenate(leaf_proba)),
+        'tree_offsets': np.array(offsets, dtype=np.int64)
+    }
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'model_type': 'RandomForestClassifier',
+        'classes': forest.classes_.tolist(),
+        'n_estimators': len(forest.estimators_),
+        'n_features': int(forest.n_features_in_),
+        'max_depth': int(max(estimator.tree_.max_depth for estimator in forest.estimators_)),
+        'numeric': numeric,
+        'categorical': categorical
+    }
+    return manifest, arrays
+
+
+def export_compiled_model(pipeline, output_dir, success_rates=None, source_path=None):
+    """Write pipeline (and optional success rate tables) as a compiled artifact.
+
+    success_rates maps table names ('director', 'actor1', ...) to dicts.
+    Returns the manifest that was written.
+    """
+    manifest, arrays = describe_pipeline(pipeline)
+    os.makedirs(output_dir, exist_ok=True)
+
+    digest = hashlib.sha256()
+    for name in ARRAY_NAMES:
+        np.save(os.path.join(output_dir, f'{name}.npy'), arrays[name])
+        digest.update(arrays[name].tobytes())
+    digest.update(json.dumps(manifest, sort_keys=True).encode('utf-8'))
+    manifest['model_version'] = digest.hexdigest()[:16]
+    if source_path is not None:
+        manifest['source'] = os.path.basename(source_path)
+
+    if success_rates is not None:
+        with open(os.path.join(output_dir, SUCCESS_RATES_FILE), 'w', encoding='utf-8') as f:
+            json.dump({name: dict(rates) for name, rates in success_rates.items()}, f, ensure_ascii=False)
+
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+class FeatureEncoder:
+    """The exported preprocessing: imputation, scaling and one-hot encoding in NumPy.
+
+    numeric and categorical are the specs describe_preprocessor returns.
+    The output is the float32 matrix the pipeline's final estimator sees,
+    so it can also feed an sklearn forest directly.
+    """
+
+    def __init__(self, numeric, categorical):
+        self.numeric_columns = numeric['columns']
+        self.impute = np.array(numeric['impute'], dtype=np.float64) if numeric['impute'] is not None else None
+        self.mean = np.array(numeric['mean'], dtype=np.float64)
+        self.scale = np.array(numeric['scale'], dtype=np.float64)
+        self.categorical = categorical
+        self.categorical_columns = [spec['column'] for spec in categorical]
+
+        # Column where each one-hot block starts in the model input
+        self.category_offsets = []
+        offset = len(self.numeric_columns)
+        for spec in self.categorical:
+            self.category_offsets.append(offset)
+            offset += spec['width']
+        self.n_features = offset
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        return cls(*describe_preprocessor(pipeline))
+
+    def encode(self, numeric, categorical_values, out=None):
+        """Scale numeric columns and one-hot encode categoricals into model input.
+
+        numeric is a float64 (n_rows, n_numeric) array in numeric_columns
+        order, which is overwritten; categorical_values holds one sequence
+        of raw values per categorical column. out, when given, is a float32
+        (n_rows, n_features) array the input is written to and returned.
+        """
+        n_rows = numeric.shape[0]
+        if self.impute is not None:
+            missing = np.isnan(numeric)
+            if missing.any():
+                numeric[missing] = np.broadcast_to(self.impute, numeric.shape)[missing]
+
+        if out is None:
+            X = np.zeros((n_rows, self.n_features), dtype=np.float32)
+        else:
+            X = out
+            X.fill(0.0)
+        # Same operation order as StandardScaler.transform. Trees compare
+        # float32 inputs against float64 thresholds, as sklearn does, so the
+        # scaled values are rounded to float32 when they are stored
+        numeric -= self.mean
+        numeric /= self.scale
+        X[:, :len(self.numeric_columns)] = numeric
+
+        for spec, offset, values in zip(self.categorical, self.category_offsets, categorical_values):
+            vocabulary = spec['vocabulary']
+            fill_value = spec['fill_value']
+            if fill_value is not None:
+                values = [fill_value if _is_missing(value) else value for value in values]
+            # -1 marks values with no one-hot column
+            unknown = -1 if spec['unknown'] is None else spec['unknown']
+            codes = np.fromiter((vocabulary.get(value, unknown) for value in values), dtype=np.int64, count=n_rows)
+            rows = np.flatnonzero(codes >= 0)
+            X[rows, offset + codes[rows]] = 1.0
+        return X
+
+    def transform(self, frame):
+        """Encode a DataFrame or dict of columns"""
+        numeric = np.array([_column(frame, name) for name in self.numeric_columns], dtype=np.float64).T
+        return self.encode(numeric, [_column(frame, column) for column in self.categorical_columns])
+
+    def transform_records(self, records):
+        """Encode a list of feature dicts"""
+        numeric = np.array([[record[name] for name in self.numeric_columns] for record in records],
+                           dtype=np.float64).reshape(len(records), len(self.numeric_columns))
+        return self.encode(numeric, [[record[column] for record in records] for column in self.categorical_columns])
+
+
+class CompiledModel:
+    """Evaluates a compiled artifact with numpy only.
+
+    Exposes classes_, predict_proba() and predict() like the sklearn pipeline
+    it was exported from, and accepts the same feature DataFrame (or a dict
+    of column sequences). predict_proba_records() takes the feature dicts
+    built by prepare_features directly and skips pandas entirely.
+    """
+
+    # Rows scored per traversal pass, which bounds the (rows x trees) buffers
+    CHUNK_ROWS = 4096
+
+    def __init__(self, manifest, arrays, success_rates=None):
+        if manifest.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled model format {manifest.get('format_version')!r}; "
+                             f"re-run export_compiled_model.py")
+        self.manifest = manifest
+        self.version = manifest.get('model_version')
+        self.classes_ = np.array(manifest['classes'])
+        self.success_rates = success_rates
+        self.n_features = manifest['n_features']
+        self.max_depth = manifest['max_depth']
+
+        self.encoder = FeatureEncoder(manifest['numeric'], manifest['categorical'])
+        self.numeric_columns = self.encoder.numeric_columns
+        self.categorical = self.encoder.categorical
+
+        for name in ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+        self.n_estimators = len(self.tree_offsets)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Open a compiled artifact directory, memory-mapping its arrays"""
+        with open(os.path.join(path, MANIFEST_FILE), encoding='utf-8') as f:
+            manifest = json.load(f)
+        mmap_mode = 'r' if mmap else None
+        arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+                  for name in ARRAY_NAMES}
+
+        success_rates = None
+        rates_path = os.path.join(path, SUCCESS_RATES_FILE)
+        if os.path.exists(rates_path):
+            with open(rates_path, encoding='utf-8') as f:
+                success_rates = json.load(f)
+        return cls(manifest, arrays, success_rates)
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """Build an in-memory engine straight from a fitted sklearn pipeline"""
+        manifest, arrays = describe_pipeline(pipeline)
+        return cls(manifest, arrays)
+
+    def transform(self, frame):
+        """Apply the exported preprocessing to a DataFrame or dict of columns"""
+        return self.encoder.transform(frame)
+
+    def transform_records(self, records):
+        """Apply the exported preprocessing to a list of feature dicts"""
+        return self.encoder.transform_records(records)
+
+    def apply(self, X):
+        """Leaf node index reached in every tree, shape (n_rows, n_estimators).
+
+        All trees and rows advance one level per step. Leaves point to
+        themselves, so max_depth steps always settle every path without a
+        per-node leaf test.
+        """
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        node = np.broadcast_to(self.tree_offsets, (X.shape[0], self.n_estimators)).copy()
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.children_left[node], self.children_right[node])
+        return node
+
+    def predict_proba_encoded(self, X):
+        """predict_proba for model input already encoded by self.encoder"""
+        proba = np.empty((X.shape[0], len(self.classes_)), dtype=np.float64)
+        for start in range(0, X.shape[0], self.CHUNK_ROWS):
+            leaves = self.apply(X[start:start + self.CHUNK_ROWS])
+            # cumsum adds tree by tree in order, the same summation order as
+            # sklearn's forest, so results match it bit for bit
+            total = np.cumsum(self.leaf_proba[leaves], axis=1)[:, -1]
+            proba[start:start + self.CHUNK_ROWS] = total / self.n_estimators
+        return proba
+
+    def predict_proba(self, frame):
+        return self.predict_proba_encoded(self.transform(frame))
+
+    def predict_proba_records(self, records):
+        """predict_proba for a list of prepare_features dicts, without pandas"""
+        return self.predict_proba_encoded(self.transform_records(records))
+
+    def predict(self, frame):
+        return self.classes_[self.predict_proba(frame).argmax(axis=1)]
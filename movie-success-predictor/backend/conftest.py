@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app as backend_app
+from create_sample_model import create_sample_model
+
+
+@pytest.fixture(scope='session')
+def sample_artifacts(tmp_path_factory):
+    """Train the sample model into a temporary directory and return its path"""
+    artifacts_dir = tmp_path_factory.mktemp('artifacts')
+    cwd = os.getcwd()
+    os.chdir(artifacts_dir)
+    try:
+        create_sample_model()
+    finally:
+        os.chdir(cwd)
+    return str(artifacts_dir)
+
+
+@pytest.fixture
+def loaded_app(sample_artifacts):
+    """Load the sample model and success rates into the Flask app's globals"""
+    assert backend_app.load_model_and_data(sample_artifacts)
+    return backend_app
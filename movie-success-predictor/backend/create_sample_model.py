@@ -11,14 +11,32 @@ from sklearn.metrics import classification_report, accuracy_score, roc_auc_score
 
 warnings.filterwarnings('ignore')
 
-def create_sample_model():
-    """Create a sample model using the same approach as the Colab code"""
-    
-    print("🎬 Creating sample movie success prediction model...")
+NUMERIC_FEATURES = [
+    'budget', 'runtime', 'avg_rating', 'ratings_count',
+    'release_year', 'release_month', 'director_success_rate',
+    'actor1_success_rate', 'actor2_success_rate', 'actor3_success_rate'
+]
+
+CATEGORICAL_FEATURES = ['genres', 'original_language', 'production_companies']
+
+# Features for modeling (matching the backend expectations)
+FEATURES = [
+    'budget', 'runtime', 'genres', 'original_language', 'avg_rating',
+    'ratings_count', 'release_year', 'release_month',
+    'director_success_rate', 'actor1_success_rate',
+    'actor2_success_rate', 'actor3_success_rate',
+    'production_companies'
+]
+TARGET = 'success'
+
+def make_sample_movies(n_samples=3000, seed=42):
+    """Synthetic TMDB-like movies with a success label.
+
+    Returns (movies, director_success_rates, actor_success_rates).
+    """
     
     # Create synthetic data similar to TMDB dataset
-    np.random.seed(42)
-    n_samples = 3000
+    np.random.seed(seed)
     
     # Generate realistic movie data
     budget = np.random.uniform(100000, 300000000, n_samples)
@@ -117,48 +135,45 @@ def create_sample_model():
                         (movies['director_success_rate'] > 0.5) & 
                         (movies['actor1_success_rate'] > 0.4)).astype(int)
     
-    # Features for modeling (matching the backend expectations)
-    features = [
-        'budget', 'runtime', 'genres', 'original_language', 'avg_rating',
-        'ratings_count', 'release_year', 'release_month',
-        'director_success_rate', 'actor1_success_rate',
-        'actor2_success_rate', 'actor3_success_rate',
-        'production_companies'
-    ]
-    target = 'success'
-    
-    X = movies[features]
-    y = movies[target]
-    
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
-    
-    # Preprocessing pipeline (matching Colab code)
-    numeric_features = [
-        'budget', 'runtime', 'avg_rating', 'ratings_count',
-        'release_year', 'release_month', 'director_success_rate',
-        'actor1_success_rate', 'actor2_success_rate', 'actor3_success_rate'
-    ]
-    
-    categorical_features = ['genres', 'original_language', 'production_companies']
-    
+    return movies, director_success_rates, actor_success_rates
+
+def build_pipeline(classifier, memory=None):
+    """Preprocessing (matching Colab code) followed by classifier.
+
+    memory is passed to Pipeline to cache the fitted preprocessor.
+    """
     numeric_transformer = Pipeline(steps=[('scaler', StandardScaler())])
     categorical_transformer = Pipeline(steps=[
         ('onehot', OneHotEncoder(handle_unknown='ignore', max_categories=10))
     ])
     
     preprocessor = ColumnTransformer(transformers=[
-        ('num', numeric_transformer, numeric_features),
-        ('cat', categorical_transformer, categorical_features)
+        ('num', numeric_transformer, NUMERIC_FEATURES),
+        ('cat', categorical_transformer, CATEGORICAL_FEATURES)
     ])
     
-    # Random Forest Model
-    model_pipeline = Pipeline(steps=[
+    return Pipeline(steps=[
         ('preprocessor', preprocessor),
-        ('classifier', RandomForestClassifier(random_state=42))
-    ])
+        ('classifier', classifier)
+    ], memory=memory)
+
+def create_sample_model():
+    """Create a sample model using the same approach as the Colab code"""
+    
+    print("🎬 Creating sample movie success prediction model...")
+    
+    movies, director_success_rates, actor_success_rates = make_sample_movies()
+    
+    X = movies[FEATURES]
+    y = movies[TARGET]
+    
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+    
+    # Random Forest Model
+    model_pipeline = build_pipeline(RandomForestClassifier(random_state=42))
     
     # Train model
     model_pipeline.fit(X_train, y_train)
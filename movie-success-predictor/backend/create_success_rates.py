@@ -1,12 +1,44 @@
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 import numpy as np
 import pandas as pd
 import joblib
 import ast
 import warnings
-from collections import defaultdict
+
+from model_bundle import SUCCESS_RATE_FILES
+from movie_dataset import EXTENSION as DATASET_EXTENSION, read_table
+from success_counts import (count_roles, count_successes, counts_from_artifact, counts_to_artifact,
+                            is_counts_artifact, merge_role_counts, rates_from_counts, save_artifact)
 
 warnings.filterwarnings('ignore')
 
+# Rows of crew/cast handed to each worker process at a time
+EXTRACT_CHUNK_ROWS = 2000
+
+# The only columns of the TMDB data that counting reads
+CREDIT_COLUMNS = ['budget', 'revenue', 'crew', 'cast']
+
+# A quoted string in either style; escapes are left to the decoder
+_STRING = r"""'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*\""""
+# One flat dict in a list literal, e.g. {'name': "O'Brien", 'order': 0}
+_LITERAL_ITEM = re.compile(r"\{(?:[^{}\[\]'\"]|" + _STRING + r")*\}")
+# Quoted strings and bare constants inside an item, rewritten for json.loads
+_LITERAL_TOKEN = re.compile(_STRING + r"|\b(?:None|True|False|null|true|false)\b")
+_SEPARATOR = re.compile(r'\s*(,?)\s*')
+# String bodies whose escapes mean the same to json.loads and literal_eval
+# (so no \/ and no surrogate halves, which JSON would pair up)
+_SHARED_ESCAPES = re.compile(r'(?:[^\\]|\\["\\bfnrt]|\\u(?![dD][89a-fA-F])[0-9a-fA-F]{4})*')
+# Escapes that can spell out letters, so a substring test on the raw text misses them
+_LETTER_ESCAPE = re.compile(r'\\[uUxN0-7]')
+_SURROGATE = re.compile('[\ud800-\udfff]')
+_JSON_CONSTANTS = {'None': 'null', 'True': 'true', 'False': 'false'}
+
 def safe_literal_eval(x):
     """Safely evaluate string representations of lists/dicts"""
     try:
@@ -14,8 +46,71 @@ def safe_literal_eval(x):
     except:
         return []
 
+def _json_token(match):
+    """A Python or JSON string literal or constant as JSON"""
+    token = match.group()
+    if token in _JSON_CONSTANTS:
+        return _JSON_CONSTANTS[token]
+    if token[0] not in '\'"':
+        # literal_eval rejects null/true/false, so the fallback must see them
+        raise ValueError(f'JSON constant {token}')
+    body = token[1:-1]
+    if '\\' not in body:
+        return '"' + body.replace('"', '\\"') + '"'
+    if token[0] == '"' and _SHARED_ESCAPES.fullmatch(body):
+        return token
+    try:
+        value = ast.literal_eval(token)
+    except SyntaxError as e:
+        raise ValueError(str(e))
+    if _SURROGATE.search(value):
+        raise ValueError('surrogate in string')
+    return json.dumps(value)
+
+def iter_literal_items(text, contains=None):
+    """Yield the dicts of a list literal one at a time.
+
+    Accepts the Python repr format (single quotes, None) as well as JSON.
+    Items are found with one regex match each and only decoded when
+    yielded, so a caller that stops early never parses the rest of the
+    list. With contains, items whose text lacks that substring are skipped
+    undecoded. Raises ValueError when text is not a bracketed list of flat
+    dicts; callers fall back to safe_literal_eval then.
+    """
+    if not isinstance(text, str):
+        raise ValueError('not a string')
+    text = text.strip()
+    if not (text.startswith('[') and text.endswith(']')):
+        raise ValueError('not a list literal')
+    pos = 1
+    first = True
+    while True:
+        separator = _SEPARATOR.match(text, pos)
+        pos = separator.end()
+        if pos == len(text) - 1:
+            if first and separator.group(1):
+                raise ValueError('malformed list literal')
+            return
+        if separator.group(1) != ('' if first else ','):
+            raise ValueError('malformed list literal')
+        item = _LITERAL_ITEM.match(text, pos)
+        if item is None:
+            raise ValueError('list items must be flat dicts')
+        pos = item.end()
+        first = False
+        raw = item.group()
+        if contains is None or contains in raw or _LETTER_ESCAPE.search(raw):
+            yield json.loads(_LITERAL_TOKEN.sub(_json_token, raw), strict=False)
+
 def get_director(crew_data):
     """Extract director from crew data"""
+    try:
+        for member in iter_literal_items(crew_data, contains='Director'):
+            if member.get('job') == 'Director':
+                return member.get('name')
+        return np.nan
+    except ValueError:
+        pass
     for member in safe_literal_eval(crew_data):
         if member.get('job') == 'Director':
             return member.get('name')
@@ -23,101 +118,150 @@ def get_director(crew_data):
 
 def get_top_actors(cast_data, n=3):
     """Extract top n actors from cast data"""
-    cast = safe_literal_eval(cast_data)
+    try:
+        cast = list(islice(iter_literal_items(cast_data), n))
+    except ValueError:
+        cast = safe_literal_eval(cast_data)
     return [member.get('name') for member in cast[:n]] if cast else [np.nan]*n
 
+def extract_credits(crew, cast):
+    """Director and top three actors for lists of crew and cast strings"""
+    return [get_director(x) for x in crew], [get_top_actors(x, 3) for x in cast]
+
 def calculate_success_rate(series, success_series):
     """Calculate success rate for each unique value in series"""
-    success_rates = {}
-    for value in series.unique():
-        if pd.notna(value) and value != '':
-            mask = series == value
-            if mask.sum() > 0:
-                success_rate = success_series[mask].mean()
-                success_rates[value] = success_rate
+    counts = count_successes(series, success_series)
+    return dict(zip(counts.index, (counts['hits'] / counts['films']).tolist()))
+
+def extract_people(movies, executor=None):
+    """Add director, actor1..3 and success columns from TMDB crew/cast data.
+
+    With an executor (e.g. a ProcessPoolExecutor) the rows are parsed in
+    chunks of EXTRACT_CHUNK_ROWS across its workers.
+    """
+    crew = movies['crew'].tolist()
+    cast = movies['cast'].tolist()
+    if executor is None:
+        directors, actors = extract_credits(crew, cast)
+    else:
+        directors, actors = [], []
+        starts = range(0, len(movies), EXTRACT_CHUNK_ROWS)
+        for part_directors, part_actors in executor.map(
+                extract_credits,
+                [crew[start:start + EXTRACT_CHUNK_ROWS] for start in starts],
+                [cast[start:start + EXTRACT_CHUNK_ROWS] for start in starts]):
+            directors.extend(part_directors)
+            actors.extend(part_actors)
+
+    movies['director'] = pd.Series(directors, index=movies.index)
+    movies[['actor1', 'actor2', 'actor3']] = pd.DataFrame(actors, index=movies.index)
+    
+    # Define success criteria (revenue > 1.5 * budget)
+    movies['success'] = (movies['revenue'] > 1.5 * movies['budget']).astype(int)
+    return movies
+
+def count_csv(csv_path, chunksize=None, workers=None):
+    """Per-role hit and film counts for every movie in a TMDB CSV.
+
+    Only CREDIT_COLUMNS are parsed, and csv_path may also be a dataset
+    written by build_dataset.py. With chunksize the CSV is streamed that
+    many rows at a time and only the per-person counts are kept in memory,
+    for files larger than RAM. Cast and crew are parsed by workers processes
+    (default: one per CPU). Returns (role_counts, movies, hits).
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # Load the TMDB data
+    print("📊 Loading TMDB data...")
+    if chunksize and not csv_path.endswith(DATASET_EXTENSION):
+        chunks = pd.read_csv(csv_path, chunksize=chunksize, usecols=CREDIT_COLUMNS)
+    else:
+        chunks = [read_table(csv_path, CREDIT_COLUMNS)]
+    
+    # Extract director and actors, then count hits and films per person
+    print("🎭 Extracting director and actor information...")
+    role_counts = None
+    total_movies = 0
+    total_hits = 0
+    executor = ProcessPoolExecutor(workers) if workers > 1 else None
+    try:
+        for chunk in chunks:
+            chunk = extract_people(chunk, executor)
+            role_counts = merge_role_counts(role_counts, count_roles(chunk))
+            total_movies += len(chunk)
+            total_hits += int(chunk['success'].sum())
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    if not total_movies:
+        raise ValueError(f'No movies in {csv_path}')
+    print(f"✅ Loaded {total_movies} movies")
     
-    return success_rates
+    print(f"📈 Success rate: {total_hits / total_movies:.2%}")
+    return role_counts, total_movies, total_hits
+
+def save_role_counts(role_counts, artifacts_dir='.', min_count=2):
+    """Write each role's counts to its *_success.joblib file"""
+    for role, filename in SUCCESS_RATE_FILES.items():
+        save_artifact(counts_to_artifact(role_counts[role], min_count), os.path.join(artifacts_dir, filename))
+
+def load_role_counts(artifacts_dir='.'):
+    """Read the counts written by save_role_counts.
 
-def create_success_rates():
-    """Create success rate dictionaries from TMDB data"""
+    Returns (role_counts, min_count). Raises ValueError if a file holds
+    plain rates, which cannot be added to.
+    """
+    role_counts = {}
+    min_count = 2
+    for role, filename in SUCCESS_RATE_FILES.items():
+        table = joblib.load(os.path.join(artifacts_dir, filename))
+        if not is_counts_artifact(table):
+            raise ValueError(f"{filename} holds success rates, not counts; rebuild it once with 'build'")
+        role_counts[role] = counts_from_artifact(table)
+        min_count = table.get('min_count', min_count)
+    return role_counts, min_count
+
+def print_summary(role_counts, min_count):
+    """Print table sizes and the top rates as the server will derive them"""
+    tables = rates_from_counts(role_counts, min_count)
+    director_success = tables['director']
+    actor1_success = tables['actor1']
+    
+    print(f"📁 director_success.joblib - {len(director_success)} directors ({len(role_counts['director'])} counted)")
+    for role in ['actor1', 'actor2', 'actor3']:
+        print(f"📁 {role}_success.joblib - {len(tables[role])} actors ({len(role_counts[role])} counted)")
+    
+    # Show some examples
+    print("\n📊 Sample director success rates:")
+    for director, rate in sorted(director_success.items(), key=lambda x: x[1], reverse=True)[:5]:
+        print(f"   {director}: {rate:.1%}")
+    
+    print("\n🎭 Sample actor success rates:")
+    for actor, rate in sorted(actor1_success.items(), key=lambda x: x[1], reverse=True)[:5]:
+        print(f"   {actor}: {rate:.1%}")
+
+def create_success_rates(csv_path='../public/final_tmdb_cleaned.csv', chunksize=None, min_count=2, workers=None,
+                         artifacts_dir='.'):
+    """Create the success rate tables from TMDB data.
+
+    The *_success.joblib files hold each person's hit and film counts; the
+    rates, limited to people with at least min_count films, are derived
+    from them when the server loads the tables. See count_csv for chunksize
+    and workers.
+    """
     
     print("🎬 Creating success rate dictionaries from TMDB data...")
     
     try:
-        # Load the TMDB data
-        print("📊 Loading TMDB data...")
-        movies = pd.read_csv('../public/final_tmdb_cleaned.csv')
-        print(f"✅ Loaded {len(movies)} movies")
-        
-        # Extract director and actors
-        print("🎭 Extracting director and actor information...")
-        movies['director'] = movies['crew'].apply(get_director)
-        movies[['actor1', 'actor2', 'actor3']] = pd.DataFrame(
-            movies['cast'].apply(lambda x: get_top_actors(x, 3)).tolist(), 
-            index=movies.index
-        )
-        
-        # Define success criteria (revenue > 1.5 * budget)
-        movies['success'] = (movies['revenue'] > 1.5 * movies['budget']).astype(int)
-        
-        print(f"📈 Success rate: {movies['success'].mean():.2%}")
+        role_counts, _, _ = count_csv(csv_path, chunksize, workers)
         
-        # Calculate success rates
-        print("📊 Calculating director success rates...")
-        director_success = calculate_success_rate(movies['director'], movies['success'])
-        
-        print("🎭 Calculating actor success rates...")
-        actor1_success = calculate_success_rate(movies['actor1'], movies['success'])
-        actor2_success = calculate_success_rate(movies['actor2'], movies['success'])
-        actor3_success = calculate_success_rate(movies['actor3'], movies['success'])
-        
-        # Filter out low-frequency entries (less than 2 movies)
-        def filter_low_frequency(success_dict, min_count=2):
-            filtered = {}
-            for person, rate in success_dict.items():
-                if pd.notna(person) and person != '':
-                    # Count how many movies this person has
-                    if person in movies['director'].values:
-                        count = (movies['director'] == person).sum()
-                    elif person in movies['actor1'].values:
-                        count = (movies['actor1'] == person).sum()
-                    elif person in movies['actor2'].values:
-                        count = (movies['actor2'] == person).sum()
-                    elif person in movies['actor3'].values:
-                        count = (movies['actor3'] == person).sum()
-                    else:
-                        count = 0
-                    
-                    if count >= min_count:
-                        filtered[person] = rate
-            return filtered
-        
-        director_success = filter_low_frequency(director_success)
-        actor1_success = filter_low_frequency(actor1_success)
-        actor2_success = filter_low_frequency(actor2_success)
-        actor3_success = filter_low_frequency(actor3_success)
-        
-        # Save success rate dictionaries
-        print("💾 Saving success rate dictionaries...")
-        joblib.dump(director_success, 'director_success.joblib')
-        joblib.dump(actor1_success, 'actor1_success.joblib')
-        joblib.dump(actor2_success, 'actor2_success.joblib')
-        joblib.dump(actor3_success, 'actor3_success.joblib')
+        # Save per-person counts; rates are derived from them on load
+        print("💾 Saving success counts...")
+        save_role_counts(role_counts, artifacts_dir, min_count)
         
         print("\n✅ Success rate dictionaries created successfully!")
-        print(f"📁 director_success.joblib - {len(director_success)} directors")
-        print(f"📁 actor1_success.joblib - {len(actor1_success)} actors")
-        print(f"📁 actor2_success.joblib - {len(actor2_success)} actors")
-        print(f"📁 actor3_success.joblib - {len(actor3_success)} actors")
-        
-        # Show some examples
-        print("\n📊 Sample director success rates:")
-        for director, rate in sorted(director_success.items(), key=lambda x: x[1], reverse=True)[:5]:
-            print(f"   {director}: {rate:.1%}")
-        
-        print("\n🎭 Sample actor success rates:")
-        for actor, rate in sorted(actor1_success.items(), key=lambda x: x[1], reverse=True)[:5]:
-            print(f"   {actor}: {rate:.1%}")
+        print_summary(role_counts, min_count)
         
         return True
         
@@ -129,6 +273,37 @@ def create_success_rates():
         print("Creating sample success rates instead...")
         return create_sample_success_rates()
 
+def update_success_rates(delta_csv, artifacts_dir='.', chunksize=None, workers=None):
+    """Add the movies in delta_csv to the saved success counts.
+
+    Only the delta is parsed and counted, then summed into the existing
+    counts and written back; a server watching the artifacts picks up the
+    new rates on its next reload. delta_csv must hold only movies that have
+    not been counted yet. Returns True on success.
+    """
+    
+    print("🎬 Updating success counts with new releases...")
+    
+    try:
+        role_counts, min_count = load_role_counts(artifacts_dir)
+        delta_counts, _, _ = count_csv(delta_csv, chunksize, workers)
+        merged = merge_role_counts(role_counts, delta_counts)
+        
+        new_people = sum(len(merged[role]) - len(role_counts[role]) for role in merged)
+        print(f"👤 {new_people} new director/actor entries")
+        
+        print("💾 Saving success counts...")
+        save_role_counts(merged, artifacts_dir, min_count)
+        
+        print("\n✅ Success counts updated!")
+        print_summary(merged, min_count)
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error updating success rates: {e}")
+        return False
+
 def create_sample_success_rates():
     """Create sample success rate dictionaries for testing"""
     
@@ -179,4 +354,27 @@ def create_sample_success_rates():
     return True
 
 if __name__ == '__main__':
-    create_success_rates() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Build director and actor success rate tables from TMDB data')
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--artifacts', default='.', help='directory holding the *_success.joblib files')
+    common.add_argument('--chunksize', type=int, default=None,
+                        help='stream the CSV this many rows at a time instead of loading it whole')
+    common.add_argument('--workers', type=int, default=None,
+                        help='processes parsing cast and crew (default: one per CPU)')
+    commands = parser.add_subparsers(dest='command')
+    build = commands.add_parser('build', parents=[common],
+                                help='count every movie in a TMDB CSV and write the tables (the default)')
+    build.add_argument('--csv', default='../public/final_tmdb_cleaned.csv', help='TMDB movies CSV with cast and crew')
+    build.add_argument('--min-count', type=int, default=2, help='minimum films per person')
+    update = commands.add_parser('update', parents=[common],
+                                 help='add the movies in a CSV of new releases to the saved counts')
+    update.add_argument('csv', help='TMDB CSV holding only movies not counted yet')
+    # build is the default: without a subcommand the flags given are build's
+    argv = sys.argv[1:]
+    if not argv or argv[0] not in list(commands.choices) + ['-h', '--help']:
+        argv = ['build'] + argv
+    args = parser.parse_args(argv)
+    if args.command == 'update':
+        update_success_rates(args.csv, args.artifacts, args.chunksize, args.workers)
+    else:
+        create_success_rates(args.csv, args.chunksize, args.min_count, args.workers, args.artifacts)
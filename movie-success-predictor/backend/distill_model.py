@@ -0,0 +1,232 @@
+"""Compress saved_model.pkl into a smaller model with bounded inference cost.
+
+Three kinds of student are built from the trained (teacher) pipeline:
+
+- forest: a RandomForestClassifier with fewer, shallower trees
+- hgb: a HistGradientBoostingClassifier
+- pruned: the teacher forest minus the trees whose removal does not lower
+  validation ROC AUC by more than --prune-tolerance
+
+The forest and hgb students learn the teacher's probabilities rather than
+the 0/1 labels. Each training row is given once per class, weighted by the
+teacher's probability of that class.
+
+Rows are split as in create_sample_model.py and train_model.py, so a
+teacher trained by either never saw the holdout. Half of the holdout picks
+the students, and the other half is used for the report. The report lists
+accuracy, ROC AUC, agreement with the teacher, artifact size and per-row
+latency for each candidate. The fastest candidate within --max-auc-drop of
+the teacher (and --latency-budget-us, if set) is written as a plain pipeline
+that app.py serves with MODEL_FILE=distilled_model.pkl.
+"""
+import argparse
+import copy
+import json
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+
+from create_sample_model import build_pipeline
+from model_bundle import MODEL_FILE, unwrap_model_artifact
+from train_model import load_training_data, measure_latency
+
+DEFAULT_OUTPUT = 'distilled_model.pkl'
+
+
+def positive_probabilities(pipeline, X):
+    return pipeline.predict_proba(X)[:, 1]
+
+
+def fit_soft_labels(student, X, probabilities, classes):
+    """Fit a student pipeline on the teacher's positive-class probabilities"""
+    weights = np.concatenate([probabilities, 1 - probabilities])
+    labels = np.concatenate([np.full(len(X), classes[1]), np.full(len(X), classes[0])])
+    keep = weights > 0
+    rows = pd.concat([X, X], ignore_index=True)[keep]
+    student.fit(rows, labels[keep], classifier__sample_weight=weights[keep])
+    return student
+
+
+def prune_forest(pipeline, X, y, tolerance=0.001):
+    """Copy of a forest pipeline without the trees that do not help ROC AUC on (X, y).
+
+    Trees are dropped greedily, each time removing the one whose absence
+    scores best, while the AUC stays within tolerance of the full forest's.
+    Returns (pruned pipeline, kept tree indices).
+    """
+    forest = pipeline.named_steps['classifier']
+    if not hasattr(forest, 'estimators_'):
+        raise ValueError('Only a fitted forest can be pruned')
+    encoded = pipeline[:-1].transform(X)
+    # AUC only depends on the ranking, so summed tree probabilities score the same as their mean
+    per_tree = np.array([tree.predict_proba(encoded)[:, 1] for tree in forest.estimators_])
+    total = per_tree.sum(axis=0)
+    reference = roc_auc_score(y, total)
+
+    kept = list(range(len(per_tree)))
+    while len(kept) > 1:
+        scores = [roc_auc_score(y, total - per_tree[tree]) for tree in kept]
+        best = int(np.argmax(scores))
+        if scores[best] < reference - tolerance:
+            break
+        total -= per_tree[kept.pop(best)]
+
+    pruned = copy.deepcopy(pipeline)
+    pruned_forest = pruned.named_steps['classifier']
+    pruned_forest.estimators_ = [pruned_forest.estimators_[tree] for tree in kept]
+    pruned_forest.n_estimators = len(kept)
+    return pruned, kept
+
+
+def artifact_size(pipeline):
+    """Bytes taken by joblib.dump(pipeline), as saved_model.pkl is written"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'model.pkl')
+        joblib.dump(pipeline, path)
+        return os.path.getsize(path)
+
+
+def build_students(teacher, X_train, X_validation, y_validation, forest_trees=(10, 25, 50), forest_depths=(6, 10),
+                   hgb_iterations=(25, 50, 100), prune_tolerance=0.001, kinds=('forest', 'hgb', 'pruned'),
+                   random_state=42):
+    """(name, params, fitted pipeline) for every student of the requested kinds"""
+    probabilities = positive_probabilities(teacher, X_train)
+    classes = teacher.classes_
+    if len(classes) != 2:
+        raise ValueError('Distillation needs a binary classifier')
+
+    students = []
+    if 'forest' in kinds:
+        for trees in forest_trees:
+            for depth in forest_depths:
+                classifier = RandomForestClassifier(n_estimators=trees, max_depth=depth, random_state=random_state)
+                student = fit_soft_labels(build_pipeline(classifier), X_train, probabilities, classes)
+                students.append(('forest', {'n_estimators': trees, 'max_depth': depth}, student))
+    if 'hgb' in kinds:
+        for iterations in hgb_iterations:
+            classifier = HistGradientBoostingClassifier(max_iter=iterations, random_state=random_state)
+            student = fit_soft_labels(build_pipeline(classifier), X_train, probabilities, classes)
+            students.append(('hgb', {'max_iter': iterations}, student))
+    if 'pruned' in kinds:
+        pruned, kept = prune_forest(teacher, X_validation, y_validation, prune_tolerance)
+        students.append(('pruned', {'n_estimators': len(kept), 'tolerance': prune_tolerance}, pruned))
+    return students
+
+
+def evaluate(name, params, pipeline, teacher_labels, X_validation, y_validation, X_test, y_test, repeats=200):
+    """Report row for one candidate"""
+    probabilities = positive_probabilities(pipeline, X_test)
+    labels = pipeline.classes_[(probabilities >= 0.5).astype(int)]
+    row = {
+        'model': name,
+        'params': params,
+        'validation_roc_auc': float(roc_auc_score(y_validation, positive_probabilities(pipeline, X_validation))),
+        'accuracy': float(accuracy_score(y_test, labels)),
+        'roc_auc': float(roc_auc_score(y_test, probabilities)),
+        'teacher_agreement': float(np.mean(labels == teacher_labels)),
+        'size_kb': artifact_size(pipeline) / 1024
+    }
+    row.update(measure_latency(pipeline, X_test, repeats))
+    return row
+
+
+def print_report(report):
+    print(f"\n{'model':>8} {'params':<34} {'accuracy':>9} {'roc auc':>8} {'agree':>6} {'size KB':>8} "
+          f"{'p50 us':>8} {'p99 us':>8} {'native us':>9} {'batch us':>9}")
+    for row in report:
+        params = ' '.join(f'{key}={value}' for key, value in row['params'].items())
+        native = f"{row['native_p50_us']:.0f}" if row['native_p50_us'] is not None else '-'
+        print(f"{row['model']:>8} {params:<34} {row['accuracy']:>9.4f} {row['roc_auc']:>8.4f} "
+              f"{row['teacher_agreement']:>6.3f} {row['size_kb']:>8.0f} {row['single_p50_us']:>8.0f} "
+              f"{row['single_p99_us']:>8.0f} {native:>9} {row['batch_us_per_row']:>9.1f}")
+
+
+def pick_student(report, max_auc_drop=0.005, latency_budget_us=None):
+    """Index of the fastest student (by p99) within max_auc_drop of the teacher, or None.
+
+    The teacher is report[0]; AUCs are compared on the validation half.
+    """
+    floor = report[0]['validation_roc_auc'] - max_auc_drop
+    eligible = [i for i, row in enumerate(report) if i > 0 and row['validation_roc_auc'] >= floor
+                and (latency_budget_us is None or row['single_p99_us'] <= latency_budget_us)]
+    return min(eligible, key=lambda i: report[i]['single_p99_us']) if eligible else None
+
+
+def distill(teacher_path=MODEL_FILE, csv_path=None, n_samples=3000, max_auc_drop=0.005, latency_budget_us=None,
+            random_state=42, repeats=200, **student_options):
+    """Build, evaluate and pick a student for the teacher at teacher_path.
+
+    Returns (report, picked pipeline); the teacher is the first report row
+    and the pick is None when no student qualifies.
+    """
+    teacher = unwrap_model_artifact(joblib.load(teacher_path))[0]
+    X, y = load_training_data(csv_path, n_samples)
+    X_train, X_holdout, y_train, y_holdout = train_test_split(
+        X, y, test_size=0.2, random_state=random_state, stratify=y
+    )
+    X_validation, X_test, y_validation, y_test = train_test_split(
+        X_holdout, y_holdout, test_size=0.5, random_state=random_state, stratify=y_holdout
+    )
+
+    print(f"🎓 Distilling {teacher_path} on {len(X_train)} movies...")
+    start = time.perf_counter()
+    students = build_students(teacher, X_train, X_validation, y_validation, random_state=random_state,
+                              **student_options)
+    print(f"✅ {len(students)} students built in {time.perf_counter() - start:.1f}s")
+
+    teacher_labels = teacher.predict(X_test)
+    candidates = [('teacher', {'n_estimators': getattr(teacher[-1], 'n_estimators', None)}, teacher)] + students
+    report = [evaluate(name, params, pipeline, teacher_labels, X_validation, y_validation, X_test, y_test, repeats)
+              for name, params, pipeline in candidates]
+    print_report(report)
+
+    picked = pick_student(report, max_auc_drop, latency_budget_us)
+    for i, row in enumerate(report):
+        row['picked'] = i == picked
+    return report, candidates[picked][2] if picked is not None else None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Distil saved_model.pkl into a smaller, faster model')
+    parser.add_argument('--teacher', default=MODEL_FILE, help='trained pipeline to compress')
+    parser.add_argument('--csv', default=None,
+                        help='CSV (or .npz dataset from build_dataset.py) with the model features and a success '
+                             'column (default: synthetic sample)')
+    parser.add_argument('--samples', type=int, default=3000, help='synthetic movies when no --csv is given')
+    parser.add_argument('--models', nargs='+', choices=['forest', 'hgb', 'pruned'],
+                        default=['forest', 'hgb', 'pruned'], help='kinds of student to build')
+    parser.add_argument('--forest-trees', nargs='+', type=int, default=[10, 25, 50])
+    parser.add_argument('--forest-depth', nargs='+', type=int, default=[6, 10])
+    parser.add_argument('--hgb-iters', nargs='+', type=int, default=[25, 50, 100])
+    parser.add_argument('--prune-tolerance', type=float, default=0.001,
+                        help='ROC AUC the pruned forest may lose against the full one')
+    parser.add_argument('--max-auc-drop', type=float, default=0.005,
+                        help='ROC AUC a picked student may lose against the teacher')
+    parser.add_argument('--latency-budget-us', type=float, default=None,
+                        help='only pick students whose single-row p99 latency is within this budget')
+    parser.add_argument('--report', default=None, help='also write the report to this JSON file')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='where to save the picked student')
+    args = parser.parse_args()
+
+    report, student = distill(args.teacher, args.csv, args.samples, args.max_auc_drop, args.latency_budget_us,
+                              forest_trees=args.forest_trees, forest_depths=args.forest_depth,
+                              hgb_iterations=args.hgb_iters, prune_tolerance=args.prune_tolerance,
+                              kinds=args.models)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📁 Report written to {args.report}")
+    if student is None:
+        print("❌ No student is within the AUC and latency limits; nothing saved")
+        raise SystemExit(1)
+    picked = next(row for row in report if row['picked'])
+    joblib.dump(student, args.output)
+    print(f"\n🎯 Picked {picked['model']} {picked['params']}")
+    print(f"📁 {args.output} - serve it with MODEL_FILE={os.path.basename(args.output)}")
@@ -0,0 +1,58 @@
+import argparse
+import os
+import time
+
+import joblib
+
+from compiled_model import CompiledModel, export_compiled_model
+from model_bundle import SUCCESS_RATE_FILES, unwrap_model_artifact
+from success_counts import derive_success_rates
+
+
+def load_pipeline(model_path):
+    """Load saved_model.pkl written either as a bare pipeline or as a dict"""
+    try:
+        return unwrap_model_artifact(joblib.load(model_path))[0]
+    except ValueError:
+        raise ValueError(f'No pipeline found in {model_path}')
+
+
+def export_model(artifacts_dir='.', output_dir=None, model_file='saved_model.pkl'):
+    """Compile model_file and the success rate tables into output_dir"""
+    if output_dir is None:
+        output_dir = os.path.join(artifacts_dir, 'compiled_model')
+
+    print("🎬 Exporting compiled model artifact...")
+    model_path = os.path.join(artifacts_dir, model_file)
+    pipeline = load_pipeline(model_path)
+
+    success_rates = {}
+    for name, filename in SUCCESS_RATE_FILES.items():
+        path = os.path.join(artifacts_dir, filename)
+        success_rates[name] = joblib.load(path) if os.path.exists(path) else {}
+    success_rates = derive_success_rates(success_rates)
+
+    start = time.perf_counter()
+    manifest = export_compiled_model(pipeline, output_dir, success_rates, source_path=model_path)
+    elapsed = time.perf_counter() - start
+
+    # Reload the artifact to make sure it opens cleanly
+    compiled = CompiledModel.load(output_dir)
+    size = sum(os.path.getsize(os.path.join(output_dir, f)) for f in os.listdir(output_dir))
+
+    print(f"✅ Compiled model written to {output_dir} in {elapsed:.2f}s")
+    print(f"📦 Version {manifest['model_version']} - {compiled.n_estimators} trees, "
+          f"{len(compiled.threshold)} nodes, {size / 1024:.0f} KB")
+    for name, rates in success_rates.items():
+        print(f"📁 {name} success rates - {len(rates)} entries")
+    return manifest
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export saved_model.pkl as a compiled, memory-mappable artifact')
+    parser.add_argument('--artifacts', default='.', help='directory holding saved_model.pkl and *_success.joblib')
+    parser.add_argument('--output', default=None, help='output directory (default: <artifacts>/compiled_model)')
+    parser.add_argument('--model', default='saved_model.pkl',
+                        help='pickled forest in <artifacts> to compile, e.g. distilled_model.pkl')
+    args = parser.parse_args()
+    export_model(args.artifacts, args.output, args.model)
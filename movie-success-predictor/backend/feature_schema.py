@@ -0,0 +1,190 @@
+"""Typed feature schema and the buffers prediction requests are assembled in.
+
+FEATURE_SCHEMA defines the model's thirteen input columns once: their
+order, the request field each is read from, how the value is coerced and
+the default used when the request omits it. prepare_features builds its
+feature dict through it.
+
+ModelInput turns those dicts into the fitted pipeline's model input without
+pandas. Rows are copied into per-thread NumPy buffers that are allocated
+once and reused, then encoded by the pipeline's FeatureEncoder (the same
+imputation, scaling and one-hot encoding the ColumnTransformer applies).
+The result feeds the forest directly, skipping the one-row DataFrame and
+the ColumnTransformer, which cost several times more than the trees.
+"""
+import math
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from compiled_model import CompiledModel, FeatureEncoder
+
+# Rows a thread's buffer holds before it first grows, and the most it keeps;
+# larger batches get a buffer of their own that is freed afterwards
+INITIAL_CAPACITY = 16
+MAX_BUFFER_ROWS = 1024
+
+
+@dataclass(frozen=True)
+class FeatureField:
+    name: str
+    kind: str
+    source: str = None
+    default: object = None
+
+    def coerce(self, value):
+        """value as this field's type; raises TypeError/ValueError when it cannot be converted.
+
+        JSON bodies may hold NaN and Infinity, which the model cannot score,
+        so numbers must be finite.
+        """
+        if self.kind == 'float':
+            value = float(value)
+            if not math.isfinite(value):
+                raise ValueError(f'{self.source} must be a finite number')
+            return value
+        if self.kind == 'int':
+            try:
+                return int(value)
+            except OverflowError:
+                raise ValueError(f'{self.source} must be a finite number') from None
+        return str(value)
+
+
+class FeatureSchema:
+    """Ordered feature fields; fields without a source are the resolved talent success rates"""
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+        self.names = [field.name for field in self.fields]
+        self.numeric = [field.name for field in self.fields if field.kind != 'category']
+        self.categorical = [field.name for field in self.fields if field.kind == 'category']
+        self.talent = [field.name for field in self.fields if field.source is None]
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
+
+    def coerce(self, movie, talent_rates):
+        """Feature dict for a request movie, in schema order.
+
+        talent_rates maps the talent field names to their resolved rates.
+        """
+        features = {}
+        for field in self.fields:
+            if field.source is None:
+                features[field.name] = talent_rates[field.name]
+            else:
+                features[field.name] = field.coerce(movie.get(field.source, field.default))
+        return features
+
+
+# Same column order as create_sample_model.FEATURES, which the pipeline was fitted on
+FEATURE_SCHEMA = FeatureSchema([
+    FeatureField('budget', 'float', 'budget', 0),
+    FeatureField('runtime', 'float', 'runtime', 0),
+    FeatureField('genres', 'category', 'genres', 'Drama'),
+    FeatureField('original_language', 'category', 'original_language', 'en'),
+    FeatureField('avg_rating', 'float', 'avg_rating', 7.0),
+    FeatureField('ratings_count', 'int', 'ratings_count', 1000),
+    FeatureField('release_year', 'int', 'release_year', 2024),
+    FeatureField('release_month', 'int', 'release_month', 6),
+    FeatureField('director_success_rate', 'float'),
+    FeatureField('actor1_success_rate', 'float'),
+    FeatureField('actor2_success_rate', 'float'),
+    FeatureField('actor3_success_rate', 'float'),
+    FeatureField('production_companies', 'category', 'production_companies', 'Independent')
+])
+
+
+class FeatureBuffer:
+    """Preallocated feature columns and encoded model input for up to capacity rows"""
+
+    def __init__(self, encoder, capacity=INITIAL_CAPACITY):
+        self.numeric_columns = encoder.numeric_columns
+        self.categorical_columns = encoder.categorical_columns
+        self.n_features = encoder.n_features
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        self.capacity = capacity
+        self.numeric = np.empty((capacity, len(self.numeric_columns)), dtype=np.float64)
+        self.categorical = [np.empty(capacity, dtype=object) for _ in self.categorical_columns]
+        self.encoded = np.empty((capacity, self.n_features), dtype=np.float32)
+
+    def fill(self, rows):
+        """Copy feature dicts into the buffer; returns (numeric, categorical) views of those rows.
+
+        The buffer doubles when rows do not fit.
+        """
+        count = len(rows)
+        if count > self.capacity:
+            capacity = self.capacity
+            while capacity < count:
+                capacity *= 2
+            self.allocate(capacity)
+        numeric = self.numeric[:count]
+        numeric[:] = [[features[name] for name in self.numeric_columns] for features in rows]
+        categorical = []
+        for column, values in zip(self.categorical_columns, self.categorical):
+            values[:count] = [features[column] for features in rows]
+            categorical.append(values[:count])
+        return numeric, categorical
+
+
+class ModelInput:
+    """Encodes feature dicts into model input through per-thread FeatureBuffers"""
+
+    def __init__(self, encoder, schema=FEATURE_SCHEMA):
+        unknown = [column for column in encoder.numeric_columns + encoder.categorical_columns
+                   if column not in schema.names]
+        if unknown:
+            raise ValueError(f'Model expects features missing from the schema: {unknown}')
+        self.encoder = encoder
+        self.schema = schema
+        self._local = threading.local()
+
+    @classmethod
+    def from_pipeline(cls, pipeline, schema=FEATURE_SCHEMA):
+        """ModelInput for a fitted pipeline or CompiledModel.
+
+        Returns None when the preprocessing cannot be exported or its output
+        does not have the width the final estimator was fitted on.
+        """
+        if isinstance(pipeline, CompiledModel):
+            encoder = pipeline.encoder
+        else:
+            try:
+                encoder = FeatureEncoder.from_pipeline(pipeline)
+            except (AttributeError, ValueError):
+                return None
+            if getattr(pipeline.steps[-1][1], 'n_features_in_', None) != encoder.n_features:
+                return None
+        try:
+            return cls(encoder, schema)
+        except ValueError:
+            return None
+
+    def buffer(self):
+        """This thread's buffer, so concurrent requests never share one"""
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = self._local.buffer = FeatureBuffer(self.encoder)
+        return buffer
+
+    def encode(self, rows):
+        """float32 model input for a list of feature dicts.
+
+        The result is a view of this thread's buffer, valid until the
+        thread's next encode call.
+        """
+        buffer = self.buffer() if len(rows) <= MAX_BUFFER_ROWS else FeatureBuffer(self.encoder, len(rows))
+        numeric, categorical = buffer.fill(rows)
+        return self.encoder.encode(numeric, categorical, out=buffer.encoded[:len(rows)])
+
+    def encode_columns(self, columns):
+        """float32 model input for a dict of equal-length feature columns"""
+        return self.encoder.transform(columns)
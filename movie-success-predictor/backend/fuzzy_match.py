@@ -0,0 +1,157 @@
+"""Approximate name matching over success-rate tables using a trigram index"""
+import math
+from collections import defaultdict
+
+import numpy as np
+
+
+def trigrams(name):
+    """Set of character trigrams of a name, padded so word edges count"""
+    padded = f'  {name} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def levenshtein(a, b, max_distance=None):
+    """Edit distance between two strings.
+
+    Stops early and returns max_distance + 1 once every cell in a row
+    exceeds max_distance, which keeps rejected candidates cheap.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is not None and len(a) - len(b) > max_distance:
+        return max_distance + 1
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        left = i
+        row_min = i
+        for j, cb in enumerate(b):
+            # Branches instead of min() keep the inner loop cheap
+            cost = previous[j] if ca == cb else previous[j] + 1
+            up = previous[j + 1] + 1
+            if up < cost:
+                cost = up
+            if left + 1 < cost:
+                cost = left + 1
+            current.append(cost)
+            left = cost
+            if cost < row_min:
+                row_min = cost
+        if max_distance is not None and row_min > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def similarity(a, b, min_score=0.0):
+    """Edit-distance similarity in [0, 1]: 1 - distance / longer length.
+
+    Pairs that cannot reach min_score are cut short and scored 0.
+    """
+    longest = max(len(a), len(b))
+    if longest == 0:
+        return 1.0
+    max_distance = int(longest * (1 - min_score) + 1e-9)
+    distance = levenshtein(a, b, max_distance)
+    if distance > max_distance:
+        return 0.0
+    return 1 - distance / longest
+
+
+class FuzzyNameMatcher:
+    """Nearest-name search backed by a character-trigram inverted index.
+
+    Each trigram maps to a sorted array of name ids. A query only needs the
+    postings of its rarest trigrams to find every name that could reach the
+    trigram-overlap floor (prefix filtering); the remaining trigrams are then
+    counted for those candidates with binary searches. The few best
+    candidates by trigram Dice coefficient are re-ranked with edit-distance
+    similarity, which is the score returned to callers.
+    """
+
+    def __init__(self, names, min_overlap=0.5, rerank=5):
+        self.names = list(names)
+        self.min_overlap = min_overlap
+        self.rerank = rerank
+
+        postings = defaultdict(list)
+        self.gram_counts = np.empty(len(self.names), dtype=np.int32)
+        for name_id, name in enumerate(self.names):
+            grams = trigrams(name)
+            self.gram_counts[name_id] = len(grams)
+            for gram in grams:
+                postings[gram].append(name_id)
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    def _candidates(self, query):
+        """Candidate ids with their trigram Dice coefficient against query"""
+        grams = trigrams(query)
+        lists = sorted((self.postings.get(gram, np.empty(0, dtype=np.int32)) for gram in grams), key=len)
+
+        # Dice >= t needs at least t * q / (2 - t) shared trigrams, so any
+        # match must appear in one of the q - required + 1 rarest postings.
+        required = max(1, math.ceil(self.min_overlap * len(grams) / (2 - self.min_overlap)))
+        prefix = lists[:len(lists) - required + 1]
+        if not any(len(ids) for ids in prefix):
+            return None, None
+
+        candidates, overlap = np.unique(np.concatenate(prefix), return_counts=True)
+
+        # Names much shorter or longer than the query cannot reach the floor
+        counts = self.gram_counts[candidates]
+        ratio = self.min_overlap / (2 - self.min_overlap)
+        keep = (counts >= ratio * len(grams)) & (counts <= len(grams) / ratio)
+        candidates, overlap = candidates[keep], overlap[keep]
+
+        remaining = lists[len(prefix):]
+        for position, ids in enumerate(remaining):
+            if len(ids) and len(candidates):
+                positions = np.searchsorted(ids, candidates)
+                positions[positions == len(ids)] = 0
+                overlap += ids[positions] == candidates
+            # Drop candidates that cannot reach the floor with what is left
+            keep = overlap + (len(remaining) - position - 1) >= required
+            candidates, overlap = candidates[keep], overlap[keep]
+
+        dice = 2 * overlap / (len(grams) + self.gram_counts[candidates])
+        keep = dice >= self.min_overlap
+        return candidates[keep], dice[keep]
+
+    def search(self, query, limit=1, min_score=0.0, allowed=None):
+        """Return up to limit (name, score) pairs sorted by best score.
+
+        allowed is an optional boolean array over the names; names where it
+        is False are never returned, so one index can serve several subsets.
+        """
+        if not query or not self.names:
+            return []
+
+        candidates, dice = self._candidates(query)
+        if candidates is not None and allowed is not None:
+            keep = allowed[candidates]
+            candidates, dice = candidates[keep], dice[keep]
+        if candidates is None or not len(candidates):
+            return []
+
+        if len(candidates) > self.rerank:
+            best = np.argpartition(-dice, self.rerank - 1)[:self.rerank]
+            candidates = candidates[best]
+
+        scored = []
+        for name_id in candidates:
+            name = self.names[name_id]
+            score = similarity(query, name, min_score)
+            if score >= min_score:
+                scored.append((name, score))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+    def best_match(self, query, min_score=0.0, allowed=None):
+        """Return the single best (name, score) pair, or None"""
+        matches = self.search(query, limit=1, min_score=min_score, allowed=allowed)
+        return matches[0] if matches else None
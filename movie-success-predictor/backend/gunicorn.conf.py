@@ -0,0 +1,32 @@
+"""gunicorn settings for serving wsgi:app.
+
+Prediction is CPU-bound, so throughput scales with worker processes rather
+than threads: the default is one worker per core and one thread each.
+GUNICORN_THREADS > 1 switches to the gthread worker, which helps when
+requests spend time waiting on I/O (e.g. slow clients or the shared SQLite
+prediction cache) and is required for MICRO_BATCH_WINDOW_MS to have
+concurrent requests to batch.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+# Load the model once in the master; workers inherit it copy-on-write
+preload_app = True
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = 5
+# Requests beyond this many in the listen queue are refused by the kernel
+backlog = int(os.environ.get('GUNICORN_BACKLOG', 2048))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    import wsgi
+    wsgi.post_fork()
@@ -0,0 +1,152 @@
+"""Coalesce concurrent single-row predictions into batched model calls.
+
+Scoring one row through the forest costs nearly as much as scoring a few
+hundred, so when many request threads each need one prediction it is
+cheaper to gather them for a couple of milliseconds and score them
+together. MicroBatcher runs an asyncio scheduler on its own thread: request
+threads hand it a row with submit(), asyncio code awaits predict(), and the
+scheduler dispatches batches to a bounded thread pool and fans the results
+back out.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from metrics import Histogram
+
+
+class Overloaded(Exception):
+    """Raised by submit() when the queue is full; callers should answer 503"""
+
+
+class MicroBatcher:
+    """Asyncio micro-batching scheduler in front of a batch scoring function.
+
+    score(items) takes a list of submitted items and returns one result per
+    item, in order. A batch is dispatched once max_batch items are waiting
+    or window_ms has passed since an executor slot freed up, whichever
+    comes first; at most `workers` batches run at the same time. Items still
+    waiting for a batch are bounded by max_queue, beyond which submit()
+    raises Overloaded.
+    """
+
+    def __init__(self, score, window_ms=2.0, max_batch=256, max_queue=1024, workers=1):
+        self.score = score
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.workers = workers
+        self.pid = os.getpid()
+
+        self.batch_size = Histogram([1, 2, 4, 8, 16, 32, 64, 128, 256, 512])
+        self.queue_wait_ms = Histogram([0.1, 0.5, 1, 2, 5, 10, 25, 50, 100, 250])
+        self.score_ms = Histogram([0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000])
+        self.rejected = 0
+        self.errors = 0
+
+        self._queue = deque()
+        self._queued = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='micro-batch')
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._has_items = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._scheduler = self._loop.create_task(self._schedule())
+        self._loop.call_soon(self._ready.set)
+        self._loop.run_forever()
+
+    def submit(self, item):
+        """Queue item for scoring from any thread; returns a concurrent Future"""
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self.rejected += 1
+                raise Overloaded(f'Prediction queue is full ({self.max_queue} waiting)')
+            self._queued += 1
+        future = Future()
+        self._loop.call_soon_threadsafe(self._enqueue, (item, future, time.perf_counter()))
+        return future
+
+    async def predict(self, item):
+        """Score item from a coroutine running on any event loop"""
+        return await asyncio.wrap_future(self.submit(item))
+
+    def _enqueue(self, entry):
+        self._queue.append(entry)
+        self._has_items.set()
+        if len(self._queue) >= self.max_batch:
+            self._batch_full.set()
+
+    async def _schedule(self):
+        while True:
+            await self._has_items.wait()
+            # Wait for a free executor slot first: rows arriving meanwhile
+            # join the next batch instead of queueing behind it one by one
+            await self._slots.acquire()
+            if len(self._queue) < self.max_batch and self.window > 0:
+                self._batch_full.clear()
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), self.window)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+            if not self._queue:
+                self._has_items.clear()
+            with self._lock:
+                self._queued -= len(batch)
+
+            dispatched = time.perf_counter()
+            self.batch_size.observe(len(batch))
+            for _, _, enqueued in batch:
+                self.queue_wait_ms.observe((dispatched - enqueued) * 1000)
+
+            task = self._loop.run_in_executor(self._executor, self._score_batch, batch)
+            task.add_done_callback(lambda _: self._slots.release())
+
+    def _score_batch(self, batch):
+        start = time.perf_counter()
+        try:
+            results = self.score([item for item, _, _ in batch])
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        self.score_ms.observe((time.perf_counter() - start) * 1000)
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def stats(self):
+        with self._lock:
+            queued = self._queued
+        return {
+            'window_ms': self.window * 1000,
+            'max_batch': self.max_batch,
+            'max_queue': self.max_queue,
+            'workers': self.workers,
+            'queued': queued,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'batch_size': self.batch_size.stats(),
+            'queue_wait_ms': self.queue_wait_ms.stats(),
+            'score_ms': self.score_ms.stats()
+        }
+
+    def close(self):
+        """Stop the scheduler thread and the executor"""
+        self._loop.call_soon_threadsafe(self._scheduler.cancel)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._executor.shutdown(wait=True)
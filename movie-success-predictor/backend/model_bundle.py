@@ -0,0 +1,265 @@
+"""Immutable snapshot of the model and success rate tables served by the app.
+
+Everything a prediction reads lives on one ModelBundle. The app swaps a
+single reference to a fully loaded bundle, so a request that grabbed the
+bundle once never sees the pipeline of one load mixed with the success
+rates of another.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+import joblib
+
+from compiled_model import SUCCESS_RATES_FILE, CompiledModel
+from feature_schema import ModelInput
+from success_counts import derive_success_rates, is_counts_artifact
+from talent_table import RoleRates, TalentTable
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = 'saved_model.pkl'
+COMPILED_DIR = 'compiled_model'
+
+SUCCESS_RATE_FILES = {
+    'director': 'director_success.joblib',
+    'actor1': 'actor1_success.joblib',
+    'actor2': 'actor2_success.joblib',
+    'actor3': 'actor3_success.joblib'
+}
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    pipeline: object
+    native_model: object
+    director_success_rates: RoleRates
+    actor1_success_rates: RoleRates
+    actor2_success_rates: RoleRates
+    actor3_success_rates: RoleRates
+    talent: TalentTable
+    model_input: ModelInput
+    version: str
+    model_format: str
+    model_file: str
+    artifacts_dir: str
+    files: tuple
+    signature: str
+    loaded_at: str
+    load_seconds: float
+
+    @property
+    def classes_(self):
+        return self.pipeline.classes_
+
+    @property
+    def inference_engine(self):
+        return 'native' if self.native_model is not None else 'sklearn'
+
+    def predict_proba_encoded(self, X):
+        """Class probabilities for model input encoded by model_input"""
+        if self.native_model is not None:
+            return self.native_model.predict_proba_encoded(X)
+        return self.pipeline.steps[-1][1].predict_proba(X)
+
+    def success_rates(self, role):
+        """Success rate table for 'director', 'actor1', 'actor2' or 'actor3'"""
+        return getattr(self, f'{role}_success_rates')
+
+
+def unwrap_model_artifact(model):
+    """Split saved_model.pkl into (pipeline, embedded success rate tables).
+
+    The file is either a bare pipeline or a dict holding it under 'pipeline'
+    or 'model', optionally next to '<role>_success' tables.
+    """
+    tables = {}
+    if isinstance(model, dict):
+        for role, filename in SUCCESS_RATE_FILES.items():
+            table = model.get(os.path.splitext(filename)[0])
+            if isinstance(table, dict):
+                tables[role] = table
+        model = model.get('pipeline', model.get('model'))
+    if model is None or not hasattr(model, 'predict_proba'):
+        raise ValueError('No pipeline found in model artifact')
+    return model, tables
+
+
+def artifact_paths(artifacts_dir, model_format='pickle', model_file=MODEL_FILE):
+    """Files whose contents define a bundle loaded from artifacts_dir.
+
+    The model file (model_file for the pickle format) comes first; the success rate files are listed for both
+    formats since a compiled artifact without its own tables falls back to them.
+    """
+    rate_paths = [os.path.join(artifacts_dir, filename) for filename in SUCCESS_RATE_FILES.values()]
+    if model_format == 'compiled':
+        compiled_dir = os.path.join(artifacts_dir, COMPILED_DIR)
+        return [os.path.join(compiled_dir, 'manifest.json'), os.path.join(compiled_dir, SUCCESS_RATES_FILE)] + rate_paths
+    return [os.path.join(artifacts_dir, model_file)] + rate_paths
+
+
+def artifacts_signature(paths):
+    """Cheap identity of a set of artifact files from their size and mtime"""
+    digest = hashlib.blake2b(digest_size=8)
+    for path in paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            digest.update(f'{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def artifacts_version(paths):
+    """Content hash of a set of artifact files, used as the bundle version.
+
+    The compiled manifest already embeds a hash of its arrays, so hashing
+    the manifest covers them.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        if os.path.exists(path):
+            digest.update(os.path.basename(path).encode('utf-8'))
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def load_bundle(artifacts_dir, model_format='pickle', inference_engine='sklearn', min_count=None,
+                model_file=MODEL_FILE):
+    """Load the model and success rates from artifacts_dir into a new bundle.
+
+    The pickle format loads model_file, saved_model.pkl unless an
+    alternative such as a distilled model is named (see distill_model.py).
+    With model_format='compiled' the memory-mapped compiled_model/ artifact
+    is used and sklearn is never imported. With inference_engine='native' a
+    pickled pipeline is also converted into a CompiledModel; the compiled
+    format always uses it. Success tables saved as per-person counts are
+    turned into rates for people with at least min_count films (default:
+    the value saved with the counts). All four tables go into one
+    TalentTable, with a trigram index for misspelled names, and each
+    <role>_success_rates field is its view of one role.
+    Raises on missing or unreadable artifacts; nothing outside the returned
+    bundle is touched.
+    """
+    start = time.perf_counter()
+    paths = artifact_paths(artifacts_dir, model_format, model_file)
+    signature = artifacts_signature(paths)
+    version = artifacts_version(paths)
+    embedded_tables = {}
+
+    if model_format == 'compiled':
+        compiled_dir = os.path.join(artifacts_dir, COMPILED_DIR)
+        if not os.path.exists(paths[0]):
+            raise FileNotFoundError(f"Compiled model not found at: {compiled_dir}")
+        pipeline = CompiledModel.load(compiled_dir)
+        logger.info(f"Compiled model {pipeline.version} memory-mapped from {compiled_dir}")
+        embedded_tables = pipeline.success_rates or {}
+    else:
+        if not os.path.exists(paths[0]):
+            raise FileNotFoundError(f"Model file not found at: {paths[0]}")
+        pipeline, embedded_tables = unwrap_model_artifact(joblib.load(paths[0]))
+        logger.info("Main model loaded successfully")
+
+    native_model = None
+    if isinstance(pipeline, CompiledModel):
+        native_model = pipeline
+    elif inference_engine == 'native':
+        try:
+            native_model = CompiledModel.from_pipeline(pipeline)
+            logger.info(f"Native inference engine ready: {native_model.n_estimators} trees")
+        except (AttributeError, ValueError) as e:
+            logger.warning(f"Native inference engine unavailable, using sklearn: {str(e)}")
+
+    # Requests skip pandas and the ColumnTransformer when the preprocessing
+    # can be exported; other pipelines are scored from a DataFrame
+    model_input = ModelInput.from_pipeline(native_model or pipeline)
+    if model_input is None:
+        logger.warning("Preprocessing cannot be exported; predictions go through a DataFrame")
+
+    # *_success.joblib files holding counts always win, since that is what
+    # create_success_rates.py update refreshes. Otherwise the compiled
+    # artifact's own tables win, and a pickle's *_success.joblib files win
+    # over tables embedded in saved_model.pkl
+    use_files = model_format != 'compiled' or not embedded_tables
+    tables = {}
+    for role, filename in SUCCESS_RATE_FILES.items():
+        path = os.path.join(artifacts_dir, filename)
+        table = joblib.load(path) if os.path.exists(path) else None
+        if table is not None and (use_files or is_counts_artifact(table)):
+            tables[role] = table
+        elif role in embedded_tables:
+            tables[role] = embedded_tables[role]
+        else:
+            logger.warning(f"{role.capitalize()} success rates file not found at: {path}")
+            tables[role] = {}
+    films = {role: dict(zip(table['people'], table['films'].tolist()))
+             for role, table in tables.items() if is_counts_artifact(table)}
+    talent = TalentTable(derive_success_rates(tables, min_count), films).build_fuzzy_index()
+    for role in SUCCESS_RATE_FILES:
+        tables[role] = talent.role(role)
+        logger.info(f"{role.capitalize()} success rates loaded: {len(tables[role])} entries")
+    logger.info(f"Talent table: {len(talent)} distinct names across all roles")
+
+    return ModelBundle(
+        pipeline=pipeline,
+        native_model=native_model,
+        director_success_rates=tables['director'],
+        actor1_success_rates=tables['actor1'],
+        actor2_success_rates=tables['actor2'],
+        actor3_success_rates=tables['actor3'],
+        talent=talent,
+        model_input=model_input,
+        version=version,
+        model_format=model_format,
+        model_file=model_file,
+        artifacts_dir=artifacts_dir,
+        files=tuple(paths),
+        signature=signature,
+        loaded_at=datetime.now().isoformat(),
+        load_seconds=time.perf_counter() - start
+    )
+
+
+class ArtifactWatcher(threading.Thread):
+    """Background thread that reloads the bundle when its files change.
+
+    get_bundle returns the bundle being served and reload(bundle) loads a
+    replacement from the same directory. A change is acted on once the files
+    have stopped changing for one poll, so a half-written artifact is not
+    picked up. A signature that failed to load is not retried until the
+    files change again.
+    """
+
+    def __init__(self, get_bundle, reload, interval=5.0):
+        super().__init__(name='artifact-watcher', daemon=True)
+        self.get_bundle = get_bundle
+        self.reload = reload
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        pending = None
+        failed = None
+        while not self._stop_event.wait(self.interval):
+            bundle = self.get_bundle()
+            if bundle is None:
+                continue
+            signature = artifacts_signature(bundle.files)
+            if signature == bundle.signature or signature == failed:
+                pending = None
+                continue
+            if signature != pending:
+                # Wait one more poll for writers to finish
+                pending = signature
+                continue
+            logger.info(f"Artifacts in {bundle.artifacts_dir} changed, reloading")
+            if not self.reload(bundle):
+                failed = signature
+            pending = None
@@ -0,0 +1,157 @@
+"""Named model bundles kept in one directory, loaded on first use.
+
+A registry directory holds one subdirectory per model, laid out like the
+backend's own artifacts: saved_model.pkl (a bare pipeline or the dict
+create_compatible_model.py writes) or compiled_model/, next to the
+*_success.joblib tables. An optional bundle.json sets model_format,
+inference_engine and model_file for that model. Requests pick a model by
+its directory name; its bundle version is still the content hash of the
+files, so replacing them is picked up as a new version on the next request.
+
+Bundles are loaded by the first request that needs them and at most
+max_loaded stay in memory. Loading another evicts the least recently used,
+except pinned models such as the shadow candidate.
+"""
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from model_bundle import artifacts_signature
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_OPTIONS_FILE = 'bundle.json'
+BUNDLE_OPTIONS = ('model_format', 'inference_engine', 'model_file')
+
+
+class UnknownModel(LookupError):
+    """Raised for a model name with no directory in the registry"""
+
+
+class ModelRegistry:
+    """Lazily loaded, LRU-evicted bundles of the models under root.
+
+    load(artifacts_dir, **options) loads (and should smoke-test) one
+    bundle; options come from the model's bundle.json.
+    """
+
+    def __init__(self, root, load, max_loaded=2, pinned=()):
+        self.root = root
+        self.load = load
+        self.max_loaded = max_loaded
+        self.pinned = set(pinned)
+        self._bundles = OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.failures = 0
+        self.evictions = 0
+
+    def names(self):
+        """Models in the registry directory, sorted"""
+        if not os.path.isdir(self.root):
+            return []
+        with os.scandir(self.root) as entries:
+            return sorted(entry.name for entry in entries if entry.is_dir() and not entry.name.startswith('.'))
+
+    def path(self, name):
+        """Artifacts directory of model name; raises UnknownModel"""
+        if not name or name.startswith('.') or '/' in name or os.sep in name:
+            raise UnknownModel(f"Unknown model '{name}'")
+        path = os.path.join(self.root, name)
+        if not os.path.isdir(path):
+            raise UnknownModel(f"Unknown model '{name}'; available: {self.names()}")
+        return path
+
+    def options(self, name):
+        """load_bundle options from the model's bundle.json, if it has one"""
+        path = os.path.join(self.path(name), BUNDLE_OPTIONS_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding='utf-8') as f:
+            options = json.load(f)
+        return {key: options[key] for key in BUNDLE_OPTIONS if key in options}
+
+    def _current(self, name):
+        """The loaded bundle for name while its files are unchanged, else None"""
+        with self._lock:
+            bundle = self._bundles.get(name)
+            if bundle is not None:
+                self._bundles.move_to_end(name)
+        if bundle is None or artifacts_signature(bundle.files) != bundle.signature:
+            return None
+        return bundle
+
+    def get(self, name):
+        """Bundle for model name, loading it on first use or after its files changed.
+
+        Concurrent requests for a model being loaded wait for that load
+        instead of starting their own. Raises UnknownModel, or whatever the
+        load raised.
+        """
+        bundle = self._current(name)
+        if bundle is not None:
+            with self._lock:
+                self.hits += 1
+            return bundle
+
+        path = self.path(name)
+        with self._lock:
+            loading = self._loading.setdefault(name, threading.Lock())
+        with loading:
+            bundle = self._current(name)
+            if bundle is not None:
+                return bundle
+            try:
+                bundle = self.load(path, **self.options(name))
+            except Exception:
+                with self._lock:
+                    self.failures += 1
+                raise
+            with self._lock:
+                self._bundles[name] = bundle
+                self._bundles.move_to_end(name)
+                self.loads += 1
+                evicted = self._evict(keep=name)
+        logger.info(f"Registry model '{name}' loaded (version {bundle.version}, {bundle.load_seconds * 1000:.0f} ms)"
+                    + (f"; evicted {evicted}" if evicted else ''))
+        return bundle
+
+    def _evict(self, keep):
+        """Drop least recently used bundles beyond max_loaded; called with the lock held"""
+        evicted = []
+        for name in list(self._bundles):
+            if len(self._bundles) <= self.max_loaded:
+                break
+            if name != keep and name not in self.pinned:
+                del self._bundles[name]
+                evicted.append(name)
+        self.evictions += len(evicted)
+        return evicted
+
+    def evict(self, name):
+        """Unload model name; returns whether it was loaded"""
+        with self._lock:
+            return self._bundles.pop(name, None) is not None
+
+    def loaded(self):
+        """{name: bundle} of the models in memory, least recently used first"""
+        with self._lock:
+            return dict(self._bundles)
+
+    def stats(self):
+        with self._lock:
+            loaded = {name: bundle.version for name, bundle in self._bundles.items()}
+            return {
+                'root': self.root,
+                'max_loaded': self.max_loaded,
+                'loaded': loaded,
+                'pinned': sorted(self.pinned),
+                'hits': self.hits,
+                'loads': self.loads,
+                'failures': self.failures,
+                'evictions': self.evictions
+            }
@@ -0,0 +1,234 @@
+"""Compact columnar binary form of the movie CSV.
+
+A dataset is an uncompressed .npz archive holding one array per column plus
+a JSON manifest, so a reader loads only the columns it asks for:
+
+- 0/1 integer columns (the genre flags, success) are bit-packed together
+- string columns are dictionary-encoded; director and the three actor
+  columns share one dictionary, stored as a single UTF-8 string plus
+  offsets
+- integers are stored in the smallest integer type that holds them,
+  floats with few decimals (avg_rating, popularity) as scaled integers and
+  other floats with few distinct values (the success rates) as codes into
+  a table of those values
+
+Every encoding is checked to round-trip exactly: load_dataset returns the
+same DataFrame pd.read_csv gives for the CSV it was built from.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+MANIFEST = '__manifest__'
+EXTENSION = '.npz'
+
+# String columns sharing one dictionary, so each name is stored once
+SHARED_DICTIONARIES = {'people': ['director', 'actor_1', 'actor_2', 'actor_3']}
+
+# Decimal places tried for float columns before falling back to floats
+MAX_DECIMALS = 6
+
+_INT_TYPES = [np.uint8, np.int8, np.uint16, np.int16, np.uint32, np.int32, np.int64]
+
+
+def smallest_int_type(values):
+    """The narrowest integer dtype holding every value of an int64 array"""
+    if not len(values):
+        return np.uint8
+    low, high = values.min(), values.max()
+    for dtype in _INT_TYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return np.int64
+
+
+def decimal_places(values):
+    """Fewest decimals (up to MAX_DECIMALS) that represent every float exactly, or None"""
+    if np.isnan(values).any() or not np.isfinite(values).all():
+        return None
+    for decimals in range(MAX_DECIMALS + 1):
+        scale = 10 ** decimals
+        scaled = np.round(values * scale)
+        if np.abs(scaled).max(initial=0) >= 2 ** 53:
+            return None
+        if np.array_equal(scaled.astype(np.int64) / scale, values):
+            return decimals
+    return None
+
+
+def _is_flag(series):
+    return (pd.api.types.is_integer_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype)) and \
+        series.isin([0, 1]).all()
+
+
+def _encode_dictionary(columns):
+    """Codes per column and the shared vocabulary; missing values get code -1"""
+    values = pd.concat(columns, ignore_index=True)
+    vocabulary = pd.unique(values.dropna())
+    position = {value: code for code, value in enumerate(vocabulary)}
+    code_type = smallest_int_type(np.array([-1, len(vocabulary)]))
+    codes = [np.array([position.get(value, -1) if isinstance(value, str) else -1 for value in column],
+                      dtype=code_type) for column in columns]
+    text = ''.join(vocabulary)
+    offsets = np.cumsum([0] + [len(value) for value in vocabulary])
+    return codes, np.frombuffer(text.encode('utf-8'), dtype=np.uint8), offsets.astype(smallest_int_type(offsets))
+
+
+def write_dataset(frame, path, shared_dictionaries=SHARED_DICTIONARIES):
+    """Write frame as a dataset at path; returns the manifest"""
+    arrays = {}
+    columns = []
+    flags = []
+    dictionary_of = {column: name for name, members in shared_dictionaries.items() for column in members
+                     if column in frame.columns}
+
+    for index, name in enumerate(frame.columns):
+        series = frame[name]
+        entry = {'name': name, 'dtype': str(series.dtype)}
+        member = f'c{index}'
+        if pd.api.types.is_string_dtype(series.dtype) or series.dtype == object:
+            if not series.dropna().map(type).eq(str).all():
+                raise ValueError(f'Column {name} mixes strings with other values')
+            entry.update(kind='string', dictionary=dictionary_of.get(name, name), member=member)
+        elif _is_flag(series):
+            entry.update(kind='flag', bit=len(flags))
+            flags.append(series.to_numpy(dtype=bool))
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            values = series.to_numpy()
+            arrays[member] = values.astype(smallest_int_type(values))
+            entry.update(kind='int', member=member)
+        elif pd.api.types.is_float_dtype(series.dtype):
+            values = series.to_numpy(dtype=np.float64)
+            decimals = decimal_places(values)
+            if decimals is not None:
+                scaled = np.round(values * 10 ** decimals).astype(np.int64)
+                arrays[member] = scaled.astype(smallest_int_type(scaled))
+                entry.update(kind='decimal', decimals=decimals, member=member)
+            else:
+                table, codes = np.unique(values, return_inverse=True)
+                code_type = smallest_int_type(np.array([len(table)]))
+                if table.nbytes + len(values) * np.dtype(code_type).itemsize < values.nbytes:
+                    arrays[member] = codes.astype(code_type)
+                    arrays[f'{member}.values'] = table
+                    entry.update(kind='float_dictionary', member=member)
+                else:
+                    float32 = values.astype(np.float32)
+                    exact = np.array_equal(float32.astype(np.float64), values, equal_nan=True)
+                    arrays[member] = float32 if exact else values
+                    entry.update(kind='float', member=member)
+        else:
+            raise ValueError(f'Cannot store column {name} of type {series.dtype}')
+        columns.append(entry)
+
+    if flags:
+        arrays['flags'] = np.packbits(np.column_stack(flags), axis=0)
+
+    dictionaries = {}
+    for dictionary in dict.fromkeys(entry['dictionary'] for entry in columns if entry['kind'] == 'string'):
+        members = [entry for entry in columns if entry.get('dictionary') == dictionary]
+        codes, text, offsets = _encode_dictionary([frame[entry['name']] for entry in members])
+        for entry, column_codes in zip(members, codes):
+            arrays[entry['member']] = column_codes
+        arrays[f'{dictionary}.text'] = text
+        arrays[f'{dictionary}.offsets'] = offsets
+        dictionaries[dictionary] = {'size': len(offsets) - 1}
+
+    manifest = {'format_version': FORMAT_VERSION, 'rows': len(frame), 'columns': columns,
+                'dictionaries': dictionaries}
+    arrays[MANIFEST] = np.frombuffer(json.dumps(manifest).encode('utf-8'), dtype=np.uint8)
+    # Written to a temporary file first so readers never see a partial dataset
+    temporary = f'{path}.tmp{EXTENSION}'
+    np.savez(temporary, **arrays)
+    os.replace(temporary, path)
+    return manifest
+
+
+def read_manifest(archive):
+    manifest = json.loads(archive[MANIFEST].tobytes().decode('utf-8'))
+    if manifest['format_version'] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported dataset format version {manifest['format_version']}")
+    return manifest
+
+
+def dataset_columns(path):
+    """Column names of the dataset at path, without loading any column"""
+    with np.load(path) as archive:
+        return [entry['name'] for entry in read_manifest(archive)['columns']]
+
+
+def load_dataset(path, columns=None):
+    """DataFrame of the requested columns (default: all), in that order.
+
+    Only the arrays behind those columns are read from the archive.
+    """
+    with np.load(path) as archive:
+        manifest = read_manifest(archive)
+        entries = {entry['name']: entry for entry in manifest['columns']}
+        names = list(entries) if columns is None else list(columns)
+        unknown = [name for name in names if name not in entries]
+        if unknown:
+            raise ValueError(f'{path} has no columns {unknown}')
+
+        rows = manifest['rows']
+        flags = None
+        vocabularies = {}
+        data = {}
+        for name in names:
+            entry = entries[name]
+            kind = entry['kind']
+            if kind == 'flag':
+                if flags is None:
+                    flags = np.unpackbits(archive['flags'], axis=0, count=rows)
+                values = flags[:, entry['bit']].astype(entry['dtype'])
+            elif kind == 'int':
+                values = archive[entry['member']].astype(entry['dtype'])
+            elif kind == 'decimal':
+                values = archive[entry['member']].astype(np.int64) / 10 ** entry['decimals']
+            elif kind == 'float_dictionary':
+                values = archive[f"{entry['member']}.values"][archive[entry['member']]]
+            elif kind == 'float':
+                values = archive[entry['member']].astype(np.float64)
+            else:
+                dictionary = entry['dictionary']
+                if dictionary not in vocabularies:
+                    text = archive[f'{dictionary}.text'].tobytes().decode('utf-8')
+                    offsets = archive[f'{dictionary}.offsets'].tolist()
+                    # A trailing NaN is what code -1 picks
+                    vocabularies[dictionary] = np.array(
+                        [text[start:end] for start, end in zip(offsets, offsets[1:])] + [np.nan], dtype=object
+                    )
+                values = pd.Series(vocabularies[dictionary][archive[entry['member']]], dtype=entry['dtype'])
+            data[name] = values
+    return pd.DataFrame(data, columns=names)
+
+
+def dataset_path(csv_path):
+    """The dataset built next to csv_path"""
+    return os.path.splitext(csv_path)[0] + EXTENSION
+
+
+def read_table(path, columns=None):
+    """A movie table from a CSV or a dataset, reading only columns when given"""
+    if path.endswith(EXTENSION):
+        return load_dataset(path, columns)
+    frame = pd.read_csv(path, usecols=columns)
+    return frame if columns is None else frame[list(columns)]
+
+
+def table_columns(path):
+    """Column names of a CSV or dataset, without reading its rows"""
+    if path.endswith(EXTENSION):
+        return dataset_columns(path)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def preferred_source(csv_path):
+    """The dataset built from csv_path when it is at least as new as the CSV, else the CSV"""
+    path = dataset_path(csv_path)
+    if os.path.exists(path) and (not os.path.exists(csv_path) or os.path.getmtime(path) >= os.path.getmtime(csv_path)):
+        return path
+    return csv_path
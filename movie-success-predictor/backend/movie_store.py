@@ -0,0 +1,319 @@
+"""In-memory columnar movie catalog with token indexes for /movies/search"""
+import hashlib
+import json
+import math
+import re
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+from model_bundle import artifacts_version
+from movie_dataset import read_table
+from name_index import normalize_name
+
+GENRE_COLUMNS = [
+    'Action', 'Adventure', 'Animation', 'Comedy', 'Crime', 'Documentary',
+    'Drama', 'Family', 'Fantasy', 'Foreign', 'History', 'Horror', 'Music',
+    'Mystery', 'Romance', 'Science Fiction', 'TV Movie', 'Thriller', 'War', 'Western'
+]
+
+TEXT_FIELDS = ['title', 'director', 'actor_1', 'actor_2', 'actor_3']
+
+# Columns results can be ordered by; prefix with '-' for descending
+SORT_FIELDS = ['title', 'release_year', 'budget', 'revenue', 'popularity', 'avg_rating', 'ratings', 'runtime']
+
+DEFAULT_FIELDS = [
+    'title', 'director', 'actor_1', 'actor_2', 'actor_3', 'genres',
+    'release_year', 'budget', 'runtime', 'avg_rating', 'ratings'
+]
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+_TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Accent- and case-insensitive word tokens of a title or name"""
+    return _TOKEN.findall(normalize_name(text))
+
+
+def sorted_unique(values):
+    """np.unique for integer ids via an in-place sort, which is much faster"""
+    values = np.sort(values)
+    if len(values) > 1:
+        values = values[np.concatenate(([True], values[1:] != values[:-1]))]
+    return values
+
+
+class TokenIndex:
+    """Inverted index from word tokens to the sorted ids of rows containing them.
+
+    The vocabulary is kept sorted so every token starting with a prefix sits
+    in one contiguous slice found with two binary searches.
+    """
+
+    def __init__(self, vocabulary, postings):
+        self.vocabulary = vocabulary
+        self.postings = postings
+
+    @classmethod
+    def build(cls, columns, labeled_rows=None):
+        """Index every row of one or more text columns.
+
+        Each distinct string is tokenized once and the (token, row) pairs
+        are expanded, deduplicated and grouped with numpy. labeled_rows
+        optionally maps extra text (e.g. a genre name) to the rows it
+        applies to.
+        """
+        token_ids = {}
+        row_parts = []
+        token_parts = []
+        size = 0
+        for column in columns:
+            codes, uniques = pd.factorize(column)
+            size = max(size, len(codes))
+            token_lists = [[token_ids.setdefault(token, len(token_ids)) for token in tokenize(text)]
+                           for text in uniques]
+            counts = np.array([len(tokens) for tokens in token_lists], dtype=np.int64)
+            flat = np.array([token for tokens in token_lists for token in tokens], dtype=np.int64)
+            offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+            # Expand each row into one (row, token) pair per token of its string
+            per_row = counts[codes]
+            pair_rows = np.repeat(np.arange(len(codes)), per_row)
+            first_pair = np.repeat(np.cumsum(per_row) - per_row, per_row)
+            positions = np.repeat(offsets[codes], per_row) + np.arange(len(pair_rows)) - first_pair
+            row_parts.append(pair_rows)
+            token_parts.append(flat[positions])
+
+        for text, rows in (labeled_rows or {}).items():
+            for token in tokenize(text):
+                row_parts.append(np.asarray(rows, dtype=np.int64))
+                token_parts.append(np.full(len(rows), token_ids.setdefault(token, len(token_ids)), dtype=np.int64))
+
+        vocabulary = sorted(token_ids)
+        # Renumber tokens in sorted order so each posting list is one slice
+        sorted_ids = np.empty(len(token_ids), dtype=np.int64)
+        sorted_ids[[token_ids[token] for token in vocabulary]] = np.arange(len(vocabulary))
+        rows = np.concatenate(row_parts) if row_parts else np.empty(0, dtype=np.int64)
+        tokens = sorted_ids[np.concatenate(token_parts)] if token_parts else np.empty(0, dtype=np.int64)
+        keys = sorted_unique(tokens * max(size, 1) + rows)
+        tokens, rows = np.divmod(keys, max(size, 1))
+        bounds = np.searchsorted(tokens, np.arange(len(vocabulary) + 1))
+        rows = rows.astype(np.int32)
+        postings = [rows[bounds[i]:bounds[i + 1]] for i in range(len(vocabulary))]
+        return cls(vocabulary, postings)
+
+    def prefix(self, prefix):
+        """Sorted ids of rows with a token starting with prefix"""
+        lo = bisect_left(self.vocabulary, prefix)
+        hi = bisect_left(self.vocabulary, prefix + '\U0010ffff', lo)
+        if hi - lo == 1:
+            return self.postings[lo]
+        if hi == lo:
+            return np.empty(0, dtype=np.int32)
+        return sorted_unique(np.concatenate(self.postings[lo:hi]))
+
+    def match(self, text):
+        """Rows matching every token of text as a prefix, or None for no tokens"""
+        rows = None
+        for token in tokenize(text):
+            found = self.prefix(token)
+            rows = found if rows is None else np.intersect1d(rows, found, assume_unique=True)
+            if not len(rows):
+                break
+        return rows
+
+
+def _int_arg(args, name, default=None, minimum=None, maximum=None):
+    value = args.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        value = float(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be a number")
+    # inf cannot become an int, and nan compares false against any bound
+    if not math.isfinite(value):
+        raise ValueError(f"'{name}' must be a finite number")
+    value = int(value)
+    if minimum is not None and value < minimum:
+        raise ValueError(f"'{name}' must be at least {minimum}")
+    if maximum is not None and value > maximum:
+        raise ValueError(f"'{name}' must be at most {maximum}")
+    return value
+
+
+def parse_search_args(args, store, extra_fields=()):
+    """Validate /movies/search query parameters into store.search kwargs.
+
+    extra_fields are accepted in 'fields' on top of the store's own; the
+    caller fills them in.
+    """
+    genres = []
+    for value in args.getlist('genre') if hasattr(args, 'getlist') else [args.get('genre')]:
+        for genre in (value or '').split(','):
+            genre = genre.strip()
+            if not genre:
+                continue
+            match = next((column for column in GENRE_COLUMNS if column.lower() == genre.lower()), None)
+            if match is None:
+                raise ValueError(f"Unknown genre '{genre}'")
+            genres.append(match)
+
+    fields = DEFAULT_FIELDS
+    if args.get('fields'):
+        fields = [field.strip() for field in args['fields'].split(',') if field.strip()]
+        unknown = [field for field in fields if field not in store.fields and field not in extra_fields]
+        if unknown:
+            raise ValueError(f'Unknown fields: {unknown}')
+
+    sort = args.get('sort') or None
+    if sort is not None and sort.lstrip('-') not in SORT_FIELDS:
+        raise ValueError(f"'sort' must be one of {SORT_FIELDS}, optionally prefixed with '-'")
+
+    return {
+        'q': args.get('q') or None,
+        'title': args.get('title') or None,
+        'director': args.get('director') or None,
+        'actor': args.get('actor') or None,
+        'genres': sorted(set(genres)),
+        'year_min': _int_arg(args, 'year_min'),
+        'year_max': _int_arg(args, 'year_max'),
+        'budget_min': _int_arg(args, 'budget_min'),
+        'budget_max': _int_arg(args, 'budget_max'),
+        'sort': sort,
+        'page': _int_arg(args, 'page', 1, minimum=1),
+        'page_size': _int_arg(args, 'page_size', DEFAULT_PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE),
+        'fields': list(fields)
+    }
+
+
+class MovieStore:
+    """The movie CSV held as one numpy array per column, loaded once.
+
+    Title, director and actor columns get token indexes ('actor' covers all
+    three billing slots and 'any' also covers genre names), so text queries
+    only touch the rows that match. Genre, year and budget filters are then
+    vectorized over the matching rows.
+    """
+
+    def __init__(self, frame, version):
+        self.version = version
+        self.size = len(frame)
+        self.columns = {}
+        for name in frame.columns:
+            if name in TEXT_FIELDS:
+                self.columns[name] = frame[name].fillna('').astype(str).to_numpy(dtype=object)
+            else:
+                self.columns[name] = frame[name].to_numpy()
+        # 'id' is the row number, stable for as long as this version is served
+        self.fields = set(self.columns) | {'genres', 'id'}
+        self.genre_flags = {genre: self.columns[genre].astype(bool)
+                            for genre in GENRE_COLUMNS if genre in self.columns}
+
+        self.indexes = {field: TokenIndex.build([self.columns[field]]) for field in ['title', 'director']}
+        actors = [self.columns[field] for field in ['actor_1', 'actor_2', 'actor_3']]
+        self.indexes['actor'] = TokenIndex.build(actors)
+        self.indexes['any'] = TokenIndex.build(
+            [self.columns[field] for field in TEXT_FIELDS],
+            labeled_rows={genre: np.flatnonzero(flags) for genre, flags in self.genre_flags.items()}
+        )
+        self._build_sort_orders()
+
+    @classmethod
+    def from_csv(cls, path):
+        """Load the catalog from the movie CSV or the dataset built from it (see movie_dataset)"""
+        return cls(read_table(path), artifacts_version([path]))
+
+    def _build_sort_orders(self):
+        """Row order and per-row rank for every sortable column"""
+        self._orders = {}
+        self._ranks = {}
+        for column in SORT_FIELDS:
+            if column not in self.columns:
+                continue
+            order = np.argsort(self.columns[column], kind='stable').astype(np.int32)
+            rank = np.empty(self.size, dtype=np.int32)
+            rank[order] = np.arange(self.size, dtype=np.int32)
+            self._orders[column] = order
+            self._ranks[column] = rank
+
+    def _sorted(self, rows, sort):
+        column = sort.lstrip('-')
+        descending = sort.startswith('-')
+        if len(rows) * 16 > self.size:
+            # Large result: filter the precomputed order instead of sorting
+            member = np.zeros(self.size, dtype=bool)
+            member[rows] = True
+            order = self._orders[column]
+            rows = order[member[order]]
+            return rows[::-1] if descending else rows
+        rank = self._ranks[column][rows]
+        return rows[np.argsort(-rank if descending else rank)]
+
+    def etag(self, query):
+        """Validator for the response to a parsed query against this data"""
+        canonical = json.dumps(query, sort_keys=True, separators=(',', ':'))
+        return hashlib.blake2b(f'{self.version}:{canonical}'.encode('utf-8'), digest_size=12).hexdigest()
+
+    def search(self, q=None, title=None, director=None, actor=None, genres=(), year_min=None, year_max=None,
+               budget_min=None, budget_max=None, sort=None, page=1, page_size=DEFAULT_PAGE_SIZE,
+               fields=DEFAULT_FIELDS):
+        """Return one page of matching movies, projected to fields"""
+        rows = None
+        for index, text in (('any', q), ('title', title), ('director', director), ('actor', actor)):
+            if not text:
+                continue
+            found = self.indexes[index].match(text)
+            if found is None:
+                continue
+            rows = found if rows is None else np.intersect1d(rows, found, assume_unique=True)
+            if not len(rows):
+                break
+        if rows is None:
+            rows = np.arange(self.size)
+
+        mask = np.ones(len(rows), dtype=bool)
+        for genre in genres:
+            mask &= self.genre_flags[genre][rows]
+        year = self.columns['release_year'][rows]
+        budget = self.columns['budget'][rows]
+        if year_min is not None:
+            mask &= year >= year_min
+        if year_max is not None:
+            mask &= year <= year_max
+        if budget_min is not None:
+            mask &= budget >= budget_min
+        if budget_max is not None:
+            mask &= budget <= budget_max
+        rows = rows[mask]
+
+        if sort:
+            rows = self._sorted(rows, sort)
+
+        total = len(rows)
+        start = (page - 1) * page_size
+        return {
+            'results': [self.record(row, fields) for row in rows[start:start + page_size]],
+            'total': total,
+            'page': page,
+            'page_size': page_size,
+            'pages': (total + page_size - 1) // page_size
+        }
+
+    def record(self, row, fields=DEFAULT_FIELDS):
+        """One movie as a JSON-ready dict of the requested fields"""
+        record = {}
+        for field in fields:
+            if field == 'genres':
+                record['genres'] = [genre for genre, flags in self.genre_flags.items() if flags[row]]
+            elif field == 'id':
+                record['id'] = int(row)
+            else:
+                value = self.columns[field][row]
+                record[field] = value.item() if hasattr(value, 'item') else value
+        return record
+
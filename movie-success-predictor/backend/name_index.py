@@ -0,0 +1,78 @@
+"""Constant-time, normalization-aware lookups for success-rate tables"""
+import re
+import unicodedata
+
+from fuzzy_match import FuzzyNameMatcher
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_name(name):
+    """Canonical form of a person's name used for forgiving lookups.
+
+    Accents are stripped (Iñárritu -> inarritu), case is folded with Unicode
+    casefolding and runs of whitespace collapse to a single space.
+    """
+    if name.isascii():
+        # Nothing to decompose, and casefold() is lower() for ASCII
+        return _WHITESPACE.sub(' ', name.lower()).strip()
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _WHITESPACE.sub(' ', stripped.casefold()).strip()
+
+
+class NameIndex(dict):
+    """A success-rate dict that also answers normalized-name lookups in O(1).
+
+    It behaves exactly like the plain dict it wraps (exact keys, len, items)
+    and keeps a second dict mapping normalize_name(key) to the original key.
+    When several names normalize to the same key the first one wins, matching
+    the order the old linear case-insensitive scan used.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__(rates or {})
+        self.normalized = {}
+        self.fuzzy = None
+        for key in self:
+            self.normalized.setdefault(normalize_name(key), key)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        normalized = normalize_name(key)
+        if normalized not in self.normalized:
+            self.normalized[normalized] = key
+            # A new name makes the trigram index stale
+            self.fuzzy = None
+
+    def build_fuzzy_index(self):
+        """Build the trigram index used by fuzzy_lookup"""
+        self.fuzzy = FuzzyNameMatcher(self.normalized)
+        return self
+
+    def normalized_key(self, name):
+        """The key matching name after normalize_name, or None"""
+        return self.normalized.get(normalize_name(name))
+
+    def lookup(self, name, default=None):
+        """Return the rate for name trying an exact then a normalized match"""
+        if name in self:
+            return self[name]
+        key = self.normalized_key(name)
+        if key is None:
+            return default
+        return self.get(key, default)
+
+    def fuzzy_lookup(self, name, min_score):
+        """Return (key, score) for the closest name scoring at least min_score.
+
+        Returns None when no fuzzy index has been built or nothing is close
+        enough.
+        """
+        if self.fuzzy is None:
+            return None
+        match = self.fuzzy.best_match(normalize_name(name), min_score)
+        if match is None:
+            return None
+        normalized, score = match
+        return self.normalized[normalized], score
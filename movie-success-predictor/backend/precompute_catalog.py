@@ -0,0 +1,59 @@
+import argparse
+import os
+import time
+
+import app as backend_app
+from catalog_predictions import CATALOG_PREDICTIONS_FILE, build_catalog_predictions, load_catalog_predictions
+
+
+def precompute_catalog(artifacts_dir='.', csv_path=None, model_format=None, inference_engine=None, model_file=None,
+                       force=False):
+    """Score every catalog movie with the model in artifacts_dir and save the table next to it.
+
+    model_format, inference_engine and model_file default to the env vars the
+    server reads, so the table is made by the bundle the server will load. A
+    saved table already made by that bundle from the same catalog is kept
+    unless force is set.
+    """
+    if csv_path is not None:
+        backend_app.MOVIES_CSV = csv_path
+    # Scored below, once, rather than also in the server's background refresh
+    backend_app.CATALOG_PREDICTIONS = False
+    if not backend_app.load_model_and_data(artifacts_dir, model_format, inference_engine, model_file):
+        raise SystemExit('Failed to load model; see the log for details')
+    bundle = backend_app.model_bundle
+    store = backend_app.get_movie_store()
+    if store is None:
+        raise SystemExit(f'Movie catalog not found at {backend_app.MOVIES_CSV}')
+
+    path = os.path.join(bundle.artifacts_dir, CATALOG_PREDICTIONS_FILE)
+    table = None if force else load_catalog_predictions(path, bundle.version, store.version)
+    if table is not None:
+        print(f"✅ {path} already holds the {len(table)} predictions of model version {bundle.version}")
+        return table
+
+    print(f"🎬 Scoring {store.size} catalog movies with model version {bundle.version} "
+          f"({bundle.model_format}, {bundle.inference_engine} engine)...")
+    start = time.perf_counter()
+    table = build_catalog_predictions(store, bundle, backend_app.prepare_features, backend_app.score_features)
+    elapsed = time.perf_counter() - start
+
+    table.save(path)
+    labels = table.classes[backend_app.predicted_classes(table.probabilities, backend_app.HIT_THRESHOLD)]
+    print(f"✅ {len(table)} predictions written to {path} in {elapsed:.2f}s "
+          f"({len(table.rows)} distinct feature rows, {int((labels == 1).sum())} HITs)")
+    return table
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Precompute predictions for every movie in the catalog')
+    parser.add_argument('--artifacts', default='.', help='directory holding saved_model.pkl and *_success.joblib')
+    parser.add_argument('--csv', default=None, help='movie catalog (default: MOVIES_CSV)')
+    parser.add_argument('--model', default=None, help='pickled model file in <artifacts> (default: MODEL_FILE)')
+    parser.add_argument('--format', choices=['pickle', 'compiled'], default=None,
+                        help='model format the server loads (default: MODEL_FORMAT)')
+    parser.add_argument('--engine', choices=['sklearn', 'native'], default=None,
+                        help='inference engine the server scores with (default: INFERENCE_ENGINE)')
+    parser.add_argument('--force', action='store_true', help='score the catalog even when the saved table is current')
+    args = parser.parse_args()
+    precompute_catalog(args.artifacts, args.csv, args.format, args.engine, args.model, args.force)
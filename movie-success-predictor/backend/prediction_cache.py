@@ -0,0 +1,184 @@
+"""Bounded LRU + TTL cache for model outputs, keyed on prepared features"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def feature_key(features):
+    """Stable hash of a prepare_features dict.
+
+    Keys are sorted and values serialized with json (floats keep their repr),
+    so the same movie always hashes the same way in every worker process.
+    """
+    canonical = json.dumps(sorted(features.items()), separators=(',', ':'), ensure_ascii=False)
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class SQLiteCacheStore:
+    """Optional cache tier in a local SQLite file shared by all workers.
+
+    Entries are stored under a namespace (the loaded model bundle version)
+    so workers still serving an older model never read newer results.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        # A connection opened before fork must not be used by the children
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._forget_connections)
+        self._connect().execute(
+            'CREATE TABLE IF NOT EXISTS predictions ('
+            'namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL, '
+            'PRIMARY KEY (namespace, key))'
+        )
+
+    def _connect(self):
+        # sqlite3 connections cannot be shared between threads
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def _forget_connections(self):
+        self._local = threading.local()
+
+    def get(self, namespace, key):
+        row = self._connect().execute(
+            'SELECT value, expires_at FROM predictions WHERE namespace = ? AND key = ?', (namespace, key)
+        ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, namespace, key, value, ttl_seconds):
+        self._connect().execute(
+            'INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)',
+            (namespace, key, json.dumps(value), time.time() + ttl_seconds)
+        )
+
+    def purge_expired(self):
+        self._connect().execute('DELETE FROM predictions WHERE expires_at < ?', (time.time(),))
+
+
+class PredictionCache:
+    """Thread-safe in-process LRU cache with per-entry TTL.
+
+    A max_entries of 0 disables caching. When a shared store is configured,
+    local misses fall through to it and its hits are copied locally.
+    """
+
+    def __init__(self, max_entries=4096, ttl_seconds=3600, shared_store=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.shared_store = shared_store
+        self.namespace = ''
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def get(self, key, namespace=None):
+        """Return the cached value for key, or None.
+
+        When namespace is given and the cache holds entries of another one,
+        nothing is looked up: those values were computed by another model.
+        """
+        if not self.enabled or (namespace is not None and namespace != self.namespace):
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+
+        if self.shared_store is not None:
+            try:
+                value = self.shared_store.get(self.namespace, key)
+            except sqlite3.Error:
+                value = None
+            if value is not None:
+                self._store_local(key, value)
+                with self._lock:
+                    self.shared_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, value, namespace=None):
+        """Cache a JSON-serializable value under key.
+
+        When namespace is given and the cache has since been invalidated for
+        another one, the value is dropped: it was computed by a model that is
+        no longer served.
+        """
+        if not self.enabled or (namespace is not None and namespace != self.namespace):
+            return
+        self._store_local(key, value)
+        if self.shared_store is not None:
+            try:
+                self.shared_store.set(self.namespace, key, value, self.ttl_seconds)
+            except sqlite3.Error:
+                pass
+
+    def _store_local(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, namespace=''):
+        """Drop every entry, e.g. after the model or success rates are reloaded.
+
+        namespace identifies the newly loaded artifacts in the shared store.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.namespace = namespace
+            self.invalidations += 1
+        if self.shared_store is not None:
+            try:
+                self.shared_store.purge_expired()
+            except sqlite3.Error:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'shared_backend': self.shared_store.path if self.shared_store is not None else None
+            }
@@ -0,0 +1,226 @@
+"""Sampling profiler for the running server.
+
+A Sampler thread wakes every `interval` seconds, reads the Python stack of
+the threads it watches with sys._current_frames() and counts each distinct
+stack. Nothing is traced between samples, so the cost is bounded by the
+sampling rate whatever the code being profiled does. Results come out as
+collapsed stacks ("outer;inner;leaf count" lines, the input format of
+flamegraph.pl and speedscope) or as a top-N table of functions.
+"""
+import os
+import sys
+import threading
+import time
+
+# Leaf frames of threads that are blocked waiting rather than running
+IDLE_FRAMES = {
+    ('threading.py', 'wait'), ('threading.py', '_wait_for_tstate_lock'), ('selectors.py', 'select'),
+    ('socket.py', 'accept'), ('socketserver.py', 'serve_forever'), ('queue.py', 'get'),
+    ('thread.py', '_worker'), ('connection.py', 'wait')
+}
+
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class StackProfile:
+    """Sample counts per distinct (thread name, stack) pair.
+
+    A stack is a root-to-leaf tuple of frame labels; the thread name may be
+    None. At most max_stacks distinct stacks are kept, and samples of
+    further new stacks are only counted in `dropped`.
+    """
+
+    def __init__(self, max_stacks=10000):
+        self.max_stacks = max_stacks
+        self.stacks = {}
+        self.samples = 0
+        self.dropped = 0
+        self.started_at = time.time()
+        self.duration = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, stack, thread=None):
+        key = (thread, stack)
+        with self._lock:
+            self.samples += 1
+            if key in self.stacks:
+                self.stacks[key] += 1
+            elif len(self.stacks) < self.max_stacks:
+                self.stacks[key] = 1
+            else:
+                self.dropped += 1
+
+    def collapsed(self):
+        """One 'thread;frame;frame count' line per stack, most sampled first"""
+        with self._lock:
+            stacks = sorted(self.stacks.items(), key=lambda item: -item[1])
+        lines = []
+        for (thread, stack), count in stacks:
+            frames = (thread.replace(';', ':'),) + stack if thread is not None else stack
+            lines.append(f"{';'.join(frames)} {count}\n")
+        return ''.join(lines)
+
+    def top(self, n=20):
+        """The n frames with most samples: self (as the leaf) and total (anywhere in the stack)"""
+        with self._lock:
+            stacks = list(self.stacks.items())
+            samples = self.samples
+        own = {}
+        total = {}
+        for (_, stack), count in stacks:
+            if not stack:
+                continue
+            own[stack[-1]] = own.get(stack[-1], 0) + count
+            for frame in set(stack):
+                total[frame] = total.get(frame, 0) + count
+        ranked = sorted(total, key=lambda frame: (-own.get(frame, 0), -total[frame]))[:n]
+        return [{
+            'frame': frame,
+            'self': own.get(frame, 0),
+            'total': total[frame],
+            'self_percent': round(100 * own.get(frame, 0) / samples, 1) if samples else 0.0,
+            'total_percent': round(100 * total[frame] / samples, 1) if samples else 0.0
+        } for frame in ranked]
+
+    def summary(self, n=20):
+        return {
+            'samples': self.samples,
+            'distinct_stacks': len(self.stacks),
+            'dropped_samples': self.dropped,
+            'started_at': self.started_at,
+            'duration_seconds': round(self.duration or time.time() - self.started_at, 3),
+            'top': self.top(n)
+        }
+
+
+class Sampler:
+    """Background thread sampling the stacks of other threads.
+
+    threads=None samples every thread but the sampler itself and those in
+    exclude (and, unless idle is True, skips threads blocked in
+    IDLE_FRAMES). With a set of
+    thread idents, only those are sampled; the set can change while
+    running through add_thread()/remove_thread(), and the sampler sleeps
+    while it is empty. Samples record the thread name when thread_names is
+    True.
+    """
+
+    def __init__(self, interval=0.005, threads=None, exclude=(), idle=False, thread_names=True, max_stacks=10000):
+        self.interval = interval
+        self.threads = set(threads) if threads is not None else None
+        self.exclude = set(exclude)
+        self.idle = idle
+        self.thread_names = thread_names
+        self.profile = StackProfile(max_stacks)
+        self.pid = os.getpid()
+        self._labels = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._ident = None
+        self._started = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        self.profile.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._started is not None:
+            self.profile.duration = time.perf_counter() - self._started
+        return self.profile
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def reset(self):
+        """Start a new profile and return the one collected so far"""
+        profile, self.profile = self.profile, StackProfile(self.profile.max_stacks)
+        profile.duration = time.time() - profile.started_at
+        return profile
+
+    def add_thread(self, ident):
+        with self._lock:
+            self.threads.add(ident)
+            self._wakeup.set()
+
+    def remove_thread(self, ident):
+        with self._lock:
+            self.threads.discard(ident)
+            if not self.threads:
+                self._wakeup.clear()
+
+    def _run(self):
+        self._ident = threading.get_ident()
+        while not self._stop.is_set():
+            if self.threads is not None:
+                with self._lock:
+                    targets = set(self.threads)
+                if not targets:
+                    self._wakeup.wait()
+                    continue
+            else:
+                targets = None
+            self.sample(targets)
+            self._stop.wait(self.interval)
+
+    def sample(self, targets=None):
+        """Record the current stack of each target thread (every other thread for None)"""
+        names = {thread.ident: thread.name for thread in threading.enumerate()} if self.thread_names else None
+        for ident, frame in sys._current_frames().items():
+            if ident == self._ident or ident in self.exclude or (targets is not None and ident not in targets):
+                continue
+            if not self.idle and targets is None and self._is_idle(frame):
+                continue
+            thread = names.get(ident, f'thread-{ident}') if names is not None else None
+            self.profile.add(self._stack(frame), thread)
+
+    def _stack(self, frame):
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = frame_label(code)
+            labels.append(label)
+            frame = frame.f_back
+        return tuple(reversed(labels))
+
+    @staticmethod
+    def _is_idle(frame):
+        return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES
+
+
+def frame_label(code):
+    """'function (file:first line)' with the path shortened to the backend or package"""
+    path = code.co_filename
+    if path.startswith(_BACKEND_DIR + os.sep):
+        path = path[len(_BACKEND_DIR) + 1:]
+    elif 'site-packages' + os.sep in path:
+        path = path.split('site-packages' + os.sep, 1)[1]
+    else:
+        path = os.path.basename(path)
+    # ';' separates frames in the collapsed format
+    return f'{code.co_name} ({path}:{code.co_firstlineno})'.replace(';', ':')
+
+
+def profile_for(seconds, interval=0.005, idle=False, max_stacks=10000):
+    """Sample every other thread of the process for `seconds` and return the StackProfile"""
+    sampler = Sampler(interval, exclude={threading.get_ident()}, idle=idle, max_stacks=max_stacks).start()
+    time.sleep(seconds)
+    return sampler.stop()
+
+
+def write_collapsed(profile, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(profile.collapsed())
@@ -0,0 +1,147 @@
+"""Score a sample of live traffic with a candidate model, off the request path.
+
+After a request has its prediction from the served model, ShadowScorer may
+hand the request's movies and that prediction to a small thread pool. There
+the candidate bundle scores the same movies, and the scorer records how
+often its labels agree with the served ones, how far apart the
+probabilities are and how long the candidate took. Requests never wait
+for it: jobs beyond max_queue are dropped, and candidate errors are only
+counted.
+
+Scoring in a thread of the same worker still competes with requests for
+the CPU and the GIL. With busy() given, a job waits until it returns False
+(no request in flight) before it starts, and is dropped as expired after
+max_wait seconds, so shadow scoring runs in the gaps between requests and
+gives way when the worker is saturated.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of busy() while a job waits for an idle worker
+IDLE_POLL_SECONDS = 0.001
+
+
+class ShadowScorer:
+    """Background shadow scoring of a sampled fraction of requests.
+
+    get_candidate() returns the candidate bundle; it is called in the pool,
+    so loading the candidate never delays a request. score(movies, bundle,
+    threshold) returns the candidate's (labels, probabilities) for a list
+    of request movies.
+    """
+
+    def __init__(self, get_candidate, score, sample_rate=0.1, workers=1, max_queue=64, busy=None, max_wait=1.0,
+                 rng=random.random):
+        self.get_candidate = get_candidate
+        self.score = score
+        self.sample_rate = sample_rate
+        self.workers = workers
+        self.max_queue = max_queue
+        self.busy = busy
+        self.max_wait = max_wait
+        self.pid = os.getpid()
+        self._rng = rng
+
+        self.score_ms = Histogram([0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000])
+        self.probability_delta = Histogram([0.001, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5])
+        self.requests = 0
+        self.rows = 0
+        self.agreed = 0
+        self.dropped = 0
+        self.expired = 0
+        self.errors = 0
+        self.candidate_version = None
+
+        self._queued = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='shadow-score')
+
+    def sample(self):
+        """Whether to shadow the current request"""
+        return self.sample_rate >= 1 or self._rng() < self.sample_rate
+
+    def submit(self, movies, labels, probabilities, threshold=None):
+        """Queue the served prediction of movies for comparison; returns the Future, or None if dropped"""
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self.dropped += 1
+                return None
+            self._queued += 1
+        return self._executor.submit(self._compare, movies, np.asarray(labels), np.asarray(probabilities), threshold)
+
+    def _wait_for_idle(self):
+        """Wait until busy() is False; returns False when max_wait passed first"""
+        if self.busy is None:
+            return True
+        deadline = time.monotonic() + self.max_wait
+        while self.busy():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(IDLE_POLL_SECONDS)
+        return True
+
+    def _compare(self, movies, labels, probabilities, threshold):
+        if not self._wait_for_idle():
+            with self._lock:
+                self.expired += 1
+                self._queued -= 1
+            return None
+        try:
+            candidate = self.get_candidate()
+            start = time.perf_counter()
+            candidate_labels, candidate_probabilities = self.score(movies, candidate, threshold)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        except Exception as e:
+            logger.warning(f"Shadow scoring failed: {str(e)}")
+            with self._lock:
+                self.errors += 1
+                self._queued -= 1
+            return None
+
+        agreed = int(np.count_nonzero(np.asarray(candidate_labels) == labels))
+        candidate_probabilities = np.asarray(candidate_probabilities)
+        self.score_ms.observe(elapsed_ms)
+        # Probabilities are only comparable when both models have the same classes
+        if candidate_probabilities.shape == probabilities.shape:
+            for delta in np.abs(candidate_probabilities - probabilities).max(axis=1).tolist():
+                self.probability_delta.observe(delta)
+        with self._lock:
+            self.requests += 1
+            self.rows += len(labels)
+            self.agreed += agreed
+            self.candidate_version = candidate.version
+            self._queued -= 1
+        return agreed
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sample_rate': self.sample_rate,
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'queued': self._queued,
+                'candidate_version': self.candidate_version,
+                'requests': self.requests,
+                'rows': self.rows,
+                'agreed': self.agreed,
+                'agreement': self.agreed / self.rows if self.rows else None,
+                'dropped': self.dropped,
+                'expired': self.expired,
+                'errors': self.errors,
+                'score_ms': self.score_ms.stats(),
+                'probability_delta': self.probability_delta.stats()
+            }
+
+    def close(self):
+        """Wait for queued comparisons and stop the pool"""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,137 @@
+"""Per-person hit and film counts behind the director/actor success rates.
+
+The <role>_success.joblib artifacts store these counts rather than the
+rates themselves, so a batch of new movies can be added by summing counts
+(see create_success_rates.py update) and the min-count filter can change
+without recounting. Rates are derived when the tables are loaded.
+"""
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ROLE_COLUMNS = ['director', 'actor1', 'actor2', 'actor3']
+
+# Marks a <role>_success.joblib holding counts; older files hold a plain
+# {name: rate} dict and are still served as-is
+COUNTS_FORMAT = 'success-counts-v1'
+
+
+def count_successes(series, success_series):
+    """Hits and film counts per unique value of series, in first-appearance order.
+
+    Returns a DataFrame indexed by person with integer 'hits' and 'films'
+    columns. Missing and empty names are skipped.
+    """
+    codes, uniques = pd.factorize(series)
+    valid = codes >= 0
+    if valid.any():
+        empty = np.flatnonzero(uniques == '')
+        if len(empty):
+            valid &= codes != empty[0]
+    codes = codes[valid]
+    success = np.asarray(success_series)[valid].astype(np.int64)
+    counts = pd.DataFrame({
+        'hits': np.bincount(codes, weights=success, minlength=len(uniques)).astype(np.int64),
+        'films': np.bincount(codes, minlength=len(uniques)).astype(np.int64)
+    }, index=pd.Index(uniques, dtype=object, name='person'))
+    return counts[counts['films'] > 0]
+
+
+def count_roles(movies):
+    """count_successes for the director and each actor column of movies"""
+    return {role: count_successes(movies[role], movies['success']) for role in ROLE_COLUMNS}
+
+
+def merge_role_counts(total, part):
+    """Add the per-role counts of one chunk of movies to a running total.
+
+    People first seen in part are appended, so the result stays in
+    first-appearance order over all chunks.
+    """
+    if total is None:
+        return part
+    merged = {}
+    for role in ROLE_COLUMNS:
+        counts, new = total[role], part[role]
+        positions = counts.index.get_indexer(new.index)
+        unseen = positions < 0
+        index = pd.Index(counts.index.append(new.index[unseen]), dtype=object, name='person')
+        positions[unseen] = np.arange(len(counts), len(index))
+        values = np.zeros((len(index), 2), dtype=np.int64)
+        values[:len(counts)] = counts.to_numpy()
+        values[positions] += new.to_numpy()
+        merged[role] = pd.DataFrame(values, index=index, columns=counts.columns)
+    return merged
+
+
+def rates_from_counts(role_counts, min_count=2):
+    """Success rate dictionaries for people with at least min_count films.
+
+    A person's film count comes from the first of director, actor1, actor2
+    and actor3 they appear in, so someone who both directs and acts is
+    filtered by their directing credits in every table. Roles missing from
+    role_counts are skipped.
+    """
+    roles = [role for role in ROLE_COLUMNS if role in role_counts]
+    films = [role_counts[role]['films'] for role in roles]
+    tables = {}
+    for role in roles:
+        counts = role_counts[role]
+        count = pd.Series(np.nan, index=counts.index)
+        for role_films in films:
+            count = count.fillna(role_films.reindex(counts.index))
+        kept = counts[(count >= min_count).to_numpy()]
+        tables[role] = dict(zip(kept.index, (kept['hits'] / kept['films']).tolist()))
+    return tables
+
+
+def counts_to_artifact(counts, min_count=2):
+    """The plain-data form of a count_successes frame saved to <role>_success.joblib.
+
+    min_count is stored as the filter applied when the rates are derived.
+    """
+    return {
+        'format': COUNTS_FORMAT,
+        'min_count': min_count,
+        'people': counts.index.tolist(),
+        'hits': counts['hits'].to_numpy(dtype=np.int64),
+        'films': counts['films'].to_numpy(dtype=np.int64)
+    }
+
+
+def is_counts_artifact(table):
+    return isinstance(table, dict) and table.get('format') == COUNTS_FORMAT
+
+
+def counts_from_artifact(table):
+    """Inverse of counts_to_artifact"""
+    return pd.DataFrame({'hits': table['hits'], 'films': table['films']},
+                        index=pd.Index(table['people'], dtype=object, name='person'))
+
+
+def derive_success_rates(tables, min_count=None):
+    """Turn loaded success tables into {name: rate} dicts.
+
+    Count artifacts are filtered by min_count (by default the one stored
+    with the counts, see rates_from_counts) and converted; legacy rate
+    dicts are returned unchanged.
+    """
+    role_counts = {role: counts_from_artifact(table) for role, table in tables.items() if is_counts_artifact(table)}
+    if min_count is None:
+        stored = [tables[role].get('min_count', 2) for role in ROLE_COLUMNS if role in role_counts]
+        min_count = stored[0] if stored else 2
+    rates = dict(tables)
+    rates.update(rates_from_counts(role_counts, min_count))
+    return rates
+
+
+def save_artifact(table, path):
+    """joblib.dump to path through a temporary file renamed into place.
+
+    A server watching the artifacts never sees a half-written file.
+    """
+    temp_path = f'{path}.tmp'
+    joblib.dump(table, temp_path)
+    os.replace(temp_path, path)
@@ -0,0 +1,182 @@
+"""One shared, interned name vocabulary behind every success-rate table.
+
+The director and actor tables are loaded from separate files, so the same
+actor name used to be held as a separate str object, dict entry, normalized
+key and trigram index in each of the four tables. A TalentTable holds every
+name once in a sorted, interned list, with the rates per role in one NumPy
+array. Lookups go through a compact hash index into the sorted list, and one
+trigram index over the normalized names serves all roles. RoleRates is the read-only per-role view
+that prepare_features reads; it answers the same exact, normalized and
+fuzzy lookups as a NameIndex.
+"""
+import sys
+from collections.abc import Mapping
+
+import numpy as np
+
+from fuzzy_match import FuzzyNameMatcher
+from name_index import normalize_name
+from success_counts import ROLE_COLUMNS
+
+
+class NameSlots:
+    """Open-addressing hash index from names to their positions in a list.
+
+    The slots are one int32 array at most a quarter full, a fraction of the
+    size of a dict over the same names. Probing is linear and compares
+    names only on a hash slot hit, so a lookup costs about as much as one
+    dict lookup done in Python.
+    """
+
+    def __init__(self, names):
+        self.names = names
+        size = 8
+        while size < 4 * len(names):
+            size *= 2
+        self.mask = size - 1
+        slots = np.full(size, -1, dtype=np.int32)
+        for position, name in enumerate(names):
+            slot = hash(name) & self.mask
+            while slots[slot] >= 0:
+                slot = (slot + 1) & self.mask
+            slots[slot] = position
+        self.slots = slots
+        self._slots = memoryview(slots)
+
+    def find(self, name):
+        """Position of name, or -1"""
+        slot = hash(name) & self.mask
+        while True:
+            position = self._slots[slot]
+            if position < 0 or self.names[position] == name:
+                return position
+            slot = (slot + 1) & self.mask
+
+
+class TalentTable:
+    """Success rates (and film counts, when known) of every person in every role.
+
+    tables maps each role to a {name: rate} dict; films optionally maps
+    roles to {name: film count}. A missing rate is stored as NaN and a
+    missing film count as -1. Like NameIndex, when several names of a role
+    normalize to the same key the first one in that role's table wins.
+    """
+
+    def __init__(self, tables, films=None, roles=ROLE_COLUMNS):
+        self.roles = list(roles)
+        films = films or {}
+        self.names = sorted({sys.intern(name) for role in self.roles for name in tables.get(role, {})})
+
+        self.rates = np.full((len(self.roles), len(self.names)), np.nan)
+        self.films = np.full((len(self.roles), len(self.names)), -1, dtype=np.int32)
+        self.normalized_names = sorted({normalize_name(name) for name in self.names})
+        self.index = NameSlots(self.names)
+        self.normalized_index = NameSlots(self.normalized_names)
+        # Per role, the vocabulary position each normalized name resolves to
+        self.normalized_targets = np.full((len(self.roles), len(self.normalized_names)), -1, dtype=np.int32)
+        for row, role in enumerate(self.roles):
+            table = tables.get(role, {})
+            if not table:
+                continue
+            positions = np.fromiter((self.index.find(name) for name in table), dtype=np.int64, count=len(table))
+            self.rates[row, positions] = np.fromiter(table.values(), dtype=np.float64, count=len(table))
+            role_films = films.get(role, {})
+            for name, count in role_films.items():
+                self.films[row, self.index.find(name)] = count
+            targets = self.normalized_targets[row]
+            for name, position in zip(table, positions):
+                normalized = self.normalized_index.find(normalize_name(name))
+                if targets[normalized] < 0:
+                    targets[normalized] = position
+        self.present = ~np.isnan(self.rates)
+        self.fuzzy = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def build_fuzzy_index(self):
+        """Build the trigram index shared by every role's fuzzy_lookup"""
+        self.fuzzy = FuzzyNameMatcher(self.normalized_names)
+        return self
+
+    def role(self, role):
+        """Read-only {name: rate} view of one role"""
+        return RoleRates(self, self.roles.index(role))
+
+
+class RoleRates(Mapping):
+    """One role's rates in a TalentTable, read like a NameIndex"""
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+        self.rates = table.rates[row]
+        self.present = table.present[row]
+        self.targets = table.normalized_targets[row]
+        # Indexing a memoryview returns a Python float without the cost of a NumPy scalar
+        self._rates = memoryview(self.rates)
+        # Normalized names with a match in this role, the fuzzy search filter
+        self.searchable = self.targets >= 0
+        self._len = int(self.present.sum())
+
+    def _position(self, name):
+        position = self.table.index.find(name) if isinstance(name, str) else -1
+        # NaN (no rate in this role) is the only value not equal to itself
+        if position >= 0 and self._rates[position] == self._rates[position]:
+            return position
+        return -1
+
+    def __getitem__(self, name):
+        position = self._position(name)
+        if position < 0:
+            raise KeyError(name)
+        return self._rates[position]
+
+    def get(self, name, default=None):
+        position = self._position(name)
+        return default if position < 0 else self._rates[position]
+
+    def __contains__(self, name):
+        return self._position(name) >= 0
+
+    def __iter__(self):
+        names = self.table.names
+        return (names[position] for position in np.flatnonzero(self.present))
+
+    def __len__(self):
+        return self._len
+
+    def film_count(self, name):
+        """Films the rate was computed from, or None when unknown"""
+        position = self._position(name)
+        if position < 0 or self.table.films[self.row, position] < 0:
+            return None
+        return int(self.table.films[self.row, position])
+
+    def _target(self, normalized):
+        position = self.table.normalized_index.find(normalized)
+        position = self.targets[position] if position >= 0 else -1
+        return self.table.names[position] if position >= 0 else None
+
+    def normalized_key(self, name):
+        """The name in this role matching name after normalize_name, or None"""
+        return self._target(normalize_name(name))
+
+    def lookup(self, name, default=None):
+        """Return the rate for name trying an exact then a normalized match"""
+        key = name if name in self else self.normalized_key(name)
+        return default if key is None else self[key]
+
+    def fuzzy_lookup(self, name, min_score):
+        """Return (key, score) for the closest name of this role scoring at least min_score.
+
+        Returns None when the table has no fuzzy index or nothing is close
+        enough.
+        """
+        if self.table.fuzzy is None:
+            return None
+        match = self.table.fuzzy.best_match(normalize_name(name), min_score, allowed=self.searchable)
+        if match is None:
+            return None
+        normalized, score = match
+        return self._target(normalized), score
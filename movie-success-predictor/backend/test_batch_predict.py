@@ -0,0 +1,141 @@
+import json
+
+SAMPLE_MOVIE = {
+    "movie_title": "The Matrix Reloaded",
+    "director": "Christopher Nolan",
+    "actor1": "Leonardo DiCaprio",
+    "actor2": "Tom Hanks",
+    "actor3": "Morgan Freeman",
+    "budget": 150000000,
+    "runtime": 138,
+    "genres": "Action",
+    "production_companies": "Warner Bros.",
+    "original_language": "en",
+    "release_year": 2024,
+    "release_month": 6,
+    "avg_rating": 8.2,
+    "ratings_count": 50000
+}
+
+
+def make_movies(n):
+    movies = []
+    for i in range(n):
+        movie = dict(SAMPLE_MOVIE)
+        movie['movie_title'] = f"Movie {i}"
+        movie['budget'] = 1000000 + i * 7000000
+        movie['avg_rating'] = 3.0 + (i % 13) * 0.5
+        movies.append(movie)
+    return movies
+
+
+def test_batch_matches_single_predictions(loaded_app):
+    """Every batch row must match the single-row /predict result"""
+    client = loaded_app.app.test_client()
+    movies = make_movies(25)
+
+    response = client.post('/predict/batch', json=movies)
+    assert response.status_code == 200
+    batch = response.get_json()
+    assert batch['count'] == 25
+    assert batch['error_count'] == 0
+
+    for movie, result in zip(movies, batch['results']):
+        single = client.post('/predict', json=movie).get_json()
+        assert result['prediction'] == single['prediction']
+        assert result['probability'] == single['probability']
+        assert result['features_used'] == single['features_used']
+
+
+def test_batch_reports_per_row_errors(loaded_app):
+    """Invalid rows get an error entry without failing the whole batch"""
+    client = loaded_app.app.test_client()
+    movies = make_movies(3)
+    del movies[1]['budget']
+    movies[2]['runtime'] = 'two hours'
+
+    response = client.post('/predict/batch', json=movies)
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert 'prediction' in results[0]
+    assert 'budget' in results[1]['error']
+    assert 'error' in results[2]
+
+
+def test_batch_rejects_non_string_names_and_non_finite_numbers(loaded_app):
+    """A wrongly typed name or a NaN/Infinity number fails only its own row"""
+    client = loaded_app.app.test_client()
+    movies = make_movies(5)
+    movies[1]['director'] = 123
+    movies[2]['budget'] = float('inf')
+    movies[3]['avg_rating'] = float('nan')
+    movies[4]['ratings_count'] = float('-inf')
+    # json.dumps writes these as Infinity and NaN, which json.loads accepts
+    body = json.dumps(movies)
+    assert 'Infinity' in body and 'NaN' in body
+
+    response = client.post('/predict/batch', data=body, content_type='application/json')
+    assert response.status_code == 200
+    batch = response.get_json()
+    assert batch['error_count'] == 4
+    assert batch['results'][0]['movie_title'] == 'Movie 0'
+    assert 'director' in batch['results'][1]['error']
+    assert 'budget' in batch['results'][2]['error']
+    assert 'avg_rating' in batch['results'][3]['error']
+    assert 'ratings_count' in batch['results'][4]['error']
+
+    # The single-movie endpoint refuses them with a 400 as well
+    assert client.post('/predict', json=movies[1]).status_code == 400
+    assert client.post('/predict', data=json.dumps(movies[2]), content_type='application/json').status_code == 400
+
+
+def test_batch_accepts_ndjson(loaded_app):
+    """NDJSON bodies are scored line by line, with bad lines reported"""
+    client = loaded_app.app.test_client()
+    movies = make_movies(2)
+    body = json.dumps(movies[0]) + '\n{not json}\n' + json.dumps(movies[1]) + '\n'
+
+    response = client.post('/predict/batch', data=body, content_type='application/x-ndjson')
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert len(results) == 3
+    assert results[0]['movie_title'] == 'Movie 0'
+    assert 'Invalid JSON' in results[1]['error']
+    assert results[2]['movie_title'] == 'Movie 1'
+
+
+def test_single_prediction_matches_pipeline_predict(loaded_app):
+    """One predict_proba pass gives the label pipeline.predict would"""
+    import pandas as pd
+
+    client = loaded_app.app.test_client()
+    pipeline = loaded_app.model_bundle.pipeline
+    for movie in make_movies(40):
+        feature_df = pd.DataFrame([loaded_app.prepare_features(movie)])
+        label = pipeline.predict(feature_df)[0]
+        probability = pipeline.predict_proba(feature_df)[0]
+
+        result = client.post('/predict', json=movie).get_json()
+        assert result['prediction'] == ('HIT' if label == 1 else 'FLOP')
+        assert result['probability'] == round(float(probability[list(pipeline.classes_).index(label)]), 3)
+
+
+def test_hit_threshold(loaded_app, monkeypatch):
+    """?threshold= and HIT_THRESHOLD move the HIT/FLOP cut without retraining"""
+    client = loaded_app.app.test_client()
+    movie = make_movies(1)[0]
+    default = client.post('/predict', json=movie).get_json()
+    hit_probability = default['probability'] if default['prediction'] == 'HIT' else 1 - default['probability']
+
+    always_hit = client.post('/predict?threshold=0', json=movie).get_json()
+    assert always_hit['prediction'] == 'HIT'
+    assert abs(always_hit['probability'] - hit_probability) <= 0.0015
+    strict = client.post('/predict/batch?threshold=1', json=make_movies(5)).get_json()['results']
+    assert all(result['prediction'] == 'FLOP' or result['probability'] == 1 for result in strict)
+    assert client.post('/predict?threshold=2', json=movie).status_code == 400
+    assert client.post('/predict/batch?threshold=high', json=[movie]).status_code == 400
+
+    monkeypatch.setattr(loaded_app, 'HIT_THRESHOLD', 0.0)
+    assert client.post('/predict', json=movie).get_json()['prediction'] == 'HIT'
+    assert loaded_app.predict_batch([movie])[0]['prediction'] == 'HIT'
+    assert client.get('/model-info').get_json()['hit_threshold'] == 0.0
@@ -0,0 +1,39 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'benchmarks'))
+from bench_suite import compare_results, run_suite  # noqa: E402
+
+
+def results(**medians):
+    return {'results': {name: {'median_us': median} for name, median in medians.items()}}
+
+
+def test_compare_results_flags_changes_beyond_threshold():
+    baseline = results(steady=100.0, slower=100.0, faster=100.0, dropped=5.0)
+    current = results(steady=109.0, slower=111.0, faster=80.0, added=1.0)
+    rows = {row['case']: row for row in compare_results(current, baseline, threshold=0.1)}
+
+    assert {name: row['status'] for name, row in rows.items()} == {
+        'steady': 'ok', 'slower': 'regression', 'faster': 'improved', 'added': 'new', 'dropped': 'missing'
+    }
+    assert abs(rows['slower']['change'] - 0.11) < 1e-9
+    assert rows['added']['baseline_us'] is None and rows['dropped']['current_us'] is None
+
+
+def test_quick_suite_runs_in_process(sample_artifacts):
+    import app as backend_app
+
+    cache_entries = backend_app.prediction_cache.max_entries
+    document = run_suite(sample_artifacts, quick=True, only=['exact_hit', 'predict/'], repeat_scale=0.1,
+                         min_sample_seconds=0.0001)
+
+    assert sorted(document['results']) == [
+        'get_success_rate/exact_hit/entries=1000', 'predict/batch/movies=10', 'predict/single',
+        'predict/sweep/points=108'
+    ]
+    for result in document['results'].values():
+        assert 0 < result['min_us'] <= result['median_us'] <= result['p99_us']
+        assert result['repeat'] >= 3
+    assert document['environment']['python'] == sys.version.split()[0]
+    assert backend_app.prediction_cache.max_entries == cache_entries
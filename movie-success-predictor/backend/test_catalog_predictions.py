@@ -0,0 +1,142 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from catalog_predictions import CATALOG_PREDICTIONS_FILE, build_catalog_predictions, catalog_movie, \
+    load_catalog_predictions
+from movie_store import GENRE_COLUMNS, MovieStore
+from test_hot_reload import copy_artifacts, set_director_rate
+from test_movie_search import MOVIES
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    """A small catalog served in place of the movie CSV"""
+    rows = []
+    for title, director, actor1, actor2, actor3, year, budget, rating, genres in MOVIES:
+        row = {'budget': budget, 'popularity': rating * 10, 'revenue': budget * 3, 'runtime': 120.0,
+               'title': title, 'avg_rating': rating, 'ratings': 1000, 'release_year': year,
+               'director': director, 'actor_1': actor1, 'actor_2': actor2, 'actor_3': actor3, 'success': 1}
+        row.update({genre: int(genre in genres) for genre in GENRE_COLUMNS})
+        rows.append(row)
+    store = MovieStore(pd.DataFrame(rows), 'test')
+    monkeypatch.setattr('app.movie_store', store)
+    monkeypatch.setattr('app.catalog_predictions', None)
+    return store
+
+
+def talent_lookups(metrics_text):
+    return [line for line in metrics_text.splitlines() if line.startswith('movie_predictor_talent_lookups_total')]
+
+
+def counting_scorer(loaded_app, monkeypatch):
+    calls = []
+    score_features = loaded_app.score_features
+
+    def score(rows, bundle):
+        calls.append(len(rows))
+        return score_features(rows, bundle)
+
+    monkeypatch.setattr(loaded_app, 'score_features', score)
+    return calls
+
+
+def test_catalog_table_matches_live_predictions(loaded_app, catalog, monkeypatch):
+    bundle = loaded_app.model_bundle
+    client = loaded_app.app.test_client()
+    lookups = client.get('/metrics').get_data(as_text=True)
+    table = build_catalog_predictions(catalog, bundle, loaded_app.prepare_features, loaded_app.score_features)
+    assert len(table) == catalog.size and table.matches(bundle.version, catalog.version)
+    # Building the table is not traffic, so talent lookups are not counted
+    assert talent_lookups(client.get('/metrics').get_data(as_text=True)) == talent_lookups(lookups)
+
+    live = [client.post('/predict', json=catalog_movie(catalog, row)).get_json() for row in range(catalog.size)]
+    monkeypatch.setattr(loaded_app, 'catalog_predictions', table)
+    monkeypatch.setattr(loaded_app.prediction_cache, 'max_entries', 0)
+    calls = counting_scorer(loaded_app, monkeypatch)
+    for row in range(catalog.size):
+        movie = catalog_movie(catalog, row)
+        expected = loaded_app.score_features([loaded_app.prepare_features(movie)], bundle)[0]
+        assert np.array_equal(table.probabilities[row], expected)
+        precomputed = client.post('/predict', json=movie).get_json()
+        for key in ('prediction', 'probability', 'confidence', 'features_used'):
+            assert precomputed[key] == live[row][key]
+    assert calls == [1] * catalog.size
+
+    # Novel movies still reach the model, in batches too
+    novel = dict(catalog_movie(catalog, 0), budget=123456789)
+    novel_probability = client.post('/predict', json=novel).get_json()['probability']
+    results = client.post('/predict/batch', json=[catalog_movie(catalog, 1), novel, catalog_movie(catalog, 2)])
+    assert [result['probability'] for result in results.get_json()['results']] == \
+        [live[1]['probability'], novel_probability, live[2]['probability']]
+    assert calls[catalog.size:] == [1, 1]
+
+    # A table made by another model is never used
+    table.model_version = 'stale'
+    client.post('/predict', json=catalog_movie(catalog, 0))
+    assert len(calls) == catalog.size + 3
+
+
+def test_search_adds_precomputed_predictions(loaded_app, catalog, monkeypatch):
+    client = loaded_app.app.test_client()
+    response = client.get('/movies/search?q=nolan&fields=title,prediction')
+    assert response.status_code == 200
+    pending = response.get_json()
+    pending_etag = response.headers['ETag'].strip('"')
+    assert pending['model_version'] is None
+    assert [movie['prediction'] for movie in pending['results']] == [None, None, None]
+
+    bundle = loaded_app.model_bundle
+    table = build_catalog_predictions(catalog, bundle, loaded_app.prepare_features, loaded_app.score_features)
+    monkeypatch.setattr(loaded_app, 'catalog_predictions', table)
+    response = client.get('/movies/search?q=nolan&fields=title,prediction,id')
+    ready = response.get_json()
+    # The page changed with the table, so the old ETag no longer validates it
+    refreshed = client.get('/movies/search?q=nolan&fields=title,prediction', headers={'If-None-Match': pending_etag})
+    assert refreshed.status_code == 200
+    assert ready['model_version'] == bundle.version
+    for movie in ready['results']:
+        probability = table.probabilities[movie['id']]
+        assert movie['probability'] == round(float(probability.max()), 3)
+        assert movie['prediction'] == ('HIT' if bundle.classes_[probability.argmax()] == 1 else 'FLOP')
+    assert 'id' not in client.get('/movies/search?q=nolan&fields=title,prediction').get_json()['results'][0]
+    assert client.get('/movies/search?fields=title,nope').status_code == 400
+
+
+def test_model_change_rebuilds_saved_table(loaded_app, catalog, sample_artifacts, tmp_path, monkeypatch):
+    artifacts_dir = copy_artifacts(sample_artifacts, tmp_path)
+    path = os.path.join(artifacts_dir, CATALOG_PREDICTIONS_FILE)
+    monkeypatch.setattr(loaded_app, 'CATALOG_PREDICTIONS', True)
+    try:
+        assert loaded_app.load_model_and_data(artifacts_dir)
+        loaded_app.catalog_refresh_thread.join()
+        first = loaded_app.model_bundle.version
+        assert loaded_app.catalog_predictions.model_version == first
+        assert load_catalog_predictions(path, first, catalog.version) is not None
+        assert load_catalog_predictions(path, first, 'other catalog') is None
+
+        set_director_rate(artifacts_dir, 0.01)
+        assert loaded_app.load_model_and_data(artifacts_dir)
+        loaded_app.catalog_refresh_thread.join()
+        second = loaded_app.model_bundle.version
+        assert second != first
+        assert loaded_app.catalog_predictions.model_version == second
+        assert load_catalog_predictions(path, first, catalog.version) is None
+
+        # A matching saved table is loaded without scoring the catalog again,
+        # and with the flag off as well
+        calls = counting_scorer(loaded_app, monkeypatch)
+        for build in (True, False):
+            monkeypatch.setattr(loaded_app, 'CATALOG_PREDICTIONS', build)
+            monkeypatch.setattr(loaded_app, 'catalog_predictions', None)
+            assert loaded_app.load_model_and_data(artifacts_dir)
+            assert loaded_app.catalog_refresh_thread is None
+            assert loaded_app.catalog_predictions.model_version == second
+        # The smoke test is the only scoring
+        assert calls == [1, 1]
+        assert loaded_app.app.test_client().get('/model-info').get_json()['catalog_predictions'] == catalog.size
+    finally:
+        monkeypatch.setattr(loaded_app, 'CATALOG_PREDICTIONS', False)
+        loaded_app.load_model_and_data(sample_artifacts)
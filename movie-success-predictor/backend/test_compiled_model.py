@@ -0,0 +1,73 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from compiled_model import CompiledModel
+from export_compiled_model import export_model, load_pipeline
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'benchmarks'))
+from _common import make_movies  # noqa: E402
+
+
+def test_compiled_model_matches_pipeline_exactly(loaded_app, sample_artifacts, tmp_path):
+    output_dir = str(tmp_path / 'compiled_model')
+    export_model(sample_artifacts, output_dir)
+    compiled = CompiledModel.load(output_dir)
+    pipeline = load_pipeline(os.path.join(sample_artifacts, 'saved_model.pkl'))
+
+    movies = make_movies(500)
+    # Unseen and infrequent categories must be encoded exactly like sklearn
+    movies[0]['genres'] = 'Never Seen Before'
+    movies[1]['production_companies'] = 'Paramount Pictures'
+    features = pd.DataFrame([loaded_app.prepare_features(movie) for movie in movies])
+
+    assert isinstance(compiled.threshold, np.memmap)
+    assert np.array_equal(compiled.predict_proba(features), pipeline.predict_proba(features))
+    assert np.array_equal(compiled.predict(features), pipeline.predict(features))
+
+
+def test_app_serves_compiled_model(loaded_app, sample_artifacts):
+    client = loaded_app.app.test_client()
+    movie = make_movies(1)[0]
+    expected = client.post('/predict', json=movie).get_json()
+
+    export_model(sample_artifacts)
+    try:
+        assert loaded_app.load_model_and_data(sample_artifacts, model_format='compiled')
+        assert isinstance(loaded_app.model_bundle.pipeline, CompiledModel)
+        served = client.post('/predict', json=movie).get_json()
+    finally:
+        loaded_app.load_model_and_data(sample_artifacts)
+
+    assert served['prediction'] == expected['prediction']
+    assert served['probability'] == expected['probability']
+
+
+def test_native_engine_is_bit_identical(loaded_app):
+    pipeline = loaded_app.model_bundle.pipeline
+    native = CompiledModel.from_pipeline(pipeline)
+    records = [loaded_app.prepare_features(movie) for movie in make_movies(2000, seed=7)]
+
+    expected = pipeline.predict_proba(pd.DataFrame(records))
+    assert np.array_equal(native.predict_proba_records(records), expected)
+    assert np.array_equal(native.predict_proba_records(records[:1]), expected[:1])
+
+
+def test_app_native_engine_matches_sklearn(loaded_app, sample_artifacts):
+    client = loaded_app.app.test_client()
+    movies = make_movies(20, seed=3)
+    expected = client.post('/predict/batch', json=movies).get_json()['results']
+
+    try:
+        assert loaded_app.load_model_and_data(sample_artifacts, inference_engine='native')
+        assert loaded_app.model_bundle.native_model is not None
+        single = [client.post('/predict', json=movie).get_json() for movie in movies]
+        batch = client.post('/predict/batch', json=movies).get_json()['results']
+    finally:
+        loaded_app.load_model_and_data(sample_artifacts)
+
+    for want, got_single, got_batch in zip(expected, single, batch):
+        assert got_single['probability'] == want['probability'] == got_batch['probability']
+        assert got_single['prediction'] == want['prediction'] == got_batch['prediction']
@@ -0,0 +1,49 @@
+import os
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+
+from compiled_model import CompiledModel
+from distill_model import distill, prune_forest
+from train_model import load_training_data
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'benchmarks'))
+from _common import make_movies  # noqa: E402
+
+
+def test_pruned_forest_keeps_auc_and_converts(sample_artifacts):
+    teacher = joblib.load(os.path.join(sample_artifacts, 'saved_model.pkl'))
+    X, y = load_training_data(n_samples=600)
+    pruned, kept = prune_forest(teacher, X, y, tolerance=0.001)
+
+    forest = pruned.named_steps['classifier']
+    assert 0 < len(kept) < len(teacher[-1].estimators_) == 100
+    assert len(forest.estimators_) == forest.n_estimators == len(kept)
+    assert roc_auc_score(y, pruned.predict_proba(X)[:, 1]) >= roc_auc_score(y, teacher.predict_proba(X)[:, 1]) - 0.001
+    assert np.array_equal(CompiledModel.from_pipeline(pruned).predict_proba(X), pruned.predict_proba(X))
+
+
+def test_app_serves_distilled_model(loaded_app, sample_artifacts):
+    report, student = distill(os.path.join(sample_artifacts, 'saved_model.pkl'), n_samples=600, max_auc_drop=0.05,
+                              repeats=20, forest_trees=(5,), forest_depths=(4,), hgb_iterations=(10,))
+    assert [row['model'] for row in report] == ['teacher', 'forest', 'hgb', 'pruned']
+    assert sum(row['picked'] for row in report) == 1
+    assert all(row['size_kb'] < report[0]['size_kb'] for row in report[1:])
+
+    client = loaded_app.app.test_client()
+    movie = make_movies(1)[0]
+    joblib.dump(student, os.path.join(sample_artifacts, 'distilled_model.pkl'))
+    try:
+        assert loaded_app.load_model_and_data(sample_artifacts, model_file='distilled_model.pkl')
+        assert client.get('/model-info').get_json()['model_file'] == 'distilled_model.pkl'
+        served = client.post('/predict', json=movie).get_json()
+    finally:
+        os.remove(os.path.join(sample_artifacts, 'distilled_model.pkl'))
+        loaded_app.load_model_and_data(sample_artifacts)
+
+    # /predict reports the probability of the predicted class
+    expected = student.predict_proba(pd.DataFrame([loaded_app.prepare_features(movie)]))[0].max()
+    assert served['probability'] == round(float(expected), 3)
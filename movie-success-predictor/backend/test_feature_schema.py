@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+import feature_schema
+from create_sample_model import CATEGORICAL_FEATURES, FEATURES, NUMERIC_FEATURES
+from feature_schema import FEATURE_SCHEMA, ModelInput
+from test_batch_predict import make_movies
+
+
+def test_schema_matches_training_columns():
+    assert FEATURE_SCHEMA.names == FEATURES
+    assert set(FEATURE_SCHEMA.numeric) == set(NUMERIC_FEATURES)
+    assert FEATURE_SCHEMA.categorical == CATEGORICAL_FEATURES
+
+
+def test_encoded_rows_score_like_the_pipeline(loaded_app, monkeypatch):
+    """Buffers are reused per thread, and batches larger than they keep get their own"""
+    bundle = loaded_app.model_bundle
+    model_input = bundle.model_input
+    pipeline = bundle.pipeline
+    rows = [loaded_app.prepare_features(movie) for movie in make_movies(40)]
+    rows[3]['genres'] = 'Unseen Genre'
+
+    for batch in (rows[:1], rows):
+        expected = pipeline.predict_proba(pd.DataFrame(batch))
+        assert np.array_equal(bundle.predict_proba_encoded(model_input.encode(batch)), expected)
+        columns = {name: [row[name] for row in batch] for name in FEATURE_SCHEMA.names}
+        assert np.array_equal(loaded_app.score_columns(columns, bundle), expected)
+
+    buffer = model_input.buffer()
+    model_input.encode(rows[:2])
+    assert model_input.buffer() is buffer and buffer.capacity >= 40
+    monkeypatch.setattr(feature_schema, 'MAX_BUFFER_ROWS', 8)
+    expected = pipeline.predict_proba(pd.DataFrame(rows))
+    assert np.array_equal(bundle.predict_proba_encoded(model_input.encode(rows)), expected)
+    assert model_input.buffer() is buffer
+
+
+def test_unsupported_pipelines_fall_back():
+    assert ModelInput.from_pipeline(object()) is None
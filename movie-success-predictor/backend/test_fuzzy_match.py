@@ -0,0 +1,56 @@
+from app import resolve_talent
+from fuzzy_match import FuzzyNameMatcher, levenshtein, similarity
+from name_index import NameIndex
+
+
+def test_levenshtein():
+    assert levenshtein('kitten', 'sitting') == 3
+    assert levenshtein('', 'abc') == 3
+    assert levenshtein('kitten', 'sitting', max_distance=1) == 2
+    assert similarity('abc', 'abc') == 1.0
+
+
+def test_matcher_finds_closest_name():
+    matcher = FuzzyNameMatcher(['christopher nolan', 'christopher reeve', 'chris columbus'])
+    name, score = matcher.best_match('cristopher nolan')
+    assert name == 'christopher nolan'
+    assert score > 0.9
+    assert matcher.best_match('zzzz qqqq') is None
+
+
+def test_resolve_talent_reports_fuzzy_match():
+    rates = NameIndex({'Christopher Nolan': 0.85, 'Steven Spielberg': 0.8}).build_fuzzy_index()
+    rate, match = resolve_talent('Cristopher Nolan', rates)
+    assert rate == 0.85
+    assert match['matched'] == 'Christopher Nolan'
+    assert match['method'] == 'fuzzy'
+
+    rate, match = resolve_talent('Totally Different Person', rates)
+    assert rate == 0.5
+    assert match['method'] == 'default'
+
+
+def test_predict_response_includes_talent_matches(loaded_app):
+    client = loaded_app.app.test_client()
+    movie = {
+        "movie_title": "Typo Test",
+        "director": "Cristopher Nolan",
+        "actor1": "leonardo dicaprio",
+        "actor2": "Tom Hanks",
+        "actor3": "Nobody Known",
+        "budget": 150000000,
+        "runtime": 138,
+        "genres": "Action",
+        "production_companies": "Warner Bros.",
+        "original_language": "en",
+        "release_year": 2024,
+        "release_month": 6,
+        "avg_rating": 8.2,
+        "ratings_count": 50000
+    }
+    matches = client.post('/predict', json=movie).get_json()['talent_matches']
+    assert matches['director']['matched'] == 'Christopher Nolan'
+    assert matches['director']['method'] == 'fuzzy'
+    assert matches['actor1']['method'] == 'normalized'
+    assert matches['actor2']['method'] == 'exact'
+    assert matches['actor3']['method'] == 'default'
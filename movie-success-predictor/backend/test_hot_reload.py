@@ -0,0 +1,121 @@
+import os
+import shutil
+import threading
+import time
+
+import joblib
+
+import app as backend_app
+from model_bundle import ArtifactWatcher
+
+MOVIE = dict(backend_app.SMOKE_TEST_MOVIE, movie_title='Inception')
+
+
+def copy_artifacts(sample_artifacts, tmp_path, director_rate=None):
+    artifacts_dir = str(tmp_path / 'artifacts')
+    shutil.copytree(sample_artifacts, artifacts_dir, ignore=shutil.ignore_patterns('compiled_model'))
+    if director_rate is not None:
+        set_director_rate(artifacts_dir, director_rate)
+    return artifacts_dir
+
+
+def set_director_rate(artifacts_dir, rate):
+    path = os.path.join(artifacts_dir, 'director_success.joblib')
+    rates = joblib.load(path)
+    rates['Christopher Nolan'] = rate
+    joblib.dump(rates, path)
+
+
+def test_admin_reload_swaps_bundle(loaded_app, sample_artifacts, tmp_path):
+    client = loaded_app.app.test_client()
+    before = client.get('/health').get_json()
+    assert before['model_version'] and before['load_duration_ms'] >= 0
+
+    artifacts_dir = copy_artifacts(sample_artifacts, tmp_path)
+    try:
+        assert loaded_app.load_model_and_data(artifacts_dir)
+        set_director_rate(artifacts_dir, 0.01)
+        response = client.post('/admin/reload?wait=true')
+        assert response.status_code == 200
+        after = client.get('/health').get_json()
+        assert after['model_version'] != before['model_version']
+        assert after['reload']['state'] == 'succeeded'
+        assert loaded_app.model_bundle.director_success_rates['Christopher Nolan'] == 0.01
+    finally:
+        loaded_app.load_model_and_data(sample_artifacts)
+
+
+def test_failed_reload_keeps_serving_previous_bundle(loaded_app, sample_artifacts, tmp_path):
+    client = loaded_app.app.test_client()
+    artifacts_dir = copy_artifacts(sample_artifacts, tmp_path)
+    try:
+        assert loaded_app.load_model_and_data(artifacts_dir)
+        served = loaded_app.model_bundle
+        with open(os.path.join(artifacts_dir, 'saved_model.pkl'), 'wb') as f:
+            f.write(b'not a pickle')
+
+        response = client.post('/admin/reload?wait=true')
+        assert response.status_code == 500
+        assert loaded_app.model_bundle is served
+        assert client.get('/health').get_json()['reload']['state'] == 'failed'
+        assert client.post('/predict', json=MOVIE).status_code == 200
+    finally:
+        loaded_app.load_model_and_data(sample_artifacts)
+
+
+def test_requests_never_mix_bundles_during_reloads(loaded_app, sample_artifacts, tmp_path):
+    low_dir = copy_artifacts(sample_artifacts, tmp_path / 'low', director_rate=0.0)
+    high_dir = copy_artifacts(sample_artifacts, tmp_path / 'high', director_rate=1.0)
+    expected = {}
+    for artifacts_dir in (low_dir, high_dir):
+        assert loaded_app.load_model_and_data(artifacts_dir)
+        expected[artifacts_dir] = loaded_app.predict_batch([MOVIE])[0]['probability']
+
+    results = []
+    stop = threading.Event()
+
+    def score():
+        while not stop.is_set():
+            result = loaded_app.predict_batch([MOVIE])[0]
+            results.append((result['probability'], result['talent_matches']['director']['matched']))
+
+    workers = [threading.Thread(target=score) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    try:
+        for artifacts_dir in [low_dir, high_dir] * 5:
+            assert loaded_app.load_model_and_data(artifacts_dir)
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+        loaded_app.load_model_and_data(sample_artifacts)
+
+    assert results
+    assert {probability for probability, _ in results} <= set(expected.values())
+
+
+def test_watcher_reloads_changed_artifacts(loaded_app, sample_artifacts, tmp_path):
+    artifacts_dir = copy_artifacts(sample_artifacts, tmp_path)
+    assert loaded_app.load_model_and_data(artifacts_dir)
+    version = loaded_app.model_bundle.version
+    watcher = ArtifactWatcher(lambda: loaded_app.model_bundle, loaded_app.reload_from, interval=0.02)
+    watcher.start()
+    try:
+        set_director_rate(artifacts_dir, 0.02)
+        deadline = time.monotonic() + 5
+        while loaded_app.model_bundle.version == version and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert loaded_app.model_bundle.director_success_rates['Christopher Nolan'] == 0.02
+    finally:
+        watcher.stop()
+        watcher.join()
+        loaded_app.load_model_and_data(sample_artifacts)
+
+
+def test_admin_reload_requires_token(loaded_app, monkeypatch):
+    monkeypatch.setattr(backend_app, 'ADMIN_TOKEN', 'secret')
+    client = loaded_app.app.test_client()
+    assert client.post('/admin/reload?wait=true').status_code == 403
+    response = client.post('/admin/reload?wait=true', headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 200
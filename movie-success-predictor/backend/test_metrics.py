@@ -0,0 +1,77 @@
+import os
+import re
+import sys
+
+from metrics import MetricsRegistry, StageHistograms, StageTimer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'benchmarks'))
+from _common import make_movies  # noqa: E402
+
+
+def sample_value(text, line_prefix):
+    match = re.search(rf'^{re.escape(line_prefix)} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    lookups = registry.counter('lookups_total', 'Lookups', ('role', 'method'))
+    latency = registry.histogram('latency_seconds', 'Latency', [0.1, 1], ('stage',))
+    registry.callback('entries', 'Entries', 'gauge', lambda: 3)
+    lookups.labels('director', 'exact').inc()
+    lookups.labels('director', 'exact').inc(2)
+    lookups.labels('actor1', 'say "hi"').inc()
+    for value in (0.05, 0.5, 5):
+        latency.labels('parse').observe(value)
+
+    text = registry.render()
+    assert '# TYPE lookups_total counter' in text
+    assert 'lookups_total{role="director",method="exact"} 3' in text
+    assert 'lookups_total{role="actor1",method="say \\"hi\\""} 1' in text
+    assert '# TYPE latency_seconds histogram' in text
+    assert 'latency_seconds_bucket{stage="parse",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{stage="parse",le="1"} 2' in text
+    assert 'latency_seconds_bucket{stage="parse",le="+Inf"} 3' in text
+    assert 'latency_seconds_sum{stage="parse"} 5.55' in text
+    assert 'latency_seconds_count{stage="parse"} 3' in text
+    assert 'entries 3' in text.splitlines()
+
+
+def test_stage_timer_observes_each_stage_once():
+    registry = MetricsRegistry()
+    family = registry.histogram('stage_seconds', 'Stages', labelnames=('endpoint', 'stage'))
+    timer = StageTimer(StageHistograms(family, 'predict'))
+    timer.mark('parse')
+    timer.mark('features')
+    assert family.labels('predict', 'parse').count == 1
+    assert family.labels('predict', 'features').count == 1
+
+
+def test_metrics_endpoint_after_predictions(loaded_app):
+    client = loaded_app.app.test_client()
+    before = client.get('/metrics').get_data(as_text=True)
+    movie = make_movies(1, seed=123)[0]
+    movie['director'] = 'Nobody Anyone Has Heard Of'
+    assert client.post('/predict', json=movie).status_code == 200
+    assert client.post('/predict/batch', json=make_movies(3, seed=124)).status_code == 200
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    text = response.get_data(as_text=True)
+
+    def delta(line_prefix):
+        return sample_value(text, line_prefix) - sample_value(before, line_prefix)
+
+    stage = 'movie_predictor_stage_seconds_count{endpoint="%s",stage="%s"}'
+    for name in ('parse', 'features', 'cache', 'score', 'serialize'):
+        assert delta(stage % ('predict', name)) == 1, name
+    for name in ('parse', 'features', 'score', 'serialize'):
+        assert delta(stage % ('predict_batch', name)) == 1, name
+    assert delta('movie_predictor_requests_total{endpoint="predict",status="200"}') == 1
+    assert delta('movie_predictor_request_size_bytes_count{endpoint="predict"}') == 1
+    assert delta('movie_predictor_batch_rows_count') == 1
+    assert delta('movie_predictor_talent_lookups_total{role="director",method="default"}') >= 1
+    assert delta('movie_predictor_prediction_cache_misses_total') >= 4
+    assert sample_value(text, 'movie_predictor_model_load_seconds_count{outcome="succeeded"}') >= 1
+    assert f'version="{loaded_app.model_bundle.version}"' in text
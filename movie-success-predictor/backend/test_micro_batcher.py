@@ -0,0 +1,95 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from micro_batcher import MicroBatcher, Overloaded
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'benchmarks'))
+from _common import make_movies  # noqa: E402
+
+
+def test_concurrent_submits_are_coalesced():
+    batches = []
+
+    def score(items):
+        batches.append(len(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(score, window_ms=50, max_batch=16)
+    try:
+        with ThreadPoolExecutor(max_workers=40) as pool:
+            results = list(pool.map(lambda i: batcher.submit(i).result(timeout=5), range(40)))
+    finally:
+        batcher.close()
+
+    assert results == [i * 2 for i in range(40)]
+    assert sum(batches) == 40
+    assert max(batches) <= 16
+    assert len(batches) < 40
+    assert batcher.stats()['batch_size']['count'] == len(batches)
+
+
+def test_full_queue_raises_overloaded():
+    release = threading.Event()
+
+    def score(items):
+        release.wait(5)
+        return items
+
+    batcher = MicroBatcher(score, window_ms=0, max_batch=1, max_queue=2)
+    try:
+        first = batcher.submit('running')
+        # Wait until the first item has left the queue for the executor
+        while batcher.stats()['queued']:
+            time.sleep(0.001)
+        queued = [batcher.submit('a'), batcher.submit('b')]
+        with pytest.raises(Overloaded):
+            batcher.submit('c')
+        release.set()
+        assert first.result(timeout=5) == 'running'
+        assert [future.result(timeout=5) for future in queued] == ['a', 'b']
+        assert batcher.stats()['rejected'] == 1
+    finally:
+        release.set()
+        batcher.close()
+
+
+def test_predict_awaitable_and_errors_propagate():
+    def score(items):
+        if 'bad' in items:
+            raise ValueError('boom')
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(score, window_ms=1)
+    try:
+        assert asyncio.run(batcher.predict('ok')) == 'OK'
+        with pytest.raises(ValueError):
+            batcher.submit('bad').result(timeout=5)
+    finally:
+        batcher.close()
+
+
+def test_app_micro_batching_matches_inline(loaded_app, monkeypatch):
+    client = loaded_app.app.test_client()
+    movies = make_movies(32, seed=11)
+    expected = [client.post('/predict', json=movie).get_json() for movie in movies]
+
+    monkeypatch.setattr(loaded_app, 'MICRO_BATCH_WINDOW_MS', 5.0)
+    monkeypatch.setattr(loaded_app, 'micro_batcher', None)
+    loaded_app.prediction_cache.invalidate(loaded_app.model_bundle.version)
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            served = list(pool.map(lambda movie: client.post('/predict', json=movie).get_json(), movies))
+        stats = loaded_app.micro_batcher.stats()
+    finally:
+        loaded_app.micro_batcher.close()
+
+    for want, got in zip(expected, served):
+        assert got['prediction'] == want['prediction']
+        assert got['probability'] == want['probability']
+    assert stats['batch_size']['count'] < len(movies)
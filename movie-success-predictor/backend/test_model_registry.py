@@ -0,0 +1,140 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from model_registry import ModelRegistry, UnknownModel
+from shadow_scorer import ShadowScorer
+from test_hot_reload import MOVIE, set_director_rate
+from test_metrics import sample_value
+
+
+@pytest.fixture
+def registry_dir(sample_artifacts, tmp_path):
+    """Registry with the sample model as 'current' and a copy whose director rate differs as 'candidate'"""
+    root = tmp_path / 'registry'
+    for name in ('current', 'candidate'):
+        shutil.copytree(sample_artifacts, root / name, ignore=shutil.ignore_patterns('compiled_model'))
+    set_director_rate(str(root / 'candidate'), 0.01)
+    return str(root)
+
+
+def test_registry_loads_lazily_and_evicts_least_recently_used(loaded_app, registry_dir):
+    shutil.copytree(os.path.join(registry_dir, 'current'), os.path.join(registry_dir, 'third'))
+    with open(os.path.join(registry_dir, 'third', 'bundle.json'), 'w') as f:
+        json.dump({'inference_engine': 'native'}, f)
+    loads = []
+
+    def load(artifacts_dir, **options):
+        loads.append((os.path.basename(artifacts_dir), options))
+        return loaded_app.load_registry_model(artifacts_dir, **options)
+
+    registry = ModelRegistry(registry_dir, load, max_loaded=2, pinned=['candidate'])
+    assert registry.names() == ['candidate', 'current', 'third'] and loads == []
+    assert registry.get('current') is registry.get('current')
+    registry.get('candidate')
+    assert registry.get('third').inference_engine == 'native'
+    assert loads == [('current', {}), ('candidate', {}), ('third', {'inference_engine': 'native'})]
+    # 'current' was least recently used; the pinned candidate is kept
+    assert list(registry.loaded()) == ['candidate', 'third']
+    assert registry.stats()['evictions'] == 1 and registry.stats()['hits'] == 1
+
+    # Changed files are loaded again as a new version
+    before = registry.get('candidate')
+    set_director_rate(os.path.join(registry_dir, 'candidate'), 0.02)
+    after = registry.get('candidate')
+    assert after.version != before.version and after.director_success_rates['Christopher Nolan'] == 0.02
+
+    for name in ('missing', '../current', '.hidden', ''):
+        with pytest.raises(UnknownModel):
+            registry.get(name)
+
+
+def test_predict_selects_registry_model(loaded_app, registry_dir, monkeypatch):
+    monkeypatch.setattr(loaded_app, 'MODEL_REGISTRY', registry_dir)
+    monkeypatch.setattr(loaded_app, 'model_registry', None)
+    client = loaded_app.app.test_client()
+
+    served = client.post('/predict', json=MOVIE).get_json()
+    assert 'model' not in served
+    candidate = client.post('/predict?model=candidate', json=MOVIE).get_json()
+    assert candidate['model'] == {'name': 'candidate', 'version': loaded_app.model_registry.loaded()['candidate'].version}
+    assert candidate['features_used'] != served['features_used']
+    # The served model's cache never answers for another model
+    assert loaded_app.prediction_cache.get('any key', namespace=candidate['model']['version']) is None
+
+    batch = client.post('/predict/batch?model=candidate', json=[MOVIE]).get_json()
+    assert batch['results'][0]['probability'] == candidate['probability']
+    sweep = client.post('/predict/sweep?model=candidate', json={'movie': MOVIE, 'axes': {'release_month': [1, 2]}})
+    assert sweep.status_code == 200
+
+    response = client.post('/predict?model=nope', json=MOVIE)
+    assert response.status_code == 400 and 'nope' in response.get_json()['error']
+    models = client.get('/models').get_json()
+    assert [(model['name'], model['loaded']) for model in models['models']] == [('candidate', True), ('current', False)]
+
+    monkeypatch.setattr(loaded_app, 'MODEL_REGISTRY', None)
+    monkeypatch.setattr(loaded_app, 'model_registry', None)
+    assert client.post('/predict?model=candidate', json=MOVIE).status_code == 400
+
+
+def test_shadow_scoring_records_agreement_off_the_request_path(loaded_app, registry_dir, monkeypatch):
+    monkeypatch.setattr(loaded_app, 'MODEL_REGISTRY', registry_dir)
+    monkeypatch.setattr(loaded_app, 'model_registry', None)
+    monkeypatch.setattr(loaded_app, 'SHADOW_MODEL', 'current')
+    monkeypatch.setattr(loaded_app, 'SHADOW_SAMPLE_RATE', 1.0)
+    monkeypatch.setattr(loaded_app, 'shadow_scorer', None)
+    client = loaded_app.app.test_client()
+
+    def director_lookups():
+        text = client.get('/metrics').get_data(as_text=True)
+        return sum(sample_value(text, f'movie_predictor_talent_lookups_total{{role="director",method="{method}"}}')
+                   for method in ('exact', 'normalized', 'fuzzy', 'default'))
+
+    lookups = director_lookups()
+    try:
+        assert client.post('/predict', json=MOVIE).status_code == 200
+        assert client.post('/predict/batch', json=[MOVIE, dict(MOVIE, budget=1000)]).status_code == 200
+        # Requests for another model are not shadowed
+        assert client.post('/predict?model=candidate', json=MOVIE).status_code == 200
+        loaded_app.shadow_scorer.close()
+        stats = client.get('/models').get_json()['shadow']
+        # 'current' holds the served artifacts, so it agrees on every row
+        assert stats['model'] == 'current' and stats['requests'] == 2 and stats['rows'] == 3
+        assert stats['agreement'] == 1.0 and stats['probability_delta']['sum'] == 0
+        assert stats['candidate_version'] == loaded_app.model_bundle.version
+        text = client.get('/metrics').get_data(as_text=True)
+        assert 'movie_predictor_shadow_rows_total{result="agreed"} 3' in text
+        # Shadow rows are not counted as talent lookups again, and scrapes are not requests in flight
+        assert director_lookups() - lookups == 4
+        assert sample_value(text, 'movie_predictor_requests_in_flight') == 0
+    finally:
+        if loaded_app.shadow_scorer is not None:
+            loaded_app.shadow_scorer.close()
+
+
+def test_shadow_scorer_drops_and_counts_failures():
+    def score(movies, bundle, threshold):
+        if bundle is None:
+            raise RuntimeError('candidate unavailable')
+        return np.array([0] * len(movies)), np.array([[0.75, 0.25]] * len(movies))
+
+    candidate = type('Bundle', (), {'version': 'v2'})()
+    scorer = ShadowScorer(lambda: candidate, score, sample_rate=0.5, max_queue=1, rng=iter([0.2, 0.7]).__next__)
+    assert scorer.sample() and not scorer.sample()
+    assert scorer.submit([MOVIE, MOVIE], [0, 1], [[0.7, 0.3], [0.4, 0.6]]).result() == 1
+    scorer.max_queue = 0
+    assert scorer.submit([MOVIE], [0], [[0.7, 0.3]]) is None
+    scorer.max_queue = 1
+    scorer.get_candidate = lambda: None
+    assert scorer.submit([MOVIE], [0], [[0.7, 0.3]]).result() is None
+    # Jobs wait for an idle worker and expire when it stays busy
+    scorer.busy, scorer.max_wait = lambda: True, 0.01
+    assert scorer.submit([MOVIE], [0], [[0.7, 0.3]]).result() is None
+    scorer.close()
+    stats = scorer.stats()
+    assert (stats['rows'], stats['agreed'], stats['dropped'], stats['expired'], stats['errors'], stats['queued']) == \
+        (2, 1, 1, 1, 1, 0)
+    assert stats['probability_delta']['count'] == 2 and stats['candidate_version'] == 'v2'
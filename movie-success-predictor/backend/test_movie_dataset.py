@@ -0,0 +1,86 @@
+import gzip
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from build_dataset import build_dataset
+from movie_dataset import dataset_path, load_dataset, preferred_source, read_table, write_dataset
+from movie_store import MovieStore
+
+PUBLIC_CSV = os.path.join(os.path.dirname(__file__), '..', 'public', 'final_tmdb_cleaned.csv')
+
+
+def test_round_trip_and_projection(tmp_path):
+    frame = pd.DataFrame({
+        'title': ['Alien', 'Heat', None, 'Alien'],
+        'director': ['Ridley Scott', 'Michael Mann', 'Ridley Scott', None],
+        'actor_1': ['Sigourney Weaver', 'Al Pacino', 'Ridley Scott', 'Zoë Kravitz'],
+        'budget': [11000000, 60000000, 0, 2 ** 40],
+        'avg_rating': [8.5, 8.3, 6.0, 7.25],
+        'rate': [1 / 3, 2 / 3, 1 / 3, np.nan],
+        'Action': [0, 1, 1, 0],
+        'success': [1, 1, 0, 0]
+    })
+    path = str(tmp_path / 'movies.npz')
+    manifest = write_dataset(frame, path)
+
+    kinds = {column['name']: column['kind'] for column in manifest['columns']}
+    assert kinds == {'title': 'string', 'director': 'string', 'actor_1': 'string', 'budget': 'int',
+                     'avg_rating': 'decimal', 'rate': 'float_dictionary', 'Action': 'flag', 'success': 'flag'}
+    assert manifest['dictionaries']['people']['size'] == 5
+    pd.testing.assert_frame_equal(load_dataset(path), frame)
+    pd.testing.assert_frame_equal(load_dataset(path, ['success', 'director']), frame[['success', 'director']])
+    pd.testing.assert_frame_equal(read_table(path, ['budget']), frame[['budget']])
+    with pytest.raises(ValueError, match='no columns'):
+        load_dataset(path, ['revenue'])
+
+
+def test_public_csv_converts_exactly(tmp_path):
+    csv_path = str(tmp_path / 'movies.csv')
+    pd.read_csv(PUBLIC_CSV).to_csv(csv_path, index=False)
+    assert preferred_source(csv_path) == csv_path
+
+    build_dataset(csv_path)
+    path = dataset_path(csv_path)
+    assert os.path.getsize(path) < os.path.getsize(csv_path) / 2
+    assert preferred_source(csv_path) == path
+    pd.testing.assert_frame_equal(load_dataset(path), pd.read_csv(csv_path))
+    with open(path + '.gz', 'rb') as f:
+        assert gzip.decompress(f.read()) == open(path, 'rb').read()
+
+    from_csv, from_dataset = MovieStore.from_csv(csv_path), MovieStore.from_csv(path)
+    query = {'q': 'nolan', 'genres': ['Action'], 'sort': '-avg_rating', 'fields': ['title', 'director', 'genres']}
+    assert from_dataset.search(**query) == from_csv.search(**query)
+
+
+def test_data_files_are_served_precompressed(tmp_path, monkeypatch):
+    import app as backend_app
+
+    csv_path = str(tmp_path / 'final_tmdb_cleaned.csv')
+    pd.read_csv(PUBLIC_CSV).head(200).to_csv(csv_path, index=False)
+    monkeypatch.setattr(backend_app, 'MOVIES_CSV', csv_path)
+    client = backend_app.app.test_client()
+    assert client.get('/final_tmdb_cleaned.npz').status_code == 404
+
+    build_dataset(csv_path)
+    raw = open(csv_path, 'rb').read()
+    plain = client.get('/final_tmdb_cleaned.csv')
+    assert plain.data == raw and 'Content-Encoding' not in plain.headers
+    assert plain.mimetype == 'text/csv' and 'Accept-Encoding' in plain.headers['Vary']
+
+    gzipped = client.get('/final_tmdb_cleaned.csv', headers={'Accept-Encoding': 'br;q=0, gzip'})
+    assert gzipped.headers['Content-Encoding'] == 'gzip' and gzipped.mimetype == 'text/csv'
+    assert gzip.decompress(gzipped.data) == raw and len(gzipped.data) < len(raw) / 2
+    assert gzipped.headers['ETag'] != plain.headers['ETag']
+
+    again = client.get('/final_tmdb_cleaned.csv', headers={'Accept-Encoding': 'gzip',
+                                                          'If-None-Match': gzipped.headers['ETag']})
+    assert again.status_code == 304
+    partial = client.get('/final_tmdb_cleaned.csv', headers={'Range': 'bytes=0-99'})
+    assert partial.status_code == 206 and partial.data == raw[:100]
+
+    dataset = client.get('/final_tmdb_cleaned.npz', headers={'Accept-Encoding': 'gzip'})
+    assert dataset.status_code == 200 and dataset.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(dataset.data) == open(dataset_path(csv_path), 'rb').read()
@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+
+from movie_store import GENRE_COLUMNS, MovieStore
+
+MOVIES = [
+    ('The Dark Knight', 'Christopher Nolan', 'Christian Bale', 'Heath Ledger', 'Michael Caine', 2008, 185e6, 8.2, ['Action', 'Crime']),
+    ('Inception', 'Christopher Nolan', 'Leonardo DiCaprio', 'Joseph Gordon-Levitt', 'Ellen Page', 2010, 160e6, 8.1, ['Action', 'Science Fiction']),
+    ('Amélie', 'Jean-Pierre Jeunet', 'Audrey Tautou', 'Mathieu Kassovitz', 'Rufus', 2001, 10e6, 7.8, ['Comedy', 'Romance']),
+    ('Titanic', 'James Cameron', 'Leonardo DiCaprio', 'Kate Winslet', 'Billy Zane', 1997, 200e6, 7.5, ['Drama', 'Romance']),
+    ('Dunkirk', 'Christopher Nolan', 'Fionn Whitehead', 'Tom Glynn-Carney', 'Tom Hardy', 2017, 100e6, 7.5, ['Action', 'Drama', 'War']),
+]
+
+
+@pytest.fixture
+def store():
+    rows = []
+    for title, director, actor1, actor2, actor3, year, budget, rating, genres in MOVIES:
+        row = {'budget': budget, 'popularity': rating * 10, 'revenue': budget * 3, 'runtime': 120.0,
+               'title': title, 'avg_rating': rating, 'ratings': 1000, 'release_year': year,
+               'director': director, 'actor_1': actor1, 'actor_2': actor2, 'actor_3': actor3, 'success': 1}
+        row.update({genre: int(genre in genres) for genre in GENRE_COLUMNS})
+        rows.append(row)
+    return MovieStore(pd.DataFrame(rows), 'test')
+
+
+def titles(result):
+    return [movie['title'] for movie in result['results']]
+
+
+def test_prefix_token_search(store):
+    assert titles(store.search(q='nol')) == ['The Dark Knight', 'Inception', 'Dunkirk']
+    assert titles(store.search(q='dark kni')) == ['The Dark Knight']
+    assert titles(store.search(q='amelie')) == ['Amélie']
+    assert titles(store.search(q='romance')) == ['Amélie', 'Titanic']
+    assert titles(store.search(actor='leonardo', director='cameron')) == ['Titanic']
+    assert titles(store.search(actor='hardy')) == ['Dunkirk']
+    assert store.search(q='zzz')['total'] == 0
+
+
+def test_filters_sort_and_pagination(store):
+    result = store.search(genres=['Action'], year_min=2009, sort='-avg_rating', page_size=1, page=2)
+    assert titles(result) == ['Dunkirk']
+    assert (result['total'], result['pages']) == (2, 2)
+    assert titles(store.search(budget_max=150e6, sort='title')) == ['Amélie', 'Dunkirk']
+    assert titles(store.search(sort='release_year')) == ['Titanic', 'Amélie', 'The Dark Knight', 'Inception', 'Dunkirk']
+
+
+def test_search_endpoint_projection_and_etag(store, monkeypatch):
+    import app as backend_app
+
+    monkeypatch.setattr(backend_app, 'movie_store', store)
+    client = backend_app.app.test_client()
+
+    response = client.get('/movies/search?q=nolan&genre=war&fields=title,genres,budget')
+    assert response.status_code == 200
+    assert response.get_json()['results'] == [{'title': 'Dunkirk', 'genres': ['Action', 'Drama', 'War'],
+                                               'budget': 100e6}]
+
+    etag = response.headers['ETag']
+    cached = client.get('/movies/search?q=nolan&genre=war&fields=title,genres,budget',
+                        headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert client.get('/movies/search?q=nolan', headers={'If-None-Match': etag}).status_code == 200
+
+    assert client.get('/movies/search?fields=title,secret').status_code == 400
+    assert client.get('/movies/search?genre=Opera').status_code == 400
+    assert client.get('/movies/search?page_size=1000').status_code == 400
+    for value in ('inf', '-inf', 'nan'):
+        response = client.get(f'/movies/search?budget_min={value}')
+        assert response.status_code == 400 and 'budget_min' in response.get_json()['error']
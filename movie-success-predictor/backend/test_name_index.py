@@ -0,0 +1,27 @@
+from app import get_success_rate
+from name_index import NameIndex, normalize_name
+
+
+def test_normalize_name_folds_case_accents_and_spaces():
+    assert normalize_name('  Alejandro   González  Iñárritu ') == 'alejandro gonzalez inarritu'
+    assert normalize_name('STRAßE') == normalize_name('strasse')
+
+
+def test_exact_and_normalized_lookups():
+    rates = NameIndex({'Christopher Nolan': 0.85, 'Pedro Almodóvar': 0.6})
+    assert get_success_rate('Christopher Nolan', rates) == 0.85
+    assert get_success_rate('christopher  NOLAN ', rates) == 0.85
+    assert get_success_rate('Pedro Almodovar', rates) == 0.6
+    assert get_success_rate('Someone Else', rates) == 0.5
+    assert get_success_rate('', rates) == 0.5
+
+
+def test_first_key_wins_on_normalized_collisions():
+    rates = NameIndex({'John Smith': 0.2, 'JOHN SMITH': 0.9})
+    assert get_success_rate('john smith', rates) == 0.2
+    rates['Jane Doe'] = 0.7
+    assert get_success_rate('jane doe', rates) == 0.7
+
+
+def test_plain_dicts_still_supported():
+    assert get_success_rate('tom hanks', {'Tom Hanks': 0.85}) == 0.85
@@ -0,0 +1,123 @@
+import itertools
+import json
+import os
+import re
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'benchmarks'))
+from _common import make_movies  # noqa: E402
+
+AXES = {
+    'budget': {'start': 1e6, 'stop': 2.5e8, 'num': 4},
+    'release_month': [1, 6, 12],
+    'actor1': ['Tom Hanks', 'emma stone', 'Nobody Known At All']
+}
+
+
+def expected_probabilities(client, movie, body):
+    """Success probabilities of the sweep grid scored one movie at a time through /predict/batch"""
+    fields = [axis['field'] for axis in body['axes']]
+    values = [axis['values'] for axis in body['axes']]
+    movies = [{**movie, **dict(zip(fields, point))} for point in itertools.product(*values)]
+    results = client.post('/predict/batch', json=movies).get_json()['results']
+    return np.array([r['probability'] if r['prediction'] == 'HIT' else 1 - r['probability'] for r in results])
+
+
+def test_sweep_matches_batch_predictions(loaded_app):
+    client = loaded_app.app.test_client()
+    movie = make_movies(1, seed=3)[0]
+
+    response = client.post('/predict/sweep', json={'movie': movie, 'axes': AXES})
+    assert response.status_code == 200
+    body = response.get_json()
+    fields = [axis['field'] for axis in body['axes']]
+    assert sorted(fields) == sorted(AXES)
+    assert body['shape'] == [len(axis['values']) for axis in body['axes']] and body['count'] == 36
+    actor_axis = body['axes'][fields.index('actor1')]
+    assert [match['method'] for match in actor_axis['talent_matches']] == ['exact', 'normalized', 'default']
+    assert 'actor1' not in body['talent_matches'] and 'director' in body['talent_matches']
+
+    probabilities = np.array(body['probabilities'])
+    assert probabilities.shape == tuple(body['shape'])
+    want = expected_probabilities(client, movie, body)
+    assert np.abs(probabilities.ravel() - want).max() <= 0.0015
+    assert body['best']['probability'] == probabilities.max()
+    best_index = tuple(body['axes'][i]['values'].index(body['best']['values'][field]) for i, field in enumerate(fields))
+    assert probabilities[best_index] == probabilities.max()
+
+
+def test_sweep_streams_large_grids(loaded_app, monkeypatch):
+    client = loaded_app.app.test_client()
+    movie = make_movies(1, seed=3)[0]
+    whole = client.post('/predict/sweep', json={'movie': movie, 'axes': AXES}).get_json()
+
+    monkeypatch.setattr(loaded_app, 'SWEEP_CHUNK_ROWS', 10)
+    response = client.post('/predict/sweep?threshold=0.2', json={'movie': movie, 'axes': AXES})
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    header, chunks, summary = lines[0], lines[1:-1], lines[-1]
+    assert header['shape'] == whole['shape'] and header['threshold'] == 0.2
+    assert [chunk['offset'] for chunk in chunks] == [0, 10, 20, 30]
+    streamed = np.concatenate([chunk['probabilities'] for chunk in chunks])
+    assert streamed.tolist() == np.array(whole['probabilities']).ravel().tolist()
+    assert summary['best'] == whole['best']
+    assert summary['hit_count'] == int((streamed >= 0.2).sum())
+
+
+def test_sweep_validation(loaded_app, monkeypatch):
+    client = loaded_app.app.test_client()
+    movie = make_movies(1)[0]
+
+    def status(body):
+        return client.post('/predict/sweep', json=body).status_code
+
+    assert status({'axes': AXES}) == 400
+    assert status({'movie': movie, 'axes': {}}) == 400
+    assert status({'movie': movie, 'axes': {'movie_title': ['A', 'B']}}) == 400
+    assert status({'movie': movie, 'axes': {'budget': []}}) == 400
+    assert status({'movie': movie, 'axes': {'budget': {'start': 1, 'stop': 2}}}) == 400
+    assert status({'movie': movie, 'axes': {'runtime': ['long']}}) == 400
+    # Swept fields may be left out of the base movie
+    partial = {key: value for key, value in movie.items() if key != 'budget'}
+    assert status({'movie': partial, 'axes': {'budget': [1e6, 1e8]}}) == 200
+
+    assert status({'movie': movie, 'axes': {'budget': {'start': 1, 'stop': 2, 'num': True}}}) == 400
+
+    # An oversized num is refused before any values are built
+    huge = {'budget': {'start': 1e6, 'stop': 2e8, 'num': 1000000000}}
+    assert status({'movie': movie, 'axes': huge}) == 413
+    monkeypatch.setattr(loaded_app, 'MAX_SWEEP_SIZE', 35)
+    assert status({'movie': movie, 'axes': AXES}) == 413
+
+
+def test_sweep_rejects_non_string_names(loaded_app):
+    client = loaded_app.app.test_client()
+    movie = make_movies(1)[0]
+
+    response = client.post('/predict/sweep', json={'movie': dict(movie, director=7),
+                                                   'axes': {'release_month': [1, 2]}})
+    assert response.status_code == 400 and 'director' in response.get_json()['error']
+    response = client.post('/predict/sweep', json={'movie': movie, 'axes': {'actor1': ['Tom Hanks', 5]}})
+    assert response.status_code == 400 and 'actor1' in response.get_json()['error']
+    # A swept name field only needs string values on its axis
+    response = client.post('/predict/sweep', json={'movie': dict(movie, actor1=None),
+                                                   'axes': {'actor1': ['Tom Hanks', 'Emma Stone']}})
+    assert response.status_code == 200
+
+
+def test_sweep_counts_talent_lookups_once(loaded_app):
+    client = loaded_app.app.test_client()
+    movie = make_movies(1)[0]
+
+    def lookups():
+        text = client.get('/metrics').get_data(as_text=True)
+        return sum(float(value) for value in
+                   re.findall(r'^movie_predictor_talent_lookups_total\{[^}]*\} (\S+)$', text, re.MULTILINE))
+
+    before = lookups()
+    axes = {'actor1': ['Tom Hanks', 'Emma Stone', 'Brad Pitt'], 'budget': [1e6, 1e7, 1e8]}
+    assert client.post('/predict/sweep', json={'movie': movie, 'axes': axes}).status_code == 200
+    # The base movie's four names, not one lookup per value probed
+    assert lookups() - before == 4
@@ -0,0 +1,71 @@
+import time
+
+from prediction_cache import PredictionCache, SQLiteCacheStore, feature_key
+
+MOVIE = {
+    "movie_title": "Cache Test",
+    "director": "Christopher Nolan",
+    "actor1": "Leonardo DiCaprio",
+    "actor2": "Tom Hanks",
+    "actor3": "Morgan Freeman",
+    "budget": 150000000,
+    "runtime": 138,
+    "genres": "Action",
+    "production_companies": "Warner Bros.",
+    "original_language": "en",
+    "release_year": 2024,
+    "release_month": 6,
+    "avg_rating": 8.2,
+    "ratings_count": 50000
+}
+
+
+def test_feature_key_ignores_key_order():
+    assert feature_key({'a': 1, 'b': 'x'}) == feature_key({'b': 'x', 'a': 1})
+    assert feature_key({'a': 1.0}) != feature_key({'a': 1.5})
+
+
+def test_lru_eviction_and_ttl():
+    cache = PredictionCache(max_entries=2, ttl_seconds=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.stats()['evictions'] == 1
+
+    short = PredictionCache(max_entries=10, ttl_seconds=0.01)
+    short.set('a', 1)
+    time.sleep(0.02)
+    assert short.get('a') is None
+    assert short.stats()['expirations'] == 1
+
+
+def test_shared_store_between_workers(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    first = PredictionCache(shared_store=SQLiteCacheStore(path))
+    second = PredictionCache(shared_store=SQLiteCacheStore(path))
+    first.invalidate('model-v1')
+    second.invalidate('model-v1')
+    first.set('key', {'probability': [0.25, 0.75]})
+    assert second.get('key') == {'probability': [0.25, 0.75]}
+    assert second.stats()['shared_hits'] == 1
+
+    second.invalidate('model-v2')
+    assert second.get('key') is None
+
+
+def test_predict_uses_cache_and_reload_invalidates(loaded_app, sample_artifacts):
+    client = loaded_app.app.test_client()
+    cache = loaded_app.prediction_cache
+
+    first = client.post('/predict', json=MOVIE).get_json()
+    hits = cache.hits
+    second = client.post('/predict', json=MOVIE).get_json()
+    assert cache.hits == hits + 1
+    assert second['probability'] == first['probability']
+    assert client.get('/model-info').get_json()['prediction_cache']['hits'] == cache.hits
+
+    loaded_app.load_model_and_data(sample_artifacts)
+    assert cache.stats()['entries'] == 0
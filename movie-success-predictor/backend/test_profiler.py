@@ -0,0 +1,112 @@
+import os
+import sys
+import threading
+import time
+
+from profiler import Sampler, profile_for
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'benchmarks'))
+from _common import make_movies  # noqa: E402
+
+
+def spin(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def start_spinner():
+    stop = threading.Event()
+    thread = threading.Thread(target=spin, args=(stop,), name='spinner')
+    thread.start()
+    return stop, thread
+
+
+def test_profile_for_samples_other_threads():
+    stop, thread = start_spinner()
+    try:
+        profile = profile_for(0.2, interval=0.002)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert profile.samples > 0
+    assert profile.top(1)[0]['frame'].startswith('spin (test_profiler.py:')
+    line = profile.collapsed().splitlines()[0]
+    frames, count = line.rsplit(' ', 1)
+    assert frames.startswith('spinner;') and frames.endswith(profile.top(1)[0]['frame'])
+    assert int(count) > 0
+    # The thread calling profile_for is not sampled
+    assert 'profile_for' not in profile.collapsed()
+
+
+def test_sampler_only_watches_added_threads():
+    stop, thread = start_spinner()
+    sampler = Sampler(0.001, threads=()).start()
+    try:
+        time.sleep(0.05)
+        assert sampler.profile.samples == 0
+        sampler.add_thread(thread.ident)
+        time.sleep(0.1)
+        sampler.remove_thread(thread.ident)
+    finally:
+        sampler.stop()
+        stop.set()
+        thread.join()
+    assert sampler.profile.samples > 0
+    assert all(any(frame.startswith('spin ') for frame in stack) for _, stack in sampler.profile.stacks)
+
+
+def test_admin_profile(loaded_app):
+    client = loaded_app.app.test_client()
+    assert client.post('/admin/profile?seconds=0').status_code == 400
+
+    stop, thread = start_spinner()
+    try:
+        response = client.post('/admin/profile?seconds=0.2&interval_ms=2&wait=true&top=5')
+    finally:
+        stop.set()
+        thread.join()
+    assert response.status_code == 200
+    summary = response.get_json()
+    assert summary['samples'] > 0 and len(summary['top']) <= 5
+    assert summary['top'][0]['frame'].startswith('spin ')
+
+    collapsed = client.get('/admin/profile?format=collapsed')
+    assert collapsed.content_type.startswith('text/plain')
+    assert collapsed.get_data(as_text=True).startswith('spinner;')
+
+
+def test_sampled_prediction_requests(loaded_app, monkeypatch):
+    client = loaded_app.app.test_client()
+    assert client.get('/admin/profile/requests').status_code == 404
+
+    monkeypatch.setattr(loaded_app, 'PROFILE_REQUEST_RATE', 1.0)
+    monkeypatch.setattr(loaded_app, 'PROFILE_INTERVAL_MS', 1.0)
+    monkeypatch.setattr(loaded_app.prediction_cache, 'max_entries', 0)
+    try:
+        for movie in make_movies(200, seed=11):
+            assert client.post('/predict', json=movie).status_code == 200
+            if loaded_app.get_request_sampler().profile.samples >= 5:
+                break
+        assert loaded_app.get_request_sampler().threads == set()
+
+        collapsed = client.get('/admin/profile/requests?format=collapsed').get_data(as_text=True)
+        assert 'predict (app.py:' in collapsed
+
+        profile = client.delete('/admin/profile/requests').get_json()
+        assert profile['samples'] >= 5
+        assert profile['request_rate'] == 1.0
+        assert client.get('/admin/profile/requests').get_json()['samples'] == 0
+    finally:
+        loaded_app.request_sampler.stop()
+        loaded_app.request_sampler = None
+
+
+def test_startup_load_profile(sample_artifacts, tmp_path, monkeypatch):
+    import app as backend_app
+
+    output = tmp_path / 'startup.collapsed'
+    monkeypatch.setattr(backend_app, 'PROFILE_STARTUP', str(output))
+    monkeypatch.setattr(backend_app, 'PROFILE_INTERVAL_MS', 1.0)
+    assert backend_app.load_model_at_startup(sample_artifacts)
+    assert 'load_model_and_data (app.py:' in output.read_text()
@@ -0,0 +1,148 @@
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from create_success_rates import (calculate_success_rate, create_success_rates, extract_people, get_director,
+                                  get_top_actors, safe_literal_eval, save_role_counts, update_success_rates)
+from model_bundle import SUCCESS_RATE_FILES, load_bundle
+from success_counts import count_roles, counts_from_artifact, merge_role_counts, rates_from_counts
+
+MOVIES = pd.DataFrame({
+    'director': ['Nolan', 'Nolan', 'Cameron', 'Nolan', '', np.nan, 'Cameron'],
+    'actor1': ['Bale', 'DiCaprio', 'DiCaprio', 'Nolan', 'Bale', 'Hardy', 'Worthington'],
+    'actor2': ['Caine', 'Page', 'Winslet', 'Caine', 'Caine', np.nan, 'Saldana'],
+    'actor3': ['Ledger', 'Hardy', 'Zane', 'Hardy', 'Oldman', 'Hardy', 'Weaver'],
+    'success': [1, 1, 1, 0, 0, 1, 1],
+})
+
+
+def test_calculate_success_rate_in_first_appearance_order():
+    rates = calculate_success_rate(MOVIES['director'], MOVIES['success'])
+    assert list(rates.items()) == [('Nolan', 2 / 3), ('Cameron', 1.0)]
+
+
+def test_min_count_uses_first_role_a_person_appears_in():
+    tables = rates_from_counts(count_roles(MOVIES))
+    assert tables['director'] == {'Nolan': 2 / 3, 'Cameron': 1.0}
+    # Nolan acted once but is filtered by his three directing credits
+    assert tables['actor1'] == {'Bale': 0.5, 'DiCaprio': 1.0, 'Nolan': 0.0}
+    assert tables['actor2'] == {'Caine': 1 / 3}
+    # Hardy's count comes from actor1, where he appears once
+    assert tables['actor3'] == {}
+
+
+def test_chunked_counts_match_whole_frame():
+    whole = count_roles(MOVIES)
+    chunked = None
+    for start in range(0, len(MOVIES), 3):
+        chunked = merge_role_counts(chunked, count_roles(MOVIES.iloc[start:start + 3]))
+    for role in whole:
+        pd.testing.assert_frame_equal(chunked[role], whole[role])
+    assert rates_from_counts(chunked) == rates_from_counts(whole)
+
+
+CREW = [
+    str([{'job': 'Producer', 'name': "Conan O'Brien"}, {'job': 'Director', 'name': 'Jean-Pierre Jeunet'}]),
+    str([{'job': 'Director of Photography', 'name': 'Roger Deakins', 'profile_path': None}]),
+    '[{"job": "Writer", "name": "Zo\\u00eb"}, {"job": "Director", "name": "Bj\\u00f6rk \\"B\\""}]',
+    '[{"job": "Dir\\u0065ctor", "name": "escaped"}]',
+    '[{"job": "Director", "name": "\\ud83c\\udfac"}]',
+    '[{"job": "Director", "name": null}]',
+    "[{'job': 'Director', 'name': 'Truncated'}, {'job': 'Edi",
+    '[]', np.nan, 'not a list',
+]
+
+CAST = [
+    str([{'name': 'Audrey Tautou', 'order': 0}, {'name': 'Mathieu "Mat" Kassovitz'}, {'name': 'Rufus'},
+         {'name': 'Yolande Moreau'}]),
+    str([{'name': 'Solo', 'character': "It's me\n"}]),
+    '[{"name": "Tom Hardy", "gender": 2}, {"name": "a\\/b"}]',
+    "[{'name': 'Nested', 'roles': {'lead': True}}]",
+    '[{"name": "Unquoted", "lead": true}]',
+    "[{'name': 'Truncated'}, {'name': 'Tom",
+    '[]', np.nan, '',
+]
+
+
+def legacy_director(crew_data):
+    for member in safe_literal_eval(crew_data):
+        if member.get('job') == 'Director':
+            return member.get('name')
+    return np.nan
+
+
+def legacy_top_actors(cast_data, n=3):
+    cast = safe_literal_eval(cast_data)
+    return [member.get('name') for member in cast[:n]] if cast else [np.nan]*n
+
+
+def test_credit_parsing_matches_literal_eval():
+    for crew in CREW:
+        assert repr(get_director(crew)) == repr(legacy_director(crew)), crew
+    for cast in CAST:
+        assert repr(get_top_actors(cast)) == repr(legacy_top_actors(cast)), cast
+
+
+def test_extract_people_in_process_pool(monkeypatch):
+    monkeypatch.setattr('create_success_rates.EXTRACT_CHUNK_ROWS', 3)
+    movies = pd.DataFrame({'crew': CREW[:len(CAST)], 'cast': CAST, 'budget': 1.0, 'revenue': 2.0})
+    serial = extract_people(movies.copy())
+    with ProcessPoolExecutor(2) as executor:
+        parallel = extract_people(movies.copy(), executor)
+    pd.testing.assert_frame_equal(parallel, serial)
+    assert serial['actor1'].tolist()[:3] == ['Audrey Tautou', 'Solo', 'Tom Hardy']
+
+
+def write_credits_csv(path, movies):
+    """MOVIES as a TMDB-style CSV with crew and cast columns"""
+    pd.DataFrame({
+        'crew': [str([{'job': 'Director', 'name': name}] if isinstance(name, str) and name else [])
+                 for name in movies['director']],
+        'cast': [str([{'name': name} for name in names if isinstance(name, str)])
+                 for names in movies[['actor1', 'actor2', 'actor3']].itertuples(index=False)],
+        'budget': 1.0,
+        'revenue': movies['success'] * 2.0
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+def load_counts(artifacts_dir):
+    return {role: counts_from_artifact(joblib.load(os.path.join(artifacts_dir, filename)))
+            for role, filename in SUCCESS_RATE_FILES.items()}
+
+
+def test_update_matches_full_build(tmp_path):
+    full_dir, incremental_dir = tmp_path / 'full', tmp_path / 'incremental'
+    full_dir.mkdir()
+    incremental_dir.mkdir()
+    assert create_success_rates(write_credits_csv(tmp_path / 'all.csv', MOVIES), workers=1, artifacts_dir=full_dir)
+    assert create_success_rates(write_credits_csv(tmp_path / 'history.csv', MOVIES.iloc[:4]), workers=1,
+                                artifacts_dir=incremental_dir)
+    assert update_success_rates(write_credits_csv(tmp_path / 'delta.csv', MOVIES.iloc[4:]), incremental_dir,
+                                workers=1)
+
+    full, incremental = load_counts(full_dir), load_counts(incremental_dir)
+    for role in full:
+        pd.testing.assert_frame_equal(incremental[role], full[role])
+    assert full['director'].loc['Cameron'].tolist() == [2, 2]
+
+
+def test_update_refuses_rate_tables(tmp_path):
+    for filename in SUCCESS_RATE_FILES.values():
+        joblib.dump({'Nolan': 0.5}, tmp_path / filename)
+    assert not update_success_rates(write_credits_csv(tmp_path / 'delta.csv', MOVIES), tmp_path, workers=1)
+    assert joblib.load(tmp_path / 'director_success.joblib') == {'Nolan': 0.5}
+
+
+def test_bundle_derives_rates_from_counts(sample_artifacts, tmp_path):
+    artifacts_dir = str(tmp_path / 'artifacts')
+    shutil.copytree(sample_artifacts, artifacts_dir, ignore=shutil.ignore_patterns('compiled_model'))
+    save_role_counts(count_roles(MOVIES), artifacts_dir)
+
+    bundle = load_bundle(artifacts_dir)
+    assert dict(bundle.director_success_rates) == {'Nolan': 2 / 3, 'Cameron': 1.0}
+    assert dict(load_bundle(artifacts_dir, min_count=3).director_success_rates) == {'Nolan': 2 / 3}
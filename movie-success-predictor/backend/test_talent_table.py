@@ -0,0 +1,48 @@
+import pickle
+
+from app import resolve_talent
+from name_index import NameIndex
+from talent_table import TalentTable
+
+TABLES = {
+    'director': {'Christopher Nolan': 0.85, 'Pedro Almodóvar': 0.6, 'John Smith': 0.2, 'JOHN SMITH': 0.9},
+    'actor1': {'Tom Hanks': 0.8, 'Christopher Nolan': 0.4, 'Zoë Kravitz': 0.55},
+    'actor2': {'Tom Hanks': 0.75, 'Emma Stone': 2 / 3},
+    'actor3': {}
+}
+
+
+def test_role_views_match_name_indexes():
+    """Every role answers exact, normalized, fuzzy and missing lookups as its NameIndex does"""
+    talent = TalentTable(TABLES).build_fuzzy_index()
+    assert talent.names == sorted(talent.names) and len(talent) == 7
+    queries = ['Tom Hanks', 'tom  HANKS', 'Zoe Kravitz', 'john smith', 'Christopher Nolen', 'Emma Stne',
+               'Pedro Almodovar', 'Nobody Atall', '']
+    for role, table in TABLES.items():
+        view = talent.role(role)
+        index = NameIndex(table).build_fuzzy_index()
+        assert dict(view) == table and len(view) == len(table)
+        for query in queries:
+            assert resolve_talent(query, view) == resolve_talent(query, index), (role, query)
+
+
+def test_names_are_shared_and_fuzzy_matches_stay_in_role():
+    # Each role unpickled on its own holds its own copies of the names, as separate joblib files do
+    tables = {role: pickle.loads(pickle.dumps(table)) for role, table in TABLES.items()}
+    assert next(iter(tables['actor1'])) is not next(iter(tables['actor2']))
+    talent = TalentTable(tables).build_fuzzy_index()
+    first = next(name for name in talent.role('actor1') if name == 'Tom Hanks')
+    second = next(name for name in talent.role('actor2') if name == 'Tom Hanks')
+    assert first is second
+
+    # Emma Stone only acts in actor2, so actor1 has nothing close to her
+    assert talent.role('actor2').fuzzy_lookup('Emma Stne', 0.8)[0] == 'Emma Stone'
+    assert talent.role('actor1').fuzzy_lookup('Emma Stne', 0.8) is None
+    assert 'Emma Stone' not in talent.role('actor1')
+
+
+def test_film_counts():
+    talent = TalentTable(TABLES, films={'director': {'Christopher Nolan': 7}})
+    assert talent.role('director').film_count('Christopher Nolan') == 7
+    assert talent.role('director').film_count('John Smith') is None
+    assert talent.role('actor3').film_count('Christopher Nolan') is None
@@ -0,0 +1,31 @@
+import os
+
+from train_model import train
+
+GRID = {
+    'classifier__n_estimators': [5, 10],
+    'classifier__max_depth': [None, 4],
+    'classifier__max_features': ['sqrt']
+}
+
+
+def test_search_ranks_candidates_and_picks_within_budget(tmp_path):
+    leaderboard, chosen, pipeline = train(n_samples=400, param_grid=GRID, cv=2, n_jobs=1, top=3,
+                                          cache_dir=str(tmp_path), repeats=20)
+    assert [row['rank'] for row in leaderboard] == [1, 2, 3]
+    assert chosen is leaderboard[0]
+    for row in leaderboard:
+        assert 0 <= row['accuracy'] <= 1 and 0 <= row['roc_auc'] <= 1
+        assert 0 < row['single_p50_us'] <= row['single_p99_us']
+        assert row['batch_us_per_row'] > 0
+    # The fitted preprocessor was cached, but the saved pipeline does not point at the cache
+    assert os.listdir(tmp_path)
+    assert pipeline.memory is None
+    assert pipeline.named_steps['classifier'].n_estimators == chosen['params']['n_estimators']
+
+
+def test_nothing_picked_when_no_candidate_meets_budget():
+    leaderboard, chosen, pipeline = train(n_samples=400, param_grid=GRID, cv=2, n_jobs=1, top=2,
+                                          latency_budget_us=0.001, repeats=20)
+    assert len(leaderboard) == 2
+    assert chosen is None and pipeline is None
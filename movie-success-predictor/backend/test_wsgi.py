@@ -0,0 +1,31 @@
+import gc
+import importlib
+import sys
+
+import pytest
+
+import app as backend_app
+
+
+def test_wsgi_preloads_model_and_freezes_heap(sample_artifacts, monkeypatch):
+    monkeypatch.setenv('MODEL_ARTIFACTS_DIR', sample_artifacts)
+    sys.modules.pop('wsgi', None)
+    try:
+        wsgi = importlib.import_module('wsgi')
+        assert wsgi.app is backend_app.app
+        assert backend_app.model_bundle.artifacts_dir == sample_artifacts
+        assert gc.get_freeze_count() > 0
+        assert wsgi.app.test_client().get('/health').get_json()['model_loaded']
+    finally:
+        gc.unfreeze()
+
+
+def test_create_app_fails_fast_without_model(loaded_app, sample_artifacts, tmp_path, monkeypatch):
+    monkeypatch.setenv('MODEL_ARTIFACTS_DIR', sample_artifacts)
+    wsgi = importlib.import_module('wsgi')
+    try:
+        with pytest.raises(RuntimeError):
+            wsgi.create_app(str(tmp_path))
+    finally:
+        gc.unfreeze()
+        loaded_app.load_model_and_data(sample_artifacts)
@@ -0,0 +1,259 @@
+"""Cross-validated hyperparameter search for the movie success RandomForest.
+
+Candidates are compared with successive halving: each round fits the
+surviving settings on a larger sample of the training split and keeps the
+best 1/factor, so poor settings are dropped after seeing a fraction of the
+data. Folds and candidates run in parallel across n_jobs processes, and the
+fitted ColumnTransformer is cached with Pipeline(memory=...), so it is fit
+once per data sample instead of once per candidate. The best candidates are
+refit on the whole training split and ranked with held-out accuracy, ROC AUC
+and per-row inference latency.
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import time
+import warnings
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import GridSearchCV, HalvingGridSearchCV, train_test_split
+
+from compiled_model import CompiledModel
+from create_sample_model import FEATURES, TARGET, build_pipeline, make_sample_movies
+from movie_dataset import read_table, table_columns
+
+warnings.filterwarnings('ignore')
+
+PARAM_GRID = {
+    'classifier__n_estimators': [50, 100, 200, 400],
+    'classifier__max_depth': [None, 8, 16, 32],
+    'classifier__max_features': ['sqrt', 'log2', 0.5]
+}
+
+
+def load_training_data(csv_path=None, n_samples=3000):
+    """Feature frame and labels from csv_path (a CSV or movie_dataset file), or the synthetic sample movies"""
+    if csv_path is None:
+        movies = make_sample_movies(n_samples)[0]
+    else:
+        columns = FEATURES + [TARGET]
+        available = table_columns(csv_path)
+        missing = [column for column in columns if column not in available]
+        if missing:
+            raise ValueError(f'{csv_path} is missing columns: {missing}')
+        # Only the model's columns are parsed
+        movies = read_table(csv_path, columns)
+    return movies[FEATURES], movies[TARGET]
+
+
+def run_search(X, y, param_grid=PARAM_GRID, halving=True, factor=3, cv=5, scoring='roc_auc', n_jobs=-1,
+               memory=None, random_state=42):
+    """Fit a (halving) grid search over param_grid and return it"""
+    pipeline = build_pipeline(RandomForestClassifier(random_state=random_state), memory=memory)
+    if halving:
+        search = HalvingGridSearchCV(pipeline, param_grid, factor=factor, cv=cv, scoring=scoring, n_jobs=n_jobs,
+                                     refit=False, random_state=random_state)
+    else:
+        search = GridSearchCV(pipeline, param_grid, cv=cv, scoring=scoring, n_jobs=n_jobs, refit=False)
+    search.fit(X, y)
+    return search
+
+
+def top_candidates(search, k):
+    """(params, cv score, rows fitted on) of the k best candidates.
+
+    With successive halving, candidates that survived more rounds rank
+    above those eliminated earlier, then by cross-validated score, then by
+    the faster cross-validation scoring time.
+    """
+    results = search.cv_results_
+    scores = np.nan_to_num(results['mean_test_score'], nan=-np.inf)
+    rounds = results.get('iter', np.zeros(len(scores), dtype=int))
+    resources = results.get('n_resources', np.full(len(scores), -1))
+    order = np.lexsort((results['mean_score_time'], -scores, -rounds))
+    return [(results['params'][i], float(results['mean_test_score'][i]), int(resources[i])) for i in order[:k]]
+
+
+def measure_latency(pipeline, X, repeats=200):
+    """Per-row inference latency in microseconds.
+
+    Returns p50/p99 of single-row predict_proba calls (what /predict does),
+    the same through the native engine when the pipeline converts, and the
+    per-row cost of one call over all of X.
+    """
+    rows = [X.iloc[[i % len(X)]] for i in range(repeats)]
+    pipeline.predict_proba(rows[0])
+    single = []
+    for row in rows:
+        start = time.perf_counter()
+        pipeline.predict_proba(row)
+        single.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    pipeline.predict_proba(X)
+    batch = (time.perf_counter() - start) / len(X)
+
+    native = []
+    try:
+        compiled = CompiledModel.from_pipeline(pipeline)
+    except (AttributeError, ValueError):
+        compiled = None
+    if compiled is not None:
+        records = X.to_dict('records')
+        for i in range(repeats):
+            record = [records[i % len(records)]]
+            start = time.perf_counter()
+            compiled.predict_proba_records(record)
+            native.append(time.perf_counter() - start)
+
+    return {
+        'single_p50_us': float(np.percentile(single, 50) * 1e6),
+        'single_p99_us': float(np.percentile(single, 99) * 1e6),
+        'native_p50_us': float(np.percentile(native, 50) * 1e6) if native else None,
+        'batch_us_per_row': batch * 1e6
+    }
+
+
+def evaluate_candidates(candidates, X_train, y_train, X_test, y_test, memory=None, random_state=42, repeats=200):
+    """Refit each candidate on the training split and score it on the test split.
+
+    Returns (leaderboard rows, fitted pipelines) in candidate order.
+    """
+    leaderboard = []
+    pipelines = []
+    for rank, (params, cv_score, resources) in enumerate(candidates, 1):
+        pipeline = build_pipeline(RandomForestClassifier(random_state=random_state), memory=memory)
+        pipeline.set_params(**params)
+        start = time.perf_counter()
+        pipeline.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - start
+
+        probabilities = pipeline.predict_proba(X_test)[:, 1]
+        predictions = pipeline.classes_[(probabilities >= 0.5).astype(int)]
+        row = {
+            'rank': rank,
+            'params': {name.split('__', 1)[1]: value for name, value in params.items()},
+            'cv_score': cv_score,
+            'cv_rows': resources,
+            'accuracy': float(accuracy_score(y_test, predictions)),
+            'roc_auc': float(roc_auc_score(y_test, probabilities)),
+            'fit_seconds': fit_seconds
+        }
+        row.update(measure_latency(pipeline, X_test, repeats))
+        leaderboard.append(row)
+        pipelines.append(pipeline)
+    return leaderboard, pipelines
+
+
+def print_leaderboard(leaderboard, budget_us=None):
+    print(f"\n{'#':>2} {'n_estimators':>12} {'max_depth':>9} {'max_features':>12} {'cv score':>9} "
+          f"{'accuracy':>9} {'roc auc':>8} {'p50 us':>8} {'p99 us':>8} {'native us':>9} {'batch us':>9}")
+    for row in leaderboard:
+        params = row['params']
+        native = f"{row['native_p50_us']:.0f}" if row['native_p50_us'] is not None else '-'
+        marker = ' ' if budget_us is None or row['single_p99_us'] <= budget_us else '*'
+        print(f"{row['rank']:>2} {params.get('n_estimators', '-')!s:>12} {params.get('max_depth', '-')!s:>9} "
+              f"{params.get('max_features', '-')!s:>12} {row['cv_score']:>9.4f} {row['accuracy']:>9.4f} "
+              f"{row['roc_auc']:>8.4f} {row['single_p50_us']:>8.0f} {row['single_p99_us']:>8.0f}{marker}"
+              f"{native:>9} {row['batch_us_per_row']:>9.1f}")
+    if budget_us is not None:
+        print(f"* over the {budget_us:g} us p99 latency budget")
+
+
+def train(csv_path=None, n_samples=3000, param_grid=PARAM_GRID, halving=True, factor=3, cv=5, scoring='roc_auc',
+          n_jobs=-1, top=5, latency_budget_us=None, cache_dir=None, random_state=42, repeats=200):
+    """Search, evaluate and pick a model.
+
+    Returns (leaderboard, picked row, picked pipeline) where the pick is
+    the best-ranked candidate whose single-row p99 latency fits
+    latency_budget_us; both are None when none does. The preprocessor cache lives in cache_dir when given
+    (reused by later runs), otherwise in a temporary directory.
+    """
+    X, y = load_training_data(csv_path, n_samples)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=random_state, stratify=y
+    )
+    memory = cache_dir or tempfile.mkdtemp(prefix='cinepulse-train-')
+    try:
+        candidates_total = int(np.prod([len(values) for values in param_grid.values()]))
+        print(f"🔎 Searching {candidates_total} candidates on {len(X_train)} movies "
+              f"({'successive halving' if halving else 'full grid'}, {cv}-fold {scoring})...")
+        start = time.perf_counter()
+        search = run_search(X_train, y_train, param_grid, halving, factor, cv, scoring, n_jobs, memory, random_state)
+        fits = len(search.cv_results_['params']) * cv
+        print(f"✅ Search finished in {time.perf_counter() - start:.1f}s ({fits} fits)")
+
+        print(f"🏁 Refitting the top {top} candidates...")
+        leaderboard, pipelines = evaluate_candidates(top_candidates(search, top), X_train, y_train, X_test, y_test,
+                                                     memory, random_state, repeats)
+    finally:
+        if cache_dir is None:
+            shutil.rmtree(memory, ignore_errors=True)
+
+    print_leaderboard(leaderboard, latency_budget_us)
+    for row, pipeline in zip(leaderboard, pipelines):
+        if latency_budget_us is None or row['single_p99_us'] <= latency_budget_us:
+            # The cache directory is not needed (or may be gone) when serving
+            pipeline.set_params(memory=None)
+            return leaderboard, row, pipeline
+    return leaderboard, None, None
+
+
+def parse_grid_value(value):
+    if value == 'None':
+        return None
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Search RandomForest hyperparameters and report accuracy and latency')
+    parser.add_argument('--csv', default=None,
+                        help='training CSV (or .npz dataset from build_dataset.py) with the model features and a '
+                             'success column (default: synthetic sample)')
+    parser.add_argument('--samples', type=int, default=3000, help='synthetic movies when no --csv is given')
+    parser.add_argument('--n-estimators', nargs='+', type=parse_grid_value,
+                        default=PARAM_GRID['classifier__n_estimators'])
+    parser.add_argument('--max-depth', nargs='+', type=parse_grid_value, default=PARAM_GRID['classifier__max_depth'])
+    parser.add_argument('--max-features', nargs='+', type=parse_grid_value,
+                        default=PARAM_GRID['classifier__max_features'])
+    parser.add_argument('--full-grid', action='store_true', help='evaluate every candidate on all rows')
+    parser.add_argument('--factor', type=int, default=3, help='halving factor: 1/factor candidates survive a round')
+    parser.add_argument('--cv', type=int, default=5)
+    parser.add_argument('--scoring', default='roc_auc', help='sklearn scorer used to rank candidates')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='parallel fits (-1: one per CPU)')
+    parser.add_argument('--top', type=int, default=5, help='candidates refit and shown on the leaderboard')
+    parser.add_argument('--latency-budget-us', type=float, default=None,
+                        help='pick the best candidate whose single-row p99 latency is within this budget')
+    parser.add_argument('--cache-dir', default=None, help='keep the fitted preprocessor cache here between runs')
+    parser.add_argument('--leaderboard', default=None, help='also write the leaderboard to this JSON file')
+    parser.add_argument('--output', default=None, help='save the picked pipeline here, e.g. saved_model.pkl')
+    args = parser.parse_args()
+
+    grid = {
+        'classifier__n_estimators': args.n_estimators,
+        'classifier__max_depth': args.max_depth,
+        'classifier__max_features': args.max_features
+    }
+    leaderboard, chosen, pipeline = train(args.csv, args.samples, grid, not args.full_grid, args.factor, args.cv,
+                                          args.scoring, args.n_jobs, args.top, args.latency_budget_us, args.cache_dir)
+    if args.leaderboard:
+        with open(args.leaderboard, 'w') as f:
+            json.dump(leaderboard, f, indent=2)
+        print(f"📁 Leaderboard written to {args.leaderboard}")
+    if pipeline is None:
+        print("❌ No candidate meets the latency budget; nothing saved")
+        raise SystemExit(1)
+    print(f"\n🎯 Picked #{chosen['rank']}: {chosen['params']}")
+    if args.output:
+        joblib.dump(pipeline, args.output)
+        print(f"📁 {args.output} - picked pipeline")
@@ -0,0 +1,50 @@
+"""Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+
+The model is loaded when this module is imported. With preload_app (see
+gunicorn.conf.py) that happens once in the gunicorn master, and every worker
+forked from it shares the memory pages holding the forest and success rate
+tables instead of loading its own copy.
+"""
+import gc
+import logging
+import os
+
+import app as backend_app
+
+logger = logging.getLogger(__name__)
+
+
+def create_app(artifacts_dir=None, model_format=None, inference_engine=None):
+    """Load the model bundle and return the Flask app ready to serve.
+
+    artifacts_dir defaults to MODEL_ARTIFACTS_DIR, or the backend directory
+    when that is unset. With PROFILE_STARTUP set the load is profiled. Raises RuntimeError if the model cannot be loaded so
+    the server fails fast instead of answering every request with a 500.
+    """
+    if artifacts_dir is None:
+        artifacts_dir = os.environ.get('MODEL_ARTIFACTS_DIR')
+    if not backend_app.load_model_at_startup(artifacts_dir, model_format, inference_engine):
+        raise RuntimeError('Failed to load model; see the log for details')
+    # Index the catalog before fork as well, so workers share it
+    backend_app.get_movie_store()
+    # and finish its predictions, since the thread making them would not survive fork
+    if backend_app.catalog_refresh_thread is not None:
+        backend_app.catalog_refresh_thread.join()
+
+    # Move everything allocated so far out of the collector's reach. The
+    # objects are never scanned again, so the collector does not write to
+    # their headers and the pages stay shared after fork.
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Model bundle {backend_app.model_bundle.version} loaded; "
+                f"{gc.get_freeze_count()} objects frozen")
+    return backend_app.app
+
+
+def post_fork():
+    """Per-worker setup after gunicorn forks it from the preloaded master"""
+    # Threads do not survive fork, so each worker runs its own watcher
+    backend_app.start_artifact_watcher()
+
+
+app = create_app()
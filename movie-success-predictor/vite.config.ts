@@ -23,6 +23,11 @@ export default defineConfig({
         changeOrigin: true,
         secure: false,
       },
+      '/movies': {
+        target: 'http://localhost:5000',
+        changeOrigin: true,
+        secure: false,
+      },
       '/final_tmdb_cleaned.csv': {
         target: 'http://localhost:5000',
         changeOrigin: true,